@@ -0,0 +1,255 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from config import (
+    ANSWER_CACHE_THRESHOLD,
+    ANSWER_CACHE_TTL,
+    ANSWER_CACHE_MAX_ENTRIES,
+    ANSWER_CACHE_MAX_NAMESPACES
+)
+
+# A question opening like this, or using one of these words, leans on earlier turns
+FOLLOW_UP_OPENERS = ("and", "also", "but", "so", "then", "what about", "how about", "what else", "why not")
+FOLLOW_UP_WORDS = frozenset({
+    "it", "its", "that", "those", "these", "they", "them", "their", "he", "she", "him", "her", "his",
+    "above", "previous", "earlier", "again", "same", "former", "latter", "else"
+})
+FOLLOW_UP_MAX_WORDS = 3  # "why?", "tell me more" only make sense after an earlier turn
+
+
+class _NamespaceEntries:
+    """Cached answers of one namespace plus a stacked matrix of their question vectors."""
+
+    __slots__ = ("entries", "generation", "matrix", "keys")
+
+    def __init__(self):
+        self.entries = OrderedDict()  # entry id -> (vector, result, created_at)
+        self.generation = 0
+        self.matrix = None
+        self.keys = None
+
+    def stacked(self):
+        if self.matrix is None and self.entries:
+            self.keys = list(self.entries)
+            self.matrix = np.stack([self.entries[key][0] for key in self.keys])
+        return self.keys, self.matrix
+
+    def changed(self):
+        self.matrix = None
+        self.keys = None
+
+
+class SemanticAnswerCache:
+    """Per-namespace cache of RAG answers, matched on question embedding.
+
+    A lookup compares the question vector against the cached questions of
+    the same namespace and returns the stored result when the best cosine
+    similarity reaches ``threshold``. Entries expire after ``ttl_seconds``,
+    each namespace keeps its ``max_entries`` most recently used answers and
+    the least recently used namespaces are dropped beyond ``max_namespaces``.
+
+    invalidate() drops a namespace after new content is ingested and bumps
+    its generation, so answers computed against the old content are not
+    stored afterwards.
+    """
+
+    def __init__(self, threshold=ANSWER_CACHE_THRESHOLD, ttl_seconds=ANSWER_CACHE_TTL,
+                 max_entries=ANSWER_CACHE_MAX_ENTRIES, max_namespaces=ANSWER_CACHE_MAX_NAMESPACES):
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_namespaces = max_namespaces
+        self._namespaces = OrderedDict()
+        self._generations = {}
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def _unit(vector):
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _expire(self, bucket, now):
+        expired = [key for key, (_, _, created_at) in bucket.entries.items() if now - created_at > self.ttl_seconds]
+        for key in expired:
+            del bucket.entries[key]
+        if expired:
+            bucket.changed()
+
+    def generation(self, namespace):
+        """Token to pass to store(); it goes stale when the namespace is invalidated."""
+        with self._lock:
+            return self._generations.get(namespace, 0)
+
+    def lookup(self, namespace, vector):
+        """Return (result, similarity) for the closest cached question, or (None, best similarity)."""
+        query = self._unit(vector)
+        with self._lock:
+            bucket = self._namespaces.get(namespace)
+            if bucket is None:
+                self.misses += 1
+                return None, None
+            self._namespaces.move_to_end(namespace)
+            self._expire(bucket, time.monotonic())
+            keys, matrix = bucket.stacked()
+            if matrix is None:
+                self.misses += 1
+                return None, None
+
+            scores = matrix @ query
+            best = int(np.argmax(scores))
+            similarity = float(scores[best])
+            if similarity < self.threshold:
+                self.misses += 1
+                return None, similarity
+
+            key = keys[best]
+            bucket.entries.move_to_end(key)
+            self.hits += 1
+            return bucket.entries[key][1], similarity
+
+    def store(self, namespace, vector, result, generation=None):
+        """Cache a result; skipped if the namespace was invalidated since ``generation``."""
+        with self._lock:
+            if generation is not None and generation != self._generations.get(namespace, 0):
+                return False
+            bucket = self._namespaces.get(namespace)
+            if bucket is None:
+                bucket = self._namespaces[namespace] = _NamespaceEntries()
+                while len(self._namespaces) > self.max_namespaces:
+                    self._namespaces.popitem(last=False)
+            self._namespaces.move_to_end(namespace)
+
+            self._next_id += 1
+            bucket.entries[self._next_id] = (self._unit(vector), result, time.monotonic())
+            while len(bucket.entries) > self.max_entries:
+                bucket.entries.popitem(last=False)
+            bucket.changed()
+            return True
+
+    def invalidate(self, namespace):
+        """Drop every cached answer for a namespace."""
+        with self._lock:
+            self._generations[namespace] = self._generations.get(namespace, 0) + 1
+            bucket = self._namespaces.pop(namespace, None)
+            self.invalidations += 1
+            dropped = len(bucket.entries) if bucket else 0
+        if dropped:
+            print(f"🧹 Answer cache: dropped {dropped} answers for namespace '{namespace}'")
+        return dropped
+
+    def stats(self):
+        with self._lock:
+            entries = sum(len(bucket.entries) for bucket in self._namespaces.values())
+            namespaces = len(self._namespaces)
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "invalidations": self.invalidations,
+            "entries": entries,
+            "namespaces": namespaces,
+            "threshold": self.threshold
+        }
+
+
+def has_conversation(inputs):
+    """True when the chain input carries earlier turns (recent messages or a summary)."""
+    return bool(inputs.get("chat_history") or inputs.get("conversation_summary"))
+
+
+def is_follow_up(question):
+    """True when the question likely needs earlier turns to be understood ("and the deposit?")."""
+    text = question.strip().casefold()
+    words = re.findall(r"[\w']+", text)
+    if len(words) <= FOLLOW_UP_MAX_WORDS:
+        return True
+    if any(text == opener or text.startswith(opener + " ") for opener in FOLLOW_UP_OPENERS):
+        return True
+    return any(word in FOLLOW_UP_WORDS for word in words)
+
+
+class CachedRAGChain:
+    """RAG chain wrapper that answers repeated or paraphrased questions from a SemanticAnswerCache.
+
+    Questions asked with earlier turns still use the cache unless they read
+    as follow-ups (is_follow_up), whose answer depends on those turns and
+    goes straight to the chain ("bypass"). ``embed_query`` is blocking and
+    run through ``run_blocking``.
+    """
+
+    def __init__(self, rag_chain, cache, namespace, embed_query, run_blocking):
+        self.rag_chain = rag_chain
+        self.cache = cache
+        self.namespace = namespace
+        self.embed_query = embed_query
+        self.run_blocking = run_blocking
+
+    @staticmethod
+    def _bypass(inputs):
+        return has_conversation(inputs) and is_follow_up(inputs["input"])
+
+    async def _lookup(self, question):
+        vector = await self.run_blocking(self.embed_query, question)
+        # Read the generation first so an answer computed during an ingest is not stored
+        generation = self.cache.generation(self.namespace)
+        cached, similarity = self.cache.lookup(self.namespace, vector)
+        if cached is not None:
+            print(f"💬 Answer cache hit in '{self.namespace}' (similarity {similarity:.3f})")
+        return vector, generation, cached, similarity
+
+    def _remember(self, vector, generation, result):
+        # "No relevant information" answers are not worth keeping
+        if result["context"]:
+            self.cache.store(self.namespace, vector, {"answer": result["answer"], "context": result["context"]}, generation)
+
+    async def ainvoke(self, inputs):
+        if self._bypass(inputs):
+            return {**(await self.rag_chain.ainvoke(inputs)), "answer_cache": "bypass"}
+        vector, generation, cached, similarity = await self._lookup(inputs["input"])
+        if cached is not None:
+            return {**cached, "answer_cache": "hit", "cache_similarity": round(similarity, 4)}
+
+        result = await self.rag_chain.ainvoke(inputs)
+        self._remember(vector, generation, result)
+        return {**result, "answer_cache": "miss"}
+
+    async def astream(self, inputs):
+        if self._bypass(inputs):
+            yield {"answer_cache": "bypass"}
+            async for chunk in self.rag_chain.astream(inputs):
+                yield chunk
+            return
+        vector, generation, cached, similarity = await self._lookup(inputs["input"])
+        if cached is not None:
+            yield {"answer_cache": "hit", "cache_similarity": round(similarity, 4)}
+            yield {"context": cached["context"]}
+            yield {"answer": cached["answer"]}
+            return
+
+        yield {"answer_cache": "miss"}
+        context, answer_parts = [], []
+        async for chunk in self.rag_chain.astream(inputs):
+            if "context" in chunk:
+                context = chunk["context"]
+            elif "answer" in chunk:
+                answer_parts.append(chunk["answer"])
+            yield chunk
+        self._remember(vector, generation, {"answer": "".join(answer_parts), "context": context})
+
+
+__all__ = [
+    'SemanticAnswerCache',
+    'CachedRAGChain',
+    'has_conversation',
+    'is_follow_up'
+]
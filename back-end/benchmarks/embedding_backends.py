@@ -0,0 +1,77 @@
+"""Throughput and agreement of the embedding backends against torch.
+
+Run from back-end/:
+
+    python benchmarks/embedding_backends.py
+    python benchmarks/embedding_backends.py --texts-file some_chunks.txt --backends onnx-int8
+
+Each backend embeds the same texts in document-sized batches. The report
+gives texts/second plus the mean and worst-case cosine similarity of each
+vector to the torch (sentence-transformers) baseline.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from embedding_backends import load_embedding_model
+
+WORDS = (
+    "tenant landlord deposit lease court claim notice property rent agreement "
+    "damage repair inspection refund contract payment month state law filing "
+    "evidence hearing judge small claims amount document website policy service"
+).split()
+
+
+def synthetic_texts(count, seed=0):
+    """Chunk-like texts of 20-120 words, roughly the size of /process chunks."""
+    rng = random.Random(seed)
+    return [" ".join(rng.choice(WORDS) for _ in range(rng.randint(20, 120))) for _ in range(count)]
+
+
+def run(backend, texts, batch_size):
+    model = load_embedding_model(backend)
+    model.embed_documents(texts[:batch_size])  # warm-up
+    start = time.perf_counter()
+    vectors = []
+    for first in range(0, len(texts), batch_size):
+        vectors.extend(model.embed_documents(texts[first:first + batch_size]))
+    elapsed = time.perf_counter() - start
+    vectors = np.asarray(vectors, dtype=np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True), elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--texts", type=int, default=1000)
+    parser.add_argument("--texts-file", help="one text per line instead of synthetic chunks")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--backends", nargs="+", default=["onnx", "onnx-int8"])
+    args = parser.parse_args()
+
+    if args.texts_file:
+        with open(args.texts_file, "r", encoding="utf-8") as f:
+            texts = [line.strip() for line in f if line.strip()][:args.texts]
+    else:
+        texts = synthetic_texts(args.texts)
+    print(f"{len(texts)} texts, batch size {args.batch_size}\n")
+
+    baseline, elapsed = run("torch", texts, args.batch_size)
+    print(f"{'torch':<10} {len(texts) / elapsed:8.1f} texts/s  dim={baseline.shape[1]}")
+
+    for backend in args.backends:
+        vectors, elapsed = run(backend, texts, args.batch_size)
+        agreement = (vectors * baseline).sum(axis=1)
+        print(
+            f"{backend:<10} {len(texts) / elapsed:8.1f} texts/s  dim={vectors.shape[1]}  "
+            f"cosine vs torch: mean={agreement.mean():.4f} min={agreement.min():.4f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
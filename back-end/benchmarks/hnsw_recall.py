@@ -0,0 +1,100 @@
+"""Recall vs latency of the local HNSW index against exact NumPy search.
+
+Run from back-end/:
+
+    python benchmarks/hnsw_recall.py --vectors 100000
+    python benchmarks/hnsw_recall.py --namespace-dir vector_store_data/ns_default
+
+By default it uses synthetic clustered 384-d unit vectors shaped like
+all-MiniLM-L6-v2 output. With --namespace-dir it loads real embeddings from
+a local vector store namespace instead, and queries with held-out rows.
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import EMBEDDING_DIM, HNSW_M, HNSW_EF_CONSTRUCTION
+from hnsw_index import HnswGraph, hnsw_available
+from local_vector_store import normalize_rows
+from vector_segments import read_manifest, open_segments, top_k_indices
+
+
+def synthetic_embeddings(count, dimension, clusters=200, seed=0):
+    """Unit vectors around random topic centres, similar in spread to sentence embeddings."""
+    rng = np.random.default_rng(seed)
+    centres = normalize_rows(rng.normal(size=(clusters, dimension)))
+    assignment = rng.integers(0, clusters, size=count)
+    vectors = centres[assignment] + 0.6 * rng.normal(size=(count, dimension)) / np.sqrt(dimension)
+    return normalize_rows(vectors)
+
+
+def namespace_embeddings(path):
+    manifest = read_manifest(path)
+    if manifest is None:
+        raise SystemExit(f"No manifest found in {path}")
+    segments = open_segments(path, manifest, manifest["dimension"])
+    return np.concatenate([np.asarray(segment) for _, segment in segments])
+
+
+def percentile_ms(samples, q):
+    return float(np.percentile(samples, q) * 1000)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--vectors", type=int, default=100000, help="synthetic corpus size")
+    parser.add_argument("--namespace-dir", help="load embeddings from a local vector store namespace")
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--m", type=int, default=HNSW_M)
+    parser.add_argument("--ef-construction", type=int, default=HNSW_EF_CONSTRUCTION)
+    parser.add_argument("--ef", type=int, nargs="+", default=[16, 32, 64, 128, 256])
+    args = parser.parse_args()
+
+    if not hnsw_available():
+        raise SystemExit("hnswlib is not installed: pip install hnswlib")
+
+    if args.namespace_dir:
+        corpus = namespace_embeddings(args.namespace_dir)
+    else:
+        corpus = synthetic_embeddings(args.vectors + args.queries, EMBEDDING_DIM)
+    corpus, queries = corpus[:-args.queries], corpus[-args.queries:]
+    print(f"Corpus: {len(corpus)} x {corpus.shape[1]}, queries: {len(queries)}, k={args.k}")
+
+    # Exact baseline, one query at a time like /query does
+    latencies = []
+    truth = []
+    for query in queries:
+        start = time.perf_counter()
+        truth.append(top_k_indices(query[None, :] @ corpus.T, args.k)[0])
+        latencies.append(time.perf_counter() - start)
+    truth = np.array(truth)
+    print(f"\nexact      recall=1.000  p50={percentile_ms(latencies, 50):7.2f} ms  p95={percentile_ms(latencies, 95):7.2f} ms")
+
+    start = time.perf_counter()
+    graph = HnswGraph.create(corpus.shape[1], capacity=len(corpus), m=args.m, ef_construction=args.ef_construction)
+    # Insert in /process-sized batches to mirror incremental builds
+    for first in range(0, len(corpus), 1000):
+        graph.add(corpus[first:first + 1000], first)
+    print(f"HNSW build (M={args.m}, ef_construction={args.ef_construction}): {time.perf_counter() - start:.1f} s")
+
+    for ef in args.ef:
+        graph.ef_search = ef
+        latencies = []
+        hits = 0
+        for query, expected in zip(queries, truth):
+            start = time.perf_counter()
+            labels, _ = graph.search(query[None, :], args.k)
+            latencies.append(time.perf_counter() - start)
+            hits += len(np.intersect1d(labels[0], expected))
+        recall = hits / truth.size
+        print(f"hnsw ef={ef:<4} recall={recall:.3f}  p50={percentile_ms(latencies, 50):7.2f} ms  p95={percentile_ms(latencies, 95):7.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
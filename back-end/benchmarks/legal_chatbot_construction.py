@@ -0,0 +1,97 @@
+"""Construction time and memory of a LegalChatbot session object.
+
+Run from back-end/:
+
+    python benchmarks/legal_chatbot_construction.py
+    python benchmarks/legal_chatbot_construction.py --sessions 20000
+
+Compares the current LegalChatbot(), whose prompts, chains and history
+wrappers are shared class attributes, with the previous design that built
+three ChatPromptTemplates, three chains and three RunnableWithMessageHistory
+wrappers in every __init__ (reproduced below from the shared prompts).
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain.memory import ChatMessageHistory
+from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.runnables.history import RunnableWithMessageHistory
+
+from legal_advisor_chatbot import LegalChatbot, llm
+
+
+class PerInstanceChatbot:
+    """The pre-sharing layout: session fields plus its own prompts, chains and wrappers."""
+
+    def __init__(self):
+        self.payload_data = dict.fromkeys(LegalChatbot.required_fields)
+        self.required_fields = list(LegalChatbot.required_fields)
+        self.current_question = 0
+        self.is_tenant_security_case = False
+        self.case_identified = False
+        self.retry_count = {}
+        self.started = False
+        self.questions = dict(LegalChatbot.questions)
+
+        for name in ("case_detection", "data_collection", "general_legal"):
+            prompt = ChatPromptTemplate.from_messages(getattr(LegalChatbot, f"{name}_prompt").messages)
+            chain = prompt | llm
+            setattr(self, f"{name}_prompt", prompt)
+            setattr(self, f"{name}_chain", chain)
+            setattr(self, f"{name}_history", RunnableWithMessageHistory(
+                chain,
+                lambda session_id: ChatMessageHistory(),
+                input_messages_key="input",
+                history_messages_key="history"
+            ))
+
+
+def human(num_bytes):
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if abs(num_bytes) < 1024:
+            return f"{num_bytes:7.1f} {unit}"
+        num_bytes /= 1024
+    return f"{num_bytes:7.1f} TiB"
+
+
+def measure(factory, count):
+    """Return (seconds per construction, bytes retained per instance)."""
+    start = time.perf_counter()
+    for _ in range(count):
+        factory()
+    seconds = (time.perf_counter() - start) / count
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    instances = [factory() for _ in range(count)]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    grown = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    del instances
+    return seconds, grown / count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=2000, help="instances to build per design")
+    args = parser.parse_args()
+
+    # Warm imports and lazy pydantic schema building before timing
+    PerInstanceChatbot()
+    LegalChatbot()
+
+    old_seconds, old_bytes = measure(PerInstanceChatbot, args.sessions)
+    new_seconds, new_bytes = measure(LegalChatbot, args.sessions)
+
+    print(f"per-instance  {old_seconds * 1e6:10.1f} us / session  {human(old_bytes)} / session")
+    print(f"shared        {new_seconds * 1e6:10.1f} us / session  {human(new_bytes)} / session")
+    print(f"speedup       {old_seconds / new_seconds:10.0f}x          {old_bytes / max(new_bytes, 1):7.0f}x less memory")
+
+
+if __name__ == "__main__":
+    main()
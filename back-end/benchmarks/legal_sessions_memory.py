@@ -0,0 +1,114 @@
+"""Per-session memory cost of live LegalChatbot instances vs persisted state records.
+
+Run from back-end/:
+
+    python benchmarks/legal_sessions_memory.py
+    python benchmarks/legal_sessions_memory.py --sessions 100000 --live 500 --max-in-memory 1000
+
+Three numbers, all per session:
+  * live       - tracemalloc growth per LegalChatbot() kept in a dict (the old
+                 chatbot_instances), extrapolated to --sessions
+  * record     - size of the to_state() JSON written to SQLite
+  * store      - SQLite file size and resident LegalSessionStore memory after
+                 --sessions sessions went through get()/save() with an LRU of
+                 --max-in-memory live instances, plus get() latency when rehydrating
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from legal_advisor_chatbot import LegalChatbot
+from legal_session_store import LegalSessionStore
+
+
+def human(num_bytes):
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if abs(num_bytes) < 1024:
+            return f"{num_bytes:7.1f} {unit}"
+        num_bytes /= 1024
+    return f"{num_bytes:7.1f} TiB"
+
+
+def sample_state(rng):
+    """A mid-conversation record: some fields answered, some retries."""
+    bot = LegalChatbot()
+    bot.payload_data = {
+        "isTenant?": "Yes",
+        "isSecurity": rng.choice(["Yes", "No", None]),
+        "inStateDefendant?": None,
+        "ClaimAmount": rng.choice([None, 1500])
+    }
+    bot.retry_count = {"isSecurity": 1} if rng.random() < 0.3 else {}
+    bot.is_tenant_security_case = True
+    bot.case_identified = True
+    bot.started = True
+    return bot
+
+
+def measure_live(count):
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    instances = {f"session-{i}": LegalChatbot() for i in range(count)}
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    grown = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    del instances
+    return grown / count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=100000)
+    parser.add_argument("--live", type=int, default=200, help="LegalChatbot instances to measure directly")
+    parser.add_argument("--max-in-memory", type=int, default=1000)
+    parser.add_argument("--lookups", type=int, default=2000)
+    args = parser.parse_args()
+    rng = random.Random(0)
+
+    per_live = measure_live(args.live)
+    print(f"live       {human(per_live)} / session  -> {human(per_live * args.sessions)} for {args.sessions} sessions")
+
+    record = json.dumps(sample_state(rng).to_state(), separators=(",", ":"))
+    print(f"record     {human(len(record))} / session  ({record})")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "legal_sessions.db")
+        store = LegalSessionStore(LegalChatbot, path=path, max_in_memory=args.max_in_memory)
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        for i in range(args.sessions):
+            session_id = f"session-{i}"
+            store.save(session_id, sample_state(rng))
+        write_seconds = time.perf_counter() - start
+
+        latencies = []
+        for _ in range(args.lookups):
+            session_id = f"session-{rng.randrange(args.sessions)}"
+            start = time.perf_counter()
+            store.get(session_id)
+            latencies.append(time.perf_counter() - start)
+        resident, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        db_size = sum(
+            os.path.getsize(os.path.join(tmp, name)) for name in os.listdir(tmp)
+        )
+        latencies.sort()
+        print(f"store      {human(db_size / args.sessions)} / session on disk ({human(db_size)} total, "
+              f"{args.sessions / write_seconds:.0f} saves/s)")
+        print(f"           {human(resident)} resident with {store.stats()['in_memory']} live instances "
+              f"(LRU bound {args.max_in_memory})")
+        print(f"           get() p50={latencies[len(latencies) // 2] * 1000:.2f} ms  "
+              f"p95={latencies[int(len(latencies) * 0.95)] * 1000:.2f} ms (mostly rehydrations)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""/health latency under /query load, against a running API.
+
+Start the API (uvicorn main:app), process a session, then run from back-end/:
+
+    python benchmarks/load_test.py --session-id demo --question "What is the refund policy?"
+    python benchmarks/load_test.py --session-id demo --concurrency 64 --duration 60 --stream
+
+The /health probe runs alone for --baseline seconds, then alongside
+--concurrency workers sending /query (or /query/stream) back to back. With a
+non-blocking request path, /health p95 under load stays close to the
+baseline; a blocking call on the event loop shows up as a jump to the
+length of that call.
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+import numpy as np
+
+
+def summary(samples):
+    if not samples:
+        return "no samples"
+    ms = np.array(samples) * 1000
+    return (
+        f"n={len(ms):<5} p50={np.percentile(ms, 50):8.1f} ms  p95={np.percentile(ms, 95):8.1f} ms  "
+        f"p99={np.percentile(ms, 99):8.1f} ms  max={ms.max():8.1f} ms"
+    )
+
+
+async def probe_health(client, stop, interval, samples):
+    while not stop.is_set():
+        start = time.perf_counter()
+        try:
+            response = await client.get("/health")
+            response.raise_for_status()
+            samples.append(time.perf_counter() - start)
+        except httpx.HTTPError as e:
+            print(f"health probe failed: {e}")
+        await asyncio.sleep(interval)
+
+
+async def query_worker(client, stop, args, latencies, first_tokens, errors):
+    payload = {"question": args.question, "session_id": args.session_id, "is_admin": args.admin}
+    while not stop.is_set():
+        start = time.perf_counter()
+        try:
+            if args.stream:
+                first_token = None
+                async with client.stream("POST", "/query/stream", json=payload) as response:
+                    response.raise_for_status()
+                    async for line in response.aiter_lines():
+                        if first_token is None and line == "event: token":
+                            first_token = time.perf_counter() - start
+                if first_token is not None:
+                    first_tokens.append(first_token)
+            else:
+                response = await client.post("/query", json=payload)
+                response.raise_for_status()
+                if "error" in response.json():
+                    raise RuntimeError(response.json()["error"])
+            latencies.append(time.perf_counter() - start)
+        except Exception as e:
+            errors.append(str(e))
+
+
+async def run(args):
+    timeout = httpx.Timeout(args.request_timeout)
+    limits = httpx.Limits(max_connections=args.concurrency + 4)
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=timeout, limits=limits) as client:
+        baseline = []
+        stop = asyncio.Event()
+        probe = asyncio.create_task(probe_health(client, stop, args.health_interval, baseline))
+        await asyncio.sleep(args.baseline)
+        stop.set()
+        await probe
+
+        loaded, latencies, first_tokens, errors = [], [], [], []
+        stop = asyncio.Event()
+        tasks = [asyncio.create_task(probe_health(client, stop, args.health_interval, loaded))]
+        tasks += [
+            asyncio.create_task(query_worker(client, stop, args, latencies, first_tokens, errors))
+            for _ in range(args.concurrency)
+        ]
+        await asyncio.sleep(args.duration)
+        stop.set()
+        await asyncio.gather(*tasks)
+
+    endpoint = "/query/stream" if args.stream else "/query"
+    print(f"\n/health alone      {summary(baseline)}")
+    print(f"/health under load {summary(loaded)}")
+    print(f"{endpoint:<18} {summary(latencies)}  ({len(latencies) / args.duration:.1f} req/s, {len(errors)} errors)")
+    if args.stream:
+        print(f"{'first token':<18} {summary(first_tokens)}")
+    if errors:
+        print(f"first error: {errors[0]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--session-id", default="default")
+    parser.add_argument("--question", default="What is this document about?")
+    parser.add_argument("--admin", action="store_true", help="send admin (all-namespace) queries")
+    parser.add_argument("--stream", action="store_true", help="use /query/stream and report time to first token")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=30, help="seconds of /query load")
+    parser.add_argument("--baseline", type=float, default=5, help="seconds of /health-only probing first")
+    parser.add_argument("--health-interval", type=float, default=0.1)
+    parser.add_argument("--request-timeout", type=float, default=120)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
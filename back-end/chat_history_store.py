@@ -0,0 +1,170 @@
+import json
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+from langchain_core.chat_history import BaseChatMessageHistory
+from langchain_core.messages import message_to_dict, messages_from_dict
+
+from config import CHAT_HISTORY_DB_PATH
+
+
+class ChatHistoryStore:
+    """All sessions' chat messages in one WAL-mode SQLite database.
+
+    Messages are rows keyed by (session_id, seq), so appending a turn is
+    one small insert and reading the last N messages is an index range
+    scan; neither touches the rest of the conversation. Each session's
+    rolling summary is stored alongside, together with how many messages
+    it covers.
+    """
+
+    def __init__(self, path=CHAT_HISTORY_DB_PATH):
+        self.path = path
+        self._local = threading.local()
+        with self._transaction() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS messages ("
+                " session_id TEXT NOT NULL, seq INTEGER NOT NULL, message TEXT NOT NULL, created_at REAL NOT NULL,"
+                " PRIMARY KEY (session_id, seq)) WITHOUT ROWID"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS summaries ("
+                " session_id TEXT PRIMARY KEY, summary TEXT NOT NULL, summarized_count INTEGER NOT NULL)"
+            )
+
+    def _connection(self):
+        # sqlite3 connections are not shareable across threads; keep one per thread
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _transaction(self):
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    @staticmethod
+    def _decode(rows):
+        return messages_from_dict([json.loads(message) for message, in rows])
+
+    def append(self, session_id, messages):
+        """Append messages in one transaction; returns the session's new message count."""
+        with self._transaction() as conn:
+            next_seq = conn.execute(
+                "SELECT COALESCE(MAX(seq) + 1, 0) FROM messages WHERE session_id = ?", (session_id,)
+            ).fetchone()[0]
+            now = time.time()
+            conn.executemany(
+                "INSERT INTO messages (session_id, seq, message, created_at) VALUES (?, ?, ?, ?)",
+                [
+                    (session_id, next_seq + offset, json.dumps(message_to_dict(message)), now)
+                    for offset, message in enumerate(messages)
+                ]
+            )
+        return next_seq + len(messages)
+
+    def count(self, session_id):
+        return self._connection().execute(
+            "SELECT COALESCE(MAX(seq) + 1, 0) FROM messages WHERE session_id = ?", (session_id,)
+        ).fetchone()[0]
+
+    def recent(self, session_id, limit, start=0):
+        """The last ``limit`` messages with seq >= ``start``, oldest first."""
+        rows = self._connection().execute(
+            "SELECT message FROM (SELECT seq, message FROM messages WHERE session_id = ? AND seq >= ?"
+            " ORDER BY seq DESC LIMIT ?) ORDER BY seq",
+            (session_id, start, limit)
+        ).fetchall()
+        return self._decode(rows)
+
+    def range(self, session_id, start, stop=None):
+        """Messages with start <= seq < stop (to the end when stop is None)."""
+        if stop is None:
+            rows = self._connection().execute(
+                "SELECT message FROM messages WHERE session_id = ? AND seq >= ? ORDER BY seq",
+                (session_id, start)
+            ).fetchall()
+        else:
+            rows = self._connection().execute(
+                "SELECT message FROM messages WHERE session_id = ? AND seq >= ? AND seq < ? ORDER BY seq",
+                (session_id, start, stop)
+            ).fetchall()
+        return self._decode(rows)
+
+    def clear(self, session_id):
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM messages WHERE session_id = ?", (session_id,))
+            conn.execute("DELETE FROM summaries WHERE session_id = ?", (session_id,))
+
+    def get_summary(self, session_id):
+        """Return (summary, number of messages it covers)."""
+        row = self._connection().execute(
+            "SELECT summary, summarized_count FROM summaries WHERE session_id = ?", (session_id,)
+        ).fetchone()
+        return row if row else ("", 0)
+
+    def set_summary(self, session_id, summary, summarized_count):
+        """Store a summary unless one covering at least as many messages already exists."""
+        self._connection().execute(
+            "INSERT INTO summaries (session_id, summary, summarized_count) VALUES (?, ?, ?)"
+            " ON CONFLICT(session_id) DO UPDATE SET summary = excluded.summary,"
+            " summarized_count = excluded.summarized_count"
+            " WHERE excluded.summarized_count > summaries.summarized_count",
+            (session_id, summary, summarized_count)
+        )
+
+    def has_session(self, session_id):
+        return self._connection().execute(
+            "SELECT 1 FROM messages WHERE session_id = ? LIMIT 1", (session_id,)
+        ).fetchone() is not None
+
+
+class SQLiteChatMessageHistory(BaseChatMessageHistory):
+    """LangChain chat history for one session, backed by a ChatHistoryStore."""
+
+    def __init__(self, session_id, store):
+        self.session_id = session_id
+        self.store = store
+
+    @property
+    def messages(self):
+        return self.store.range(self.session_id, 0)
+
+    def add_messages(self, messages):
+        self.store.append(self.session_id, list(messages))
+
+    def clear(self):
+        self.store.clear(self.session_id)
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_chat_history_store():
+    """Return the process-wide ChatHistoryStore."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = ChatHistoryStore()
+    return _store
+
+
+__all__ = [
+    'ChatHistoryStore',
+    'SQLiteChatMessageHistory',
+    'get_chat_history_store'
+]
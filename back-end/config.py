@@ -4,20 +4,117 @@ import os
 # Load .env file
 load_dotenv()
 
+# 📁 Relative paths below resolve against back-end/, not the working directory (Scrapy crawls run from scrapy_web_scraper/)
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def _backend_path(name, default):
+    return os.path.normpath(os.path.join(BACKEND_DIR, os.getenv(name, default)))
+
 # 🔐 API Keys
 HUGGING_FACE_ACCESS_TOKEN = os.getenv("HUGGING_FACE_ACCESS_TOKEN")
 GROK_API_KEY = os.getenv("GROQ_API_KEY")
 PINECONE_API_KEY = os.getenv("PINECONE_API_KEY")
 
+# 🗄️ Vector store backend: "pinecone" (managed) or "local" (in-process NumPy, persisted to disk)
+VECTOR_STORE_BACKEND = os.getenv("VECTOR_STORE_BACKEND", "pinecone")
+LOCAL_VECTOR_STORE_DIR = _backend_path("LOCAL_VECTOR_STORE_DIR", "./vector_store_data")
+LOCAL_MAX_OPEN_NAMESPACES = int(os.getenv("LOCAL_MAX_OPEN_NAMESPACES", "256"))           # memory-mapped namespaces kept open
+LOCAL_SEGMENT_MERGE_FANOUT = int(os.getenv("LOCAL_SEGMENT_MERGE_FANOUT", "4"))  # similar-sized segments merged into one (size-tiered compaction)
+
+# 🕸️ HNSW approximate search for the local backend (needs the optional hnswlib package)
+LOCAL_HNSW_ENABLED = os.getenv("LOCAL_HNSW_ENABLED", "false").lower() == "true"
+LOCAL_GLOBAL_HNSW_ENABLED = os.getenv("LOCAL_GLOBAL_HNSW_ENABLED", "false").lower() == "true"  # one graph over all namespaces for admin search
+HNSW_MIN_VECTORS = int(os.getenv("HNSW_MIN_VECTORS", "20000"))        # namespaces smaller than this stay on exact search
+HNSW_M = int(os.getenv("HNSW_M", "16"))                                # graph degree
+HNSW_EF_CONSTRUCTION = int(os.getenv("HNSW_EF_CONSTRUCTION", "200"))  # build-time candidate list
+HNSW_EF_SEARCH = int(os.getenv("HNSW_EF_SEARCH", "64"))               # query-time candidate list (recall vs latency)
+LOCAL_HNSW_SAVE_INTERVAL = float(os.getenv("LOCAL_HNSW_SAVE_INTERVAL", "30"))  # seconds between graph saves; newer rows are scanned exactly
+
 # 📦 Pinecone Configuration
 INDEX_NAME = "web-content-index"          # 🔁 Consistent name everywhere 
 EMBEDDING_DIM = 384                       # for all-MiniLM-L6-v2
 PINECONE_ENV = "us-east-1"
 PINECONE_CLOUD = "aws"
+PINECONE_POOL_THREADS = int(os.getenv("PINECONE_POOL_THREADS", "8"))
+PINECONE_CONNECTION_POOL_MAXSIZE = int(os.getenv("PINECONE_CONNECTION_POOL_MAXSIZE", "32"))
+
+# 🛡️ Admin cross-namespace search
+ADMIN_SEARCH_CONCURRENCY = int(os.getenv("ADMIN_SEARCH_CONCURRENCY", "16"))       # max namespace queries in flight
+ADMIN_NAMESPACE_TIMEOUT = float(os.getenv("ADMIN_NAMESPACE_TIMEOUT", "5"))         # seconds per namespace query
+ADMIN_TOP_K = int(os.getenv("ADMIN_TOP_K", "10"))                                  # chunks kept after the merge
+
+# 🧵 Request path: blocking vector store, embedding and file work runs on this pool, off the event loop
+BLOCKING_IO_THREADS = int(os.getenv("BLOCKING_IO_THREADS", "32"))
+
+# 📚 Namespace catalog (cached describe_index_stats)
+NAMESPACE_CATALOG_TTL = float(os.getenv("NAMESPACE_CATALOG_TTL", "30"))           # seconds between full refreshes
+NAMESPACE_CATALOG_MISS_REFRESH = float(os.getenv("NAMESPACE_CATALOG_MISS_REFRESH", "5"))  # min age before an unknown namespace forces a refresh
 
 # 🔍 Embedding Model Name
 EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
 
+# ⚙️ Embedding backend: "torch" (sentence-transformers), "onnx" or "onnx-int8" (ONNX Runtime, CPU)
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch")
+ONNX_MODEL_DIR = _backend_path("ONNX_MODEL_DIR", "./onnx_models")   # exported / quantized models are cached here
+ONNX_NUM_THREADS = int(os.getenv("ONNX_NUM_THREADS", "0"))      # 0 = let ONNX Runtime decide
+
+# 🧠 Embedding cache (memory LRU + SQLite), keyed by model name + normalised text
+EMBEDDING_CACHE_PATH = _backend_path("EMBEDDING_CACHE_PATH", "./embedding_cache.db")
+EMBEDDING_CACHE_MEMORY_ITEMS = int(os.getenv("EMBEDDING_CACHE_MEMORY_ITEMS", "50000"))
+
+# 📦 Embedding micro-batching: concurrent calls share one forward pass
+EMBEDDING_BATCH_MAX_SIZE = int(os.getenv("EMBEDDING_BATCH_MAX_SIZE", "64"))          # texts per forward pass
+EMBEDDING_BATCH_MAX_WAIT_MS = float(os.getenv("EMBEDDING_BATCH_MAX_WAIT_MS", "5"))   # how long the first caller waits for company
+
+# 🧾 Prompt context packing
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "3000"))                   # prompt tokens: instructions + context + history + question
+CONTEXT_DEDUP_OVERLAP = float(os.getenv("CONTEXT_DEDUP_OVERLAP", "0.8"))                # shared 5-gram fraction that makes a chunk a duplicate
+CONTEXT_MAX_HISTORY_MESSAGES = int(os.getenv("CONTEXT_MAX_HISTORY_MESSAGES", "5"))      # most recent messages considered
+
+# 🗂️ Session memory: raw turns are appended, old turns are summarised in the background
+CHAT_HISTORY_DB_PATH = _backend_path("CHAT_HISTORY_DB_PATH", "./chat_history.db")    # all sessions, WAL-mode SQLite
+CHAT_HISTORY_DIR = _backend_path("CHAT_HISTORY_DIR", "./chat_histories")              # legacy per-session JSON files (see migrate_chat_histories.py)
+SUMMARY_TOKEN_THRESHOLD = int(os.getenv("SUMMARY_TOKEN_THRESHOLD", "1000"))        # unsummarised tokens that trigger a summary
+SUMMARY_KEEP_RECENT_MESSAGES = int(os.getenv("SUMMARY_KEEP_RECENT_MESSAGES", "6"))  # newest messages always kept verbatim
+
+# ⚖️ Legal chatbot sessions: bounded in-memory LRU, state persisted in SQLite
+LEGAL_SESSION_DB_PATH = _backend_path("LEGAL_SESSION_DB_PATH", "./legal_sessions.db")
+LEGAL_SESSION_MAX_IN_MEMORY = int(os.getenv("LEGAL_SESSION_MAX_IN_MEMORY", "10000"))   # live chatbot instances
+LEGAL_SESSION_IDLE_TTL = float(os.getenv("LEGAL_SESSION_IDLE_TTL", "1800"))            # seconds before an idle session leaves memory
+
+# 💬 Semantic answer cache for /query (per namespace, matched on question embedding)
+ANSWER_CACHE_ENABLED = os.getenv("ANSWER_CACHE_ENABLED", "true").lower() == "true"
+ANSWER_CACHE_THRESHOLD = float(os.getenv("ANSWER_CACHE_THRESHOLD", "0.95"))      # min cosine similarity for a hit
+ANSWER_CACHE_TTL = float(os.getenv("ANSWER_CACHE_TTL", "3600"))                  # seconds an answer stays valid
+ANSWER_CACHE_MAX_ENTRIES = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "256"))     # answers kept per namespace
+ANSWER_CACHE_MAX_NAMESPACES = int(os.getenv("ANSWER_CACHE_MAX_NAMESPACES", "1024"))
+
+# 🔔 Upsert journal: crawls and other workers record upserts so every API process can invalidate its caches
+INDEX_UPDATES_DB_PATH = _backend_path("INDEX_UPDATES_DB_PATH", "./index_updates.db")
+INDEX_UPDATES_POLL_INTERVAL = float(os.getenv("INDEX_UPDATES_POLL_INTERVAL", "2"))    # seconds between journal reads
+INDEX_UPDATES_RETENTION = float(os.getenv("INDEX_UPDATES_RETENTION", "3600"))         # seconds an entry is kept
+
+# 📥 Background ingestion jobs (/process returns a job ID, /jobs/{id} reports progress)
+INGESTION_DB_PATH = _backend_path("INGESTION_DB_PATH", "./ingestion_jobs.db")       # job table, also the queue
+INGESTION_UPLOAD_DIR = _backend_path("INGESTION_UPLOAD_DIR", "./ingestion_uploads")  # uploaded PDFs kept until their job finishes
+INGESTION_WORKERS = int(os.getenv("INGESTION_WORKERS", "2"))                     # jobs processed at once
+INGESTION_HEARTBEAT_INTERVAL = float(os.getenv("INGESTION_HEARTBEAT_INTERVAL", "10"))  # seconds between heartbeats of running jobs
+INGESTION_STALE_AFTER = float(os.getenv("INGESTION_STALE_AFTER", "60"))          # a running job without a heartbeat this long is failed
+INGESTION_UPSERT_BATCH = int(os.getenv("INGESTION_UPSERT_BATCH", "128"))         # chunks embedded and upserted per step
+INGESTION_BATCH_MAX_WAIT = float(os.getenv("INGESTION_BATCH_MAX_WAIT", "2"))     # seconds before a partial batch is embedded anyway
+INGESTION_PAGE_QUEUE_SIZE = int(os.getenv("INGESTION_PAGE_QUEUE_SIZE", "16"))    # scraped pages buffered ahead of chunking
+CRAWLER_SERVICE_ENABLED = os.getenv("CRAWLER_SERVICE_ENABLED", "true").lower() == "true"  # one long-lived Scrapy process instead of `scrapy crawl` per URL
+CRAWLER_STREAM_CREDITS = int(os.getenv("CRAWLER_STREAM_CREDITS", "32"))       # items a crawl may send ahead of its consumer before it pauses
+CRAWLER_EMBED_UPSERT = os.getenv("CRAWLER_EMBED_UPSERT", "false").lower() == "true"  # crawler process embeds and upserts URL pages itself (EmbedUpsertPipeline; loads the embedding model there too)
+
+# 🤖 LLM clients (shared per provider/model/params, one keep-alive HTTP pool)
+GROQ_BASE_URL = "https://api.groq.com/openai/v1"
+OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
+LLM_HTTP_MAX_CONNECTIONS = int(os.getenv("LLM_HTTP_MAX_CONNECTIONS", "64"))
+LLM_HTTP_KEEPALIVE_CONNECTIONS = int(os.getenv("LLM_HTTP_KEEPALIVE_CONNECTIONS", "32"))
+LLM_HTTP_KEEPALIVE_EXPIRY = float(os.getenv("LLM_HTTP_KEEPALIVE_EXPIRY", "120"))   # seconds an idle connection stays open
+LLM_PROBE_ON_STARTUP = os.getenv("LLM_PROBE_ON_STARTUP", "true").lower() == "true"  # one test completion per client at startup
+
 # ✅ Print checks (optional for dev)
 if HUGGING_FACE_ACCESS_TOKEN is None:
     print("❌ HUGGING_FACE_ACCESS_TOKEN not found.")
@@ -0,0 +1,105 @@
+import re
+
+from config import CONTEXT_TOKEN_BUDGET, CONTEXT_DEDUP_OVERLAP, CONTEXT_MAX_HISTORY_MESSAGES
+
+try:
+    import tiktoken
+    _encoding = tiktoken.get_encoding("cl100k_base")
+except Exception:  # optional: without tiktoken (or its cached BPE file) fall back to an estimate
+    _encoding = None
+
+SHINGLE_SIZE = 5
+
+
+def count_tokens(text):
+    """Token count of ``text``; cl100k_base when tiktoken is available, else ~4 characters per token."""
+    if not text:
+        return 0
+    if _encoding is not None:
+        return len(_encoding.encode(text, disallowed_special=()))
+    return max(1, len(text) // 4)
+
+
+def _shingles(text):
+    words = re.findall(r"\w+", text.lower())
+    if len(words) < SHINGLE_SIZE:
+        return {tuple(words)} if words else set()
+    return {tuple(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+
+
+def deduplicate(docs, max_overlap=CONTEXT_DEDUP_OVERLAP):
+    """Drop chunks whose word 5-grams mostly appear in a chunk kept before them.
+
+    Overlap is measured against the smaller chunk, so a chunk contained in
+    another (splitter overlap, the same page ingested into two sessions)
+    counts as a duplicate. ``docs`` must be ordered best first.
+    """
+    kept, kept_shingles = [], []
+    for doc in docs:
+        shingles = _shingles(doc.page_content)
+        duplicate = any(
+            shingles and other and len(shingles & other) / min(len(shingles), len(other)) >= max_overlap
+            for other in kept_shingles
+        )
+        if not duplicate:
+            kept.append(doc)
+            kept_shingles.append(shingles)
+    return kept
+
+
+def pack_context(docs, history, fixed_text, format_chunk=None, budget=CONTEXT_TOKEN_BUDGET,
+                 max_history_messages=CONTEXT_MAX_HISTORY_MESSAGES):
+    """Choose the chunks and history messages that fit a prompt token budget.
+
+    ``docs`` are ordered best first. ``fixed_text`` is everything that is
+    always sent (system instructions and the question). After
+    deduplication, chunks are packed by rank into the budget, skipping any
+    that do not fit. History gets what is left, newest message first, so
+    when the prompt is too large it is trimmed before context is.
+
+    Returns (chunks, history, usage), where usage breaks down prompt tokens.
+    """
+    format_chunk = format_chunk or (lambda doc: doc.page_content)
+    fixed_tokens = count_tokens(fixed_text)
+    remaining = budget - fixed_tokens
+
+    unique = deduplicate(docs)
+    chunks, context_tokens = [], 0
+    for doc in unique:
+        # +1 for the blank-line separator between chunks
+        tokens = count_tokens(format_chunk(doc)) + 1
+        if tokens <= remaining:
+            chunks.append(doc)
+            context_tokens += tokens
+            remaining -= tokens
+
+    kept_history, history_tokens = [], 0
+    for message in reversed(list(history)[-max_history_messages:]):
+        tokens = count_tokens(message.content) + 4  # role marker and separators
+        if tokens > remaining:
+            break
+        kept_history.insert(0, message)
+        history_tokens += tokens
+        remaining -= tokens
+
+    usage = {
+        "budget": budget,
+        "fixed_tokens": fixed_tokens,
+        "context_tokens": context_tokens,
+        "history_tokens": history_tokens,
+        "prompt_tokens": fixed_tokens + context_tokens + history_tokens,
+        "chunks_retrieved": len(docs),
+        "chunks_deduplicated": len(docs) - len(unique),
+        "chunks_used": len(chunks),
+        "history_messages_used": len(kept_history),
+        "history_messages_dropped": len(history) - len(kept_history),
+        "exact_count": _encoding is not None
+    }
+    return chunks, kept_history, usage
+
+
+__all__ = [
+    'count_tokens',
+    'deduplicate',
+    'pack_context'
+]
@@ -0,0 +1,298 @@
+import asyncio
+import multiprocessing
+import os
+import queue
+import sys
+import threading
+import uuid
+from collections import deque
+
+from config import CRAWLER_STREAM_CREDITS
+from web_scraper import SCRAPY_PROJECT_DIR
+
+
+def _run_crawler_worker(jobs, events):
+    """Crawler process: one Twisted reactor and CrawlerRunner serving crawl jobs until told to stop.
+
+    Reads ("crawl", job_id, url, credits, namespace), ("credit", job_id, n),
+    ("cancel", job_id) and ("stop",) from ``jobs``; sends
+    ("item", job_id, item) for every scraped item and
+    ("done", job_id, error or None) when a crawl ends. A crawl with a
+    namespace is also indexed by EmbedUpsertPipeline in this process and
+    sends ("indexed", job_id, chunks upserted) just before "done".
+
+    A crawl sends at most as many items as it has credits; the parent
+    returns credits as its consumer takes items. Without credit, an item
+    is held and so is Scrapy's scraper slot, which stops the engine from
+    scheduling more responses for that crawl until credit arrives.
+    """
+    os.chdir(SCRAPY_PROJECT_DIR)
+    sys.path.insert(0, SCRAPY_PROJECT_DIR)
+    os.environ.setdefault("SCRAPY_SETTINGS_MODULE", "scrapy_web_scraper.settings")
+
+    from scrapy.utils.project import get_project_settings
+    from scrapy.utils.log import configure_logging
+    from scrapy.utils.reactor import install_reactor
+
+    settings = get_project_settings()
+    # Items and indexing outcomes go back over the queue, not into per-crawl files
+    settings.set("FEEDS", {}, priority="cmdline")
+    settings.set("CRAWLS_DIR", None, priority="cmdline")
+    settings.set("LOG_LEVEL", "WARNING", priority="cmdline")
+    if settings.get("TWISTED_REACTOR"):
+        install_reactor(settings.get("TWISTED_REACTOR"))
+    configure_logging(settings)
+
+    from twisted.internet import reactor
+    from twisted.internet.defer import Deferred
+    from twisted.python.failure import Failure
+    from scrapy import signals
+    from scrapy.crawler import CrawlerRunner
+    from scrapy_web_scraper.spiders.universal_spider import UniversalSpider
+
+    runner = CrawlerRunner(settings)
+    crawlers = {}
+    credits = {}  # job_id -> items the parent can still take
+    held = {}     # job_id -> deque of (Deferred, item) waiting for credit
+
+    def start_crawl(job_id, start_url, initial_credits, namespace):
+        crawler = runner.create_crawler(UniversalSpider)
+        crawlers[job_id] = crawler
+        credits[job_id] = initial_credits
+        held[job_id] = deque()
+
+        def on_item(item, response, spider):
+            if job_id not in credits:
+                return None  # cancelled; the parent no longer reads this crawl
+            if credits[job_id] > 0:
+                credits[job_id] -= 1
+                events.put(("item", job_id, dict(item)))
+                return None
+            # item_scraped handlers may return a Deferred; Scrapy waits for it before freeing the slot
+            waiter = Deferred()
+            held[job_id].append((waiter, dict(item)))
+            return waiter
+
+        def on_finished(result):
+            crawlers.pop(job_id, None)
+            release(job_id)
+            error = result.getErrorMessage() if isinstance(result, Failure) else None
+            if namespace:
+                if error is None and crawler.stats.get_value("finish_reason") == "embed_upsert_failed":
+                    error = f"Indexing into namespace '{namespace}' failed"
+                events.put(("indexed", job_id, crawler.stats.get_value("embed_upsert/chunks", 0)))
+            events.put(("done", job_id, error))
+
+        crawler.signals.connect(on_item, signal=signals.item_scraped, weak=False)
+        runner.crawl(crawler, start_url=start_url, namespace=namespace).addBoth(on_finished)
+
+    def add_credit(job_id, amount):
+        if job_id not in credits:
+            return
+        credits[job_id] += amount
+        waiting = held[job_id]
+        while waiting and credits[job_id] > 0:
+            waiter, item = waiting.popleft()
+            credits[job_id] -= 1
+            events.put(("item", job_id, item))
+            waiter.callback(None)
+
+    def release(job_id):
+        """Stop metering a crawl, dropping its held items so it can close."""
+        credits.pop(job_id, None)
+        for waiter, _ in held.pop(job_id, ()):
+            waiter.callback(None)
+
+    def cancel_crawl(job_id):
+        release(job_id)
+        crawler = crawlers.get(job_id)
+        if crawler is not None:
+            crawler.stop()
+
+    def shutdown():
+        runner.stop().addBoth(lambda _: reactor.stop())
+
+    def read_jobs():
+        while True:
+            message = jobs.get()
+            if message[0] == "crawl":
+                reactor.callFromThread(start_crawl, *message[1:])
+            elif message[0] == "credit":
+                reactor.callFromThread(add_credit, message[1], message[2])
+            elif message[0] == "cancel":
+                reactor.callFromThread(cancel_crawl, message[1])
+            elif message[0] == "stop":
+                reactor.callFromThread(shutdown)
+                return
+
+    threading.Thread(target=read_jobs, name="crawler-jobs", daemon=True).start()
+    reactor.run(installSignalHandlers=False)
+
+
+class CrawlerService:
+    """Long-lived crawler process shared by every URL ingestion.
+
+    Scrapy and Twisted start once, in a worker process running
+    UniversalSpider through CrawlerRunner, instead of once per URL in a
+    ``scrapy crawl`` subprocess. Crawl jobs go to it over a
+    multiprocessing queue and scraped items come straight back, so
+    crawl() yields items as they are scraped and any number of crawls
+    share the reactor. Each crawl is metered by ``credits``: the worker
+    sends no more items than the consumer has room for, so a slow consumer
+    pauses its crawl instead of filling the queues. The worker is
+    restarted if it dies; only the crawls it was running fail.
+
+    crawl(namespace=...) also embeds and upserts the pages inside the
+    worker through EmbedUpsertPipeline, which journals every batch in
+    IndexUpdateLog for the API processes to apply.
+    """
+
+    def __init__(self, credits=CRAWLER_STREAM_CREDITS):
+        self.credits = credits
+        self._context = multiprocessing.get_context("spawn")
+        self._process = None
+        self._jobs = None
+        self._events = None
+        self._streams = {}  # job_id -> (loop, asyncio.Queue, worker process)
+        self._lock = threading.Lock()
+        self.crawls_started = 0
+        self.items_received = 0
+        self.restarts = 0
+
+    @property
+    def is_running(self):
+        return self._process is not None and self._process.is_alive()
+
+    def start(self):
+        """Start the worker process if it is not running (blocking: spawning takes a moment)."""
+        with self._lock:
+            if self.is_running:
+                return
+            if self._process is not None:
+                self.restarts += 1
+                print("⚠️ Crawler process exited; restarting it")
+            self._jobs = self._context.Queue()
+            self._events = self._context.Queue()
+            self._process = self._context.Process(
+                target=_run_crawler_worker, args=(self._jobs, self._events), name="crawler-service", daemon=True
+            )
+            self._process.start()
+            threading.Thread(
+                target=self._dispatch, args=(self._process, self._events), name="crawler-events", daemon=True
+            ).start()
+            print(f"🕷️ Crawler service started (pid {self._process.pid})")
+
+    def _dispatch(self, process, events):
+        """Route worker events to the crawl() waiting on them; fail that worker's crawls if it dies."""
+        while True:
+            try:
+                kind, job_id, payload = events.get(timeout=1)
+            except queue.Empty:
+                if process.is_alive():
+                    continue
+                for job_id, (_, _, owner) in list(self._streams.items()):
+                    # Crawls started on a restarted worker are not affected
+                    if owner is process:
+                        self._deliver(job_id, ("done", "Crawler process exited"))
+                return
+            if kind == "item":
+                self.items_received += 1
+            self._deliver(job_id, (kind, payload))
+
+    def _deliver(self, job_id, event):
+        stream = self._streams.get(job_id)
+        if stream is not None:
+            loop, events, _ = stream
+            loop.call_soon_threadsafe(events.put_nowait, event)
+
+    async def crawl(self, start_url, timeout=120, namespace=None, outcome=None):
+        """Crawl ``start_url`` and yield each scraped item; closing the generator cancels the crawl.
+
+        With ``namespace`` the worker also indexes the items into it, a
+        failed upsert fails the crawl, and ``outcome["indexed"]`` is set to
+        the number of chunks upserted once the crawl ends.
+        """
+        loop = asyncio.get_running_loop()
+        if not self.is_running:
+            await loop.run_in_executor(None, self.start)
+        job_id = uuid.uuid4().hex
+        # Never more than `credits` items plus the indexed and done events in flight, so put_nowait cannot overflow
+        events = asyncio.Queue(maxsize=self.credits + 2)
+        with self._lock:
+            process, jobs = self._process, self._jobs
+            self._streams[job_id] = (loop, events, process)
+        jobs.put(("crawl", job_id, start_url, self.credits, namespace))
+        self.crawls_started += 1
+
+        deadline = loop.time() + timeout
+        credit_batch = max(1, self.credits // 2)
+        consumed = 0
+        finished = False
+        try:
+            while True:
+                try:
+                    kind, payload = await asyncio.wait_for(events.get(), timeout=max(0, deadline - loop.time()))
+                except asyncio.TimeoutError:
+                    raise TimeoutError(f"Crawl timed out after {timeout} seconds")
+                if kind == "item":
+                    yield payload
+                    # The consumer took it; return credits in batches rather than per item
+                    consumed += 1
+                    if consumed >= credit_batch:
+                        jobs.put(("credit", job_id, consumed))
+                        consumed = 0
+                    continue
+                if kind == "indexed":
+                    if outcome is not None:
+                        outcome["indexed"] = payload
+                    continue
+                finished = True
+                if payload:
+                    raise RuntimeError(f"Crawl failed: {payload}")
+                return
+        finally:
+            self._streams.pop(job_id, None)
+            if not finished and process.is_alive():
+                jobs.put(("cancel", job_id))
+
+    def close(self):
+        """Stop the worker process, letting running crawls shut down cleanly first."""
+        with self._lock:
+            if self._process is None:
+                return
+            if self._process.is_alive():
+                self._jobs.put(("stop",))
+                self._process.join(timeout=10)
+            if self._process.is_alive():
+                self._process.terminate()
+            self._process = None
+
+    def stats(self):
+        return {
+            "running": self.is_running,
+            "pid": self._process.pid if self._process is not None else None,
+            "active_crawls": len(self._streams),
+            "crawls_started": self.crawls_started,
+            "items_received": self.items_received,
+            "restarts": self.restarts
+        }
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_crawler_service():
+    """Return the process-wide CrawlerService (the worker starts on first crawl or start())."""
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                _service = CrawlerService()
+    return _service
+
+
+__all__ = [
+    'CrawlerService',
+    'get_crawler_service'
+]
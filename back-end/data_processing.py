@@ -2,35 +2,45 @@ import os
 import re
 import json
 from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_community.vectorstores import Pinecone as PineconeLangChain
-from langchain_community.chat_message_histories import FileChatMessageHistory
-from langchain_huggingface import HuggingFaceEmbeddings
 from langchain.memory import ConversationSummaryMemory
 from langchain_core.documents import Document
-from pinecone import Pinecone
 from rag_pipeline import get_local_chat_llm
-from config import (
-    INDEX_NAME,
-    EMBEDDING_DIM,
-    PINECONE_ENV,
-    PINECONE_CLOUD,
-    PINECONE_API_KEY,
-    EMBEDDING_MODEL
-)
-
-def process_scraped_data():
+from vector_store import get_pinecone_gateway, get_vector_store
+from embedding_provider import get_embeddings
+from chat_history_store import SQLiteChatMessageHistory, get_chat_history_store
+from web_scraper import MANIFEST_NAME, list_shards, open_shard
+
+def process_scraped_data(crawl_dir):
+    """Yield a crawl's scraped items one at a time from its JSON Lines shards.
+
+    ``crawl_dir`` is the directory returned by web_scraper.run_scrapy_spider;
+    shards are read in manifest order (or name order if the manifest is
+    missing), gzipped ones included, so memory stays flat however large
+    the crawl.
+    """
     try:
-        with open("output.json", "r", encoding="utf-8") as f:
-            data = json.load(f)
-        print(f"[DEBUG] 🔍 Extracted {len(data)} items from output.json")
-        return data
+        manifest_path = os.path.join(crawl_dir, MANIFEST_NAME)
+        if os.path.exists(manifest_path):
+            with open(manifest_path, "r", encoding="utf-8") as f:
+                shards = [shard["file"] for shard in json.load(f)["shards"]]
+        else:
+            shards = list_shards(crawl_dir)
     except Exception as e:
         print(f"[ERROR] Failed to load scraped data: {e}")
-        return []
+        return
+
+    count = 0
+    for name in shards:
+        with open_shard(os.path.join(crawl_dir, name)) as f:
+            for line in f:
+                if line.strip():
+                    count += 1
+                    yield json.loads(line)
+    print(f"[DEBUG] 🔍 Extracted {count} items from {crawl_dir}")
 
 
-# Initialize embeddings using centralized config
-embeddings = HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL)
+# Shared with main.py; the model itself loads on first use
+embeddings = get_embeddings()
 
 def clean_scraped_text(text):
     """Clean scraped text by removing metadata and special characters."""
@@ -73,51 +83,28 @@ def chunk_text(text: str, chunk_size: int = 500, chunk_overlap: int = 50):
         return None
 
 def initialize_pinecone():
-    """Initialize Pinecone connection and index."""
+    """Return the shared Pinecone client, creating the index on first use."""
     try:
-        if not PINECONE_API_KEY:
-            raise ValueError("Pinecone API key not found")
-
-        pc = Pinecone(api_key=PINECONE_API_KEY)
-
-        if INDEX_NAME not in pc.list_indexes().names():
-            pc.create_index(
-                name=INDEX_NAME,
-                dimension=EMBEDDING_DIM,
-                metric="cosine",
-                spec={
-                    "serverless": {
-                        "cloud": PINECONE_CLOUD,
-                        "region": PINECONE_ENV
-                    }
-                }
-            )
-        return pc
+        return get_pinecone_gateway().client
     except Exception as e:
         print(f"Error initializing Pinecone: {str(e)}")
         return None
 
-def create_vector_store(chunks):
-    """Create and return Pinecone vector store."""
+def create_vector_store(chunks, namespace="default"):
+    """Upsert chunks into a namespace ("default", like the API's default session) and return the vector store."""
     try:
-        pc = initialize_pinecone()
-        if not pc:
-            raise Exception("Pinecone initialization failed")
-
-        return PineconeLangChain.from_documents(
+        return get_vector_store().upsert_documents(
             documents=chunks,
             embedding=embeddings,
-            index_name=INDEX_NAME
+            namespace=namespace
         )
     except Exception as e:
         print(f"Error creating vector store: {str(e)}")
         return None
 
 def get_file_history(session_id: str):
-    """Get file-based chat message history."""
-    os.makedirs("./chat_histories", exist_ok=True)
-    file_path = f"./chat_histories/{session_id}.json"
-    return FileChatMessageHistory(file_path)
+    """Get the session's chat message history from the shared SQLite store."""
+    return SQLiteChatMessageHistory(session_id, get_chat_history_store())
 
 def get_summary_memory(session_id: str):
     """Create conversation summary memory."""
@@ -133,6 +120,7 @@ def get_summary_memory(session_id: str):
 
 # Explicitly export the embeddings object
 __all__ = [
+    'process_scraped_data',
     'clean_scraped_text',
     'chunk_text',
     'create_vector_store',
@@ -0,0 +1,129 @@
+import os
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from langchain_huggingface import HuggingFaceEmbeddings
+
+from config import (
+    EMBEDDING_MODEL,
+    EMBEDDING_DIM,
+    EMBEDDING_BACKEND,
+    ONNX_MODEL_DIR,
+    ONNX_NUM_THREADS
+)
+
+try:
+    import onnxruntime
+    from transformers import AutoTokenizer
+except ImportError:  # optional: only needed for the onnx backends
+    onnxruntime = None
+    AutoTokenizer = None
+
+ONNX_FILE = "model.onnx"
+QUANTIZED_ONNX_FILE = "model_quantized.onnx"
+
+
+def export_onnx_model(model_name, model_dir, quantize=False):
+    """Export a sentence-transformers checkpoint to ONNX (and int8) once, with optimum."""
+    from optimum.onnxruntime import ORTModelForFeatureExtraction, ORTQuantizer
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+
+    if not os.path.exists(os.path.join(model_dir, ONNX_FILE)):
+        print(f"📦 Exporting {model_name} to ONNX in {model_dir}")
+        model = ORTModelForFeatureExtraction.from_pretrained(model_name, export=True)
+        model.save_pretrained(model_dir)
+        AutoTokenizer.from_pretrained(model_name).save_pretrained(model_dir)
+
+    if quantize and not os.path.exists(os.path.join(model_dir, QUANTIZED_ONNX_FILE)):
+        print(f"📦 Quantizing {model_name} to dynamic int8")
+        quantizer = ORTQuantizer.from_pretrained(model_dir, file_name=ONNX_FILE)
+        quantization_config = AutoQuantizationConfig.avx2(is_static=False, per_channel=False)
+        quantizer.quantize(save_dir=model_dir, quantization_config=quantization_config)
+
+
+class OnnxEmbeddings(Embeddings):
+    """Sentence embeddings computed with ONNX Runtime on CPU.
+
+    Reproduces the all-MiniLM-L6-v2 sentence-transformers pipeline (mean
+    pooling over the attention mask, then L2 normalisation) on an exported
+    ONNX graph. With ``quantize`` the dynamically int8-quantized graph is
+    used, which is several times faster on CPU-only machines.
+    """
+
+    def __init__(self, model_name=EMBEDDING_MODEL, quantize=False, model_dir=None,
+                 batch_size=32, max_length=256, num_threads=ONNX_NUM_THREADS):
+        if onnxruntime is None:
+            raise ImportError("The onnx embedding backends need onnxruntime, transformers and optimum[onnxruntime]")
+
+        self.model_name = model_name
+        self.model_dir = model_dir or os.path.join(ONNX_MODEL_DIR, model_name.replace("/", "__"))
+        self.batch_size = batch_size
+        self.max_length = max_length
+        export_onnx_model(model_name, self.model_dir, quantize=quantize)
+
+        options = onnxruntime.SessionOptions()
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+        model_file = QUANTIZED_ONNX_FILE if quantize else ONNX_FILE
+        self.session = onnxruntime.InferenceSession(
+            os.path.join(self.model_dir, model_file),
+            sess_options=options,
+            providers=["CPUExecutionProvider"]
+        )
+        self.input_names = {model_input.name for model_input in self.session.get_inputs()}
+        self.tokenizer = AutoTokenizer.from_pretrained(self.model_dir)
+
+        dimension = len(self.embed_query("dimension check"))
+        if dimension != EMBEDDING_DIM:
+            raise ValueError(f"{model_file} produces {dimension}-d vectors, EMBEDDING_DIM is {EMBEDDING_DIM}")
+
+    def _embed_batch(self, texts):
+        encoded = self.tokenizer(
+            texts,
+            padding=True,
+            truncation=True,
+            max_length=self.max_length,
+            return_tensors="np"
+        )
+        inputs = {name: value.astype(np.int64) for name, value in encoded.items() if name in self.input_names}
+        token_embeddings = self.session.run(None, inputs)[0]
+
+        # Mean pooling over real tokens, as sentence-transformers does
+        mask = encoded["attention_mask"][..., None].astype(np.float32)
+        summed = (token_embeddings * mask).sum(axis=1)
+        pooled = summed / np.clip(mask.sum(axis=1), 1e-9, None)
+        norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+        return (pooled / np.clip(norms, 1e-12, None)).tolist()
+
+    def embed_documents(self, texts):
+        vectors = []
+        for start in range(0, len(texts), self.batch_size):
+            vectors.extend(self._embed_batch(list(texts[start:start + self.batch_size])))
+        return vectors
+
+    def embed_query(self, text):
+        return self._embed_batch([text])[0]
+
+
+def load_embedding_model(backend=EMBEDDING_BACKEND, model_name=EMBEDDING_MODEL):
+    """Build the embeddings model for the configured backend.
+
+    "torch" is the sentence-transformers model behind HuggingFaceEmbeddings,
+    "onnx" the same weights on ONNX Runtime, "onnx-int8" the dynamically
+    int8-quantized ONNX graph.
+    """
+    print(f"🧮 Loading embedding model {model_name} with backend '{backend}'")
+    if backend == "torch":
+        return HuggingFaceEmbeddings(model_name=model_name)
+    if backend == "onnx":
+        return OnnxEmbeddings(model_name=model_name)
+    if backend == "onnx-int8":
+        return OnnxEmbeddings(model_name=model_name, quantize=True)
+    raise ValueError(f"Unknown EMBEDDING_BACKEND: {backend}")
+
+
+__all__ = [
+    'OnnxEmbeddings',
+    'load_embedding_model',
+    'export_onnx_model'
+]
@@ -0,0 +1,153 @@
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from langchain_core.embeddings import Embeddings
+
+from config import EMBEDDING_BATCH_MAX_SIZE, EMBEDDING_BATCH_MAX_WAIT_MS
+
+
+class _Request:
+    __slots__ = ("kind", "texts", "future")
+
+    def __init__(self, kind, texts):
+        self.kind = kind
+        self.texts = texts
+        self.future = Future()
+
+
+class BatchingEmbeddings(Embeddings):
+    """Dynamic micro-batching scheduler in front of an embeddings model.
+
+    Concurrent embed_query / embed_documents calls are queued. A single
+    worker thread waits up to ``max_wait_ms`` after the first request, or
+    until ``max_batch_size`` texts are pending. It then runs one batched
+    forward pass and resolves each caller's future with its slice. Large
+    document requests are split into batch-sized pieces, so queries can
+    interleave with them instead of waiting behind a whole ingestion.
+
+    With ``queries_as_documents`` (right for sentence-transformers models,
+    where embed_query is embed_documents on one text), queries and document
+    chunks share a forward pass. Otherwise each kind gets its own call.
+    """
+
+    def __init__(self, embeddings, max_batch_size=EMBEDDING_BATCH_MAX_SIZE,
+                 max_wait_ms=EMBEDDING_BATCH_MAX_WAIT_MS, queries_as_documents=True):
+        self.embeddings = embeddings
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.queries_as_documents = queries_as_documents
+        self._queue = queue.Queue()
+        self._carry = None
+        self._worker = None
+        self._worker_lock = threading.Lock()
+        self.batches = 0
+        self.texts = 0
+        self.largest_batch = 0
+
+    def _ensure_worker(self):
+        if self._worker is None:
+            with self._worker_lock:
+                if self._worker is None:
+                    self._worker = threading.Thread(target=self._run, name="embedding-batcher", daemon=True)
+                    self._worker.start()
+
+    def _submit(self, kind, texts):
+        self._ensure_worker()
+        request = _Request(kind, texts)
+        self._queue.put(request)
+        return request.future
+
+    def _collect(self):
+        """Block for the first request, then gather more until the batch is full or the window closes."""
+        first, self._carry = self._carry, None
+        batch = [first or self._queue.get()]
+        size = len(batch[0].texts)
+        deadline = time.monotonic() + self.max_wait
+        while size < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                request = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if size + len(request.texts) > self.max_batch_size:
+                # Would overflow the batch; it opens the next one instead
+                self._carry = request
+                break
+            batch.append(request)
+            size += len(request.texts)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            if self.queries_as_documents:
+                groups = [batch]
+            else:
+                groups = [[r for r in batch if r.kind == kind] for kind in ("query", "document")]
+            for group in groups:
+                if group:
+                    self._execute(group)
+
+    def _execute(self, group):
+        texts = [text for request in group for text in request.texts]
+        try:
+            if group[0].kind == "query" and not self.queries_as_documents:
+                vectors = [self.embeddings.embed_query(text) for text in texts]
+            else:
+                vectors = self.embeddings.embed_documents(texts)
+        except Exception as e:
+            for request in group:
+                request.future.set_exception(e)
+            return
+
+        self.batches += 1
+        self.texts += len(texts)
+        self.largest_batch = max(self.largest_batch, len(texts))
+        position = 0
+        for request in group:
+            count = len(request.texts)
+            request.future.set_result(vectors[position:position + count])
+            position += count
+
+    def _document_futures(self, texts):
+        return [
+            self._submit("document", texts[start:start + self.max_batch_size])
+            for start in range(0, len(texts), self.max_batch_size)
+        ]
+
+    def embed_documents(self, texts):
+        vectors = []
+        for future in self._document_futures(list(texts)):
+            vectors.extend(future.result())
+        return vectors
+
+    def embed_query(self, text):
+        return self._submit("query", [text]).result()[0]
+
+    async def aembed_documents(self, texts):
+        vectors = []
+        for future in self._document_futures(list(texts)):
+            vectors.extend(await asyncio.wrap_future(future))
+        return vectors
+
+    async def aembed_query(self, text):
+        return (await asyncio.wrap_future(self._submit("query", [text])))[0]
+
+    def stats(self):
+        return {
+            "batches": self.batches,
+            "texts": self.texts,
+            "average_batch_size": round(self.texts / self.batches, 2) if self.batches else 0.0,
+            "largest_batch": self.largest_batch,
+            "queued_requests": self._queue.qsize()
+        }
+
+
+__all__ = [
+    'BatchingEmbeddings'
+]
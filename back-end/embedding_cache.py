@@ -0,0 +1,151 @@
+import hashlib
+import re
+import sqlite3
+import threading
+import unicodedata
+from collections import OrderedDict
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from config import EMBEDDING_MODEL, EMBEDDING_BACKEND, EMBEDDING_CACHE_PATH, EMBEDDING_CACHE_MEMORY_ITEMS
+
+# SQLite limits the number of bound parameters per statement
+SQLITE_BATCH = 500
+
+# Quantized backends produce slightly different vectors, so they get their own keys
+CACHE_MODEL_NAME = EMBEDDING_MODEL if EMBEDDING_BACKEND == "torch" else f"{EMBEDDING_MODEL}:{EMBEDDING_BACKEND}"
+
+
+def normalize_text(text):
+    """Canonical form used for cache keys: NFC, collapsed whitespace, stripped."""
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFC", text)).strip()
+
+
+class CachedEmbeddings(Embeddings):
+    """Two-tier cache in front of an embeddings model.
+
+    Vectors are keyed by a SHA-256 of model name, call kind (query or
+    document) and normalised text. Lookups check a bounded in-memory LRU
+    first, then a SQLite table, and only the remaining misses go to the
+    model, in a single batch. Re-ingesting unchanged content therefore skips
+    the forward passes entirely.
+    """
+
+    def __init__(self, embeddings, model_name=CACHE_MODEL_NAME, path=EMBEDDING_CACHE_PATH,
+                 max_memory_items=EMBEDDING_CACHE_MEMORY_ITEMS):
+        self.embeddings = embeddings
+        self.model_name = model_name
+        self.path = path
+        self.max_memory_items = max_memory_items
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        with self._connection() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)"
+            )
+
+    def _connection(self):
+        # sqlite3 connections are not shareable across threads; keep one per thread
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _key(self, kind, text):
+        payload = f"{self.model_name}\0{kind}\0{normalize_text(text)}".encode("utf-8")
+        return hashlib.sha256(payload).hexdigest()
+
+    def _remember(self, key, vector):
+        with self._lock:
+            self._memory[key] = vector
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_memory_items:
+                self._memory.popitem(last=False)
+
+    def _lookup(self, keys):
+        """Resolve keys from memory, then SQLite; returns {key: vector} for hits."""
+        found = {}
+        with self._lock:
+            for key in keys:
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    found[key] = vector
+        self.memory_hits += len(found)
+
+        remaining = [key for key in dict.fromkeys(keys) if key not in found]
+        conn = self._connection()
+        for start in range(0, len(remaining), SQLITE_BATCH):
+            batch = remaining[start:start + SQLITE_BATCH]
+            rows = conn.execute(
+                f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(batch))})",
+                batch
+            ).fetchall()
+            for key, blob in rows:
+                vector = np.frombuffer(blob, dtype=np.float32).tolist()
+                found[key] = vector
+                self._remember(key, vector)
+                self.disk_hits += 1
+        return found
+
+    def _store(self, items):
+        conn = self._connection()
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                [(key, np.asarray(vector, dtype=np.float32).tobytes()) for key, vector in items]
+            )
+        for key, vector in items:
+            self._remember(key, vector)
+
+    def _embed(self, kind, texts, compute):
+        keys = [self._key(kind, text) for text in texts]
+        found = self._lookup(keys)
+
+        # Embed each distinct missing text once
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in found and key not in missing:
+                missing[key] = text
+        if missing:
+            self.misses += len(missing)
+            vectors = compute(list(missing.values()))
+            computed = list(zip(missing.keys(), vectors))
+            self._store(computed)
+            found.update(computed)
+        return [found[key] for key in keys]
+
+    def embed_documents(self, texts):
+        return self._embed("document", texts, self.embeddings.embed_documents)
+
+    def embed_query(self, text):
+        return self._embed("query", [text], lambda texts: [self.embeddings.embed_query(texts[0])])[0]
+
+    def stats(self):
+        """Hit/miss counters and cache sizes."""
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        disk_entries = self._connection().execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        return {
+            "model": self.model_name,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.memory_hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+            "memory_entries": len(self._memory),
+            "disk_entries": disk_entries
+        }
+
+
+__all__ = [
+    'CachedEmbeddings',
+    'normalize_text'
+]
@@ -0,0 +1,130 @@
+import threading
+import time
+
+from langchain_core.embeddings import Embeddings
+
+from config import EMBEDDING_MODEL, EMBEDDING_BACKEND
+from embedding_backends import load_embedding_model
+from embedding_batcher import BatchingEmbeddings
+from embedding_cache import CachedEmbeddings
+
+NOT_LOADED = "not_loaded"
+LOADING = "loading"
+READY = "ready"
+FAILED = "failed"
+
+
+class EmbeddingProvider(Embeddings):
+    """The process-wide embeddings model, loaded once on first use.
+
+    Building the object is free; the model (behind the micro-batching
+    scheduler and the content-hash cache) is only loaded by the first
+    embed call or by warm_up(). ``state`` reports not_loaded, loading,
+    ready or failed, so /health can answer before the model is in memory.
+    A failed load is retried on the next call.
+    """
+
+    def __init__(self, backend=EMBEDDING_BACKEND, model_name=EMBEDDING_MODEL):
+        self.backend = backend
+        self.model_name = model_name
+        self.state = NOT_LOADED
+        self.error = None
+        self.load_seconds = None
+        self._batcher = None
+        self._embeddings = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_ready(self):
+        return self.state == READY
+
+    def _load(self):
+        if self._embeddings is not None:
+            return self._embeddings
+        with self._lock:
+            if self._embeddings is None:
+                self.state = LOADING
+                start = time.perf_counter()
+                try:
+                    batcher = BatchingEmbeddings(load_embedding_model(self.backend, self.model_name))
+                    embeddings = CachedEmbeddings(batcher)
+                except Exception as e:
+                    self.state = FAILED
+                    self.error = str(e)
+                    print(f"❌ Failed to load embedding model: {e}")
+                    raise
+                self._batcher = batcher
+                self._embeddings = embeddings
+                self.load_seconds = round(time.perf_counter() - start, 2)
+                self.error = None
+                self.state = READY
+                print(f"✅ Embedding model ready in {self.load_seconds}s")
+        return self._embeddings
+
+    def warm_up(self):
+        """Load the model and run one forward pass, bypassing the cache."""
+        embeddings = self._load()
+        vector = self._batcher.embed_query("warm-up")
+        print(f"🧮 Embedding dimension: {len(vector)}")
+        return embeddings
+
+    def warm_up_in_background(self):
+        """Start warm_up() on a daemon thread so startup does not wait for the model."""
+        def run():
+            try:
+                self.warm_up()
+            except Exception:
+                pass  # state/error already record the failure
+
+        thread = threading.Thread(target=run, name="embedding-warm-up", daemon=True)
+        thread.start()
+        return thread
+
+    def embed_documents(self, texts):
+        return self._load().embed_documents(texts)
+
+    def embed_query(self, text):
+        return self._load().embed_query(text)
+
+    def status(self):
+        return {
+            "state": self.state,
+            "backend": self.backend,
+            "model": self.model_name,
+            "load_seconds": self.load_seconds,
+            "error": self.error
+        }
+
+    def stats(self):
+        """Readiness plus cache and batching counters once the model is loaded."""
+        if self._embeddings is None:
+            return {"provider": self.status(), "cache": None, "batching": None}
+        return {
+            "provider": self.status(),
+            "cache": self._embeddings.stats(),
+            "batching": self._batcher.stats()
+        }
+
+
+_provider = None
+_provider_lock = threading.Lock()
+
+
+def get_embeddings():
+    """Return the process-wide EmbeddingProvider."""
+    global _provider
+    if _provider is None:
+        with _provider_lock:
+            if _provider is None:
+                _provider = EmbeddingProvider()
+    return _provider
+
+
+__all__ = [
+    'EmbeddingProvider',
+    'get_embeddings',
+    'NOT_LOADED',
+    'LOADING',
+    'READY',
+    'FAILED'
+]
@@ -0,0 +1,77 @@
+import os
+
+import numpy as np
+
+from config import HNSW_M, HNSW_EF_CONSTRUCTION, HNSW_EF_SEARCH
+
+try:
+    import hnswlib
+except ImportError:  # optional: the local backend falls back to exact search
+    hnswlib = None
+
+
+def hnsw_available():
+    return hnswlib is not None
+
+
+class HnswGraph:
+    """HNSW approximate-nearest-neighbour graph over normalised vectors.
+
+    Labels are the row numbers of the vectors in their namespace (or in the
+    global label table), so results map straight back to stored records.
+    The graph uses inner-product space; on normalised vectors that is cosine.
+    """
+
+    def __init__(self, index, ef_search=HNSW_EF_SEARCH):
+        self.index = index
+        self.ef_search = ef_search
+        self.index.set_ef(ef_search)
+
+    @classmethod
+    def create(cls, dimension, capacity, m=HNSW_M, ef_construction=HNSW_EF_CONSTRUCTION,
+               ef_search=HNSW_EF_SEARCH):
+        index = hnswlib.Index(space="ip", dim=dimension)
+        index.init_index(max_elements=max(capacity, 1), M=m, ef_construction=ef_construction)
+        return cls(index, ef_search)
+
+    @classmethod
+    def load(cls, file_path, dimension, ef_search=HNSW_EF_SEARCH):
+        index = hnswlib.Index(space="ip", dim=dimension)
+        index.load_index(file_path)
+        return cls(index, ef_search)
+
+    @property
+    def count(self):
+        return self.index.get_current_count()
+
+    def add(self, vectors, first_label):
+        """Insert vectors labelled first_label, first_label + 1, ..."""
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        if len(vectors) == 0:
+            return
+        needed = first_label + len(vectors)
+        if needed > self.index.get_max_elements():
+            # Grow geometrically so repeated small upserts do not resize every time
+            self.index.resize_index(max(needed, 2 * self.index.get_max_elements()))
+        self.index.add_items(vectors, np.arange(first_label, needed, dtype=np.int64))
+
+    def search(self, queries, k):
+        """Return (labels, scores) arrays of shape (queries, k), best first."""
+        k = min(k, self.count)
+        if k == 0:
+            return np.empty((len(queries), 0), dtype=np.int64), np.empty((len(queries), 0), dtype=np.float32)
+        # ef below k makes hnswlib fail to fill the result rows
+        self.index.set_ef(max(self.ef_search, k))
+        labels, distances = self.index.knn_query(np.ascontiguousarray(queries, dtype=np.float32), k=k)
+        return labels.astype(np.int64), 1.0 - distances
+
+    def save(self, file_path):
+        tmp_path = file_path + ".tmp"
+        self.index.save_index(tmp_path)
+        os.replace(tmp_path, file_path)
+
+
+__all__ = [
+    'HnswGraph',
+    'hnsw_available'
+]
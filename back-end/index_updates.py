@@ -0,0 +1,73 @@
+import sqlite3
+import threading
+import time
+import uuid
+
+from config import INDEX_UPDATES_DB_PATH, INDEX_UPDATES_RETENTION
+
+
+class IndexUpdateLog:
+    """Journal of upserts per namespace in a WAL-mode SQLite table.
+
+    The answer cache and namespace catalog live in each API process's
+    memory, while vectors are also upserted by Scrapy crawls
+    (EmbedUpsertPipeline) and by other uvicorn workers. Every writer
+    appends (namespace, vector count) here under its own ``origin``;
+    each API process follows the journal with since() and applies what
+    the others wrote. Entries older than ``retention_seconds`` are pruned.
+    """
+
+    def __init__(self, path=INDEX_UPDATES_DB_PATH, retention_seconds=INDEX_UPDATES_RETENTION):
+        self.path = path
+        self.retention_seconds = retention_seconds
+        self.origin = uuid.uuid4().hex
+        self._local = threading.local()
+        conn = self._connection()
+        with conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS index_updates ("
+                " update_id INTEGER PRIMARY KEY AUTOINCREMENT, namespace TEXT NOT NULL,"
+                " vector_count INTEGER NOT NULL, origin TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS index_updates_age ON index_updates (created_at)")
+
+    def _connection(self):
+        # sqlite3 connections are not shareable across threads; keep one per thread
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def record(self, namespace, vector_count):
+        """Journal an upsert of ``vector_count`` vectors into ``namespace``."""
+        now = time.time()
+        conn = self._connection()
+        with conn:
+            conn.execute(
+                "INSERT INTO index_updates (namespace, vector_count, origin, created_at) VALUES (?, ?, ?, ?)",
+                (namespace, vector_count, self.origin, now)
+            )
+            conn.execute("DELETE FROM index_updates WHERE created_at < ?", (now - self.retention_seconds,))
+
+    def latest_id(self):
+        """Position to start following from (entries already written are skipped)."""
+        row = self._connection().execute("SELECT MAX(update_id) FROM index_updates").fetchone()
+        return row[0] or 0
+
+    def since(self, after_id):
+        """Return (latest id, [(namespace, vector count), ...]) for entries written by other origins."""
+        rows = self._connection().execute(
+            "SELECT update_id, namespace, vector_count, origin FROM index_updates"
+            " WHERE update_id > ? ORDER BY update_id",
+            (after_id,)
+        ).fetchall()
+        latest = rows[-1][0] if rows else after_id
+        return latest, [(namespace, count) for _, namespace, count, origin in rows if origin != self.origin]
+
+
+__all__ = [
+    'IndexUpdateLog'
+]
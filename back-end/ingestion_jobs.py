@@ -0,0 +1,372 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from config import INGESTION_DB_PATH, INGESTION_WORKERS, INGESTION_HEARTBEAT_INTERVAL, INGESTION_STALE_AFTER
+
+STAGES = ("scraped", "chunked", "embedded", "upserted")
+TERMINAL_STATUSES = ("succeeded", "failed", "cancelled")
+_COLUMNS = (
+    "job_id", "session_id", "status", "sources", "progress", "details", "result", "error",
+    "cancel_requested", "created_at", "started_at", "finished_at", "owner", "heartbeat_at"
+)
+
+
+class JobCancelled(Exception):
+    """Raised inside a job when cancellation was requested for it."""
+
+
+class IngestionJobStore:
+    """Ingestion jobs persisted in a WAL-mode SQLite table.
+
+    The table doubles as the queue: workers claim the oldest queued job
+    with a single transaction, so jobs survive restarts and several
+    workers (or processes) sharing the database never run the same job.
+    A running job records its ``owner`` and a ``heartbeat_at`` the owner
+    keeps bumping; only jobs whose heartbeat went stale are treated as
+    interrupted, and only the owner can finish a job.
+    """
+
+    def __init__(self, path=INGESTION_DB_PATH):
+        self.path = path
+        self._local = threading.local()
+        with self._transaction() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS ingestion_jobs ("
+                " job_id TEXT PRIMARY KEY, session_id TEXT NOT NULL, status TEXT NOT NULL,"
+                " sources TEXT NOT NULL, progress TEXT NOT NULL, details TEXT NOT NULL,"
+                " result TEXT, error TEXT, cancel_requested INTEGER NOT NULL DEFAULT 0,"
+                " created_at REAL NOT NULL, started_at REAL, finished_at REAL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS ingestion_jobs_queue ON ingestion_jobs (status, created_at)"
+            )
+            # Tables created before jobs had owners
+            existing = {row[1] for row in conn.execute("PRAGMA table_info(ingestion_jobs)")}
+            if "owner" not in existing:
+                conn.execute("ALTER TABLE ingestion_jobs ADD COLUMN owner TEXT")
+            if "heartbeat_at" not in existing:
+                conn.execute("ALTER TABLE ingestion_jobs ADD COLUMN heartbeat_at REAL")
+
+    def _connection(self):
+        # sqlite3 connections are not shareable across threads; keep one per thread
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _transaction(self):
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    @staticmethod
+    def _decode(row):
+        (job_id, session_id, status, sources, progress, details, result, error,
+         cancel_requested, created_at, started_at, finished_at, owner, heartbeat_at) = row
+        return {
+            "job_id": job_id,
+            "session_id": session_id,
+            "status": status,
+            "sources": json.loads(sources),
+            "progress": json.loads(progress),
+            "details": json.loads(details),
+            "result": json.loads(result) if result else None,
+            "error": error,
+            "cancel_requested": bool(cancel_requested),
+            "created_at": created_at,
+            "started_at": started_at,
+            "finished_at": finished_at,
+            "owner": owner,
+            "heartbeat_at": heartbeat_at
+        }
+
+    def _get(self, conn, job_id):
+        row = conn.execute(
+            f"SELECT {', '.join(_COLUMNS)} FROM ingestion_jobs WHERE job_id = ?", (job_id,)
+        ).fetchone()
+        return self._decode(row) if row else None
+
+    def create(self, session_id, sources, job_id=None):
+        """Queue a job; returns it."""
+        job_id = job_id or uuid.uuid4().hex
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT INTO ingestion_jobs (job_id, session_id, status, sources, progress, details, created_at)"
+                " VALUES (?, ?, 'queued', ?, ?, '[]', ?)",
+                (job_id, session_id, json.dumps(sources), json.dumps(dict.fromkeys(STAGES, 0)), time.time())
+            )
+            return self._get(conn, job_id)
+
+    def get(self, job_id):
+        return self._get(self._connection(), job_id)
+
+    def claim_next(self, owner):
+        """Mark the oldest queued job as running under ``owner`` and return it, or None when the queue is empty."""
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT job_id FROM ingestion_jobs WHERE status = 'queued' ORDER BY created_at LIMIT 1"
+            ).fetchone()
+            if row is None:
+                return None
+            now = time.time()
+            conn.execute(
+                "UPDATE ingestion_jobs SET status = 'running', started_at = ?, owner = ?, heartbeat_at = ?"
+                " WHERE job_id = ?",
+                (now, owner, now, row[0])
+            )
+            return self._get(conn, row[0])
+
+    def update_progress(self, job_id, owner, progress, details):
+        """Store progress; returns True when the job should stop (cancel requested, or no longer ours)."""
+        with self._transaction() as conn:
+            updated = conn.execute(
+                "UPDATE ingestion_jobs SET progress = ?, details = ?, heartbeat_at = ?"
+                " WHERE job_id = ? AND status = 'running' AND owner = ?",
+                (json.dumps(progress), json.dumps(details), time.time(), job_id, owner)
+            ).rowcount
+            row = conn.execute("SELECT cancel_requested FROM ingestion_jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return not updated or bool(row and row[0])
+
+    def heartbeat(self, owner):
+        """Mark every job running under ``owner`` as alive; returns how many."""
+        return self._connection().execute(
+            "UPDATE ingestion_jobs SET heartbeat_at = ? WHERE status = 'running' AND owner = ?",
+            (time.time(), owner)
+        ).rowcount
+
+    def finish(self, job_id, owner, status, result=None, error=None):
+        """Finish a job still running under ``owner``; returns False if it was already finished elsewhere."""
+        return self._connection().execute(
+            "UPDATE ingestion_jobs SET status = ?, result = ?, error = ?, finished_at = ?"
+            " WHERE job_id = ? AND status = 'running' AND owner = ?",
+            (status, json.dumps(result) if result is not None else None, error, time.time(), job_id, owner)
+        ).rowcount == 1
+
+    def request_cancel(self, job_id):
+        """Cancel a queued job outright, or flag a running one; returns the job (None if unknown)."""
+        with self._transaction() as conn:
+            job = self._get(conn, job_id)
+            if job is None or job["status"] in TERMINAL_STATUSES:
+                return job
+            if job["status"] == "queued":
+                conn.execute(
+                    "UPDATE ingestion_jobs SET status = 'cancelled', cancel_requested = 1, finished_at = ?"
+                    " WHERE job_id = ?",
+                    (time.time(), job_id)
+                )
+            else:
+                conn.execute("UPDATE ingestion_jobs SET cancel_requested = 1 WHERE job_id = ?", (job_id,))
+            return self._get(conn, job_id)
+
+    def fail_interrupted(self, stale_after=INGESTION_STALE_AFTER):
+        """Fail running jobs whose owner stopped heartbeating ``stale_after`` seconds ago; returns them.
+
+        Jobs of live workers (in this or other processes) keep running.
+        Interrupted jobs are not retried: a partial upsert would be
+        written twice.
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            rows = conn.execute(
+                f"SELECT {', '.join(_COLUMNS)} FROM ingestion_jobs"
+                " WHERE status = 'running' AND (heartbeat_at IS NULL OR heartbeat_at < ?)",
+                (now - stale_after,)
+            ).fetchall()
+            jobs = [self._decode(row) for row in rows]
+            conn.executemany(
+                "UPDATE ingestion_jobs SET status = 'failed', error = 'Interrupted: its worker stopped',"
+                " finished_at = ? WHERE job_id = ?",
+                [(now, job["job_id"]) for job in jobs]
+            )
+        return jobs
+
+    def counts(self):
+        rows = self._connection().execute(
+            "SELECT status, COUNT(*) FROM ingestion_jobs GROUP BY status"
+        ).fetchall()
+        return dict(rows)
+
+
+class JobProgress:
+    """Stage counters and status lines of one running job, persisted on every update."""
+
+    def __init__(self, runner, job):
+        self.runner = runner
+        self.job_id = job["job_id"]
+        self.progress = dict(job["progress"])
+        self.details = list(job["details"])
+
+    async def advance(self, stage, amount, note=None):
+        """Add ``amount`` to a stage counter; raises JobCancelled if the job was cancelled."""
+        self.progress[stage] += amount
+        await self._save(note)
+
+    async def note(self, message):
+        await self._save(message)
+
+    async def _save(self, note):
+        if note:
+            self.details.append(note)
+        cancelled = await self.runner.run_blocking(
+            self.runner.store.update_progress, self.job_id, self.runner.owner, dict(self.progress), list(self.details)
+        )
+        if cancelled:
+            raise JobCancelled()
+
+
+class IngestionJobRunner:
+    """Runs queued ingestion jobs on ``workers`` asyncio tasks.
+
+    ``handler(job, progress)`` is an async function doing the work; it
+    reports stages through ``progress`` and its return value is stored as
+    the job result. Cancelling a running job cancels its task, so the
+    handler stops at its next await. Store calls go through
+    ``run_blocking`` so SQLite never blocks the event loop.
+
+    Every ``heartbeat_interval`` the runner heartbeats its own jobs and
+    fails jobs whose owner went quiet, passing each to ``discard(job)``
+    (blocking) so their spooled inputs are removed.
+    """
+
+    def __init__(self, store, handler, run_blocking, workers=INGESTION_WORKERS, poll_interval=2.0,
+                 heartbeat_interval=INGESTION_HEARTBEAT_INTERVAL, discard=None):
+        self.store = store
+        self.handler = handler
+        self.run_blocking = run_blocking
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.heartbeat_interval = heartbeat_interval
+        self.discard = discard
+        self.owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._wakeup = None
+        self._stopping = False
+        self._worker_tasks = []
+        self._running = {}  # job_id -> task
+        self._user_cancelled = set()
+
+    async def start(self):
+        await self._fail_interrupted()
+        self._wakeup = asyncio.Event()
+        self._worker_tasks = [
+            asyncio.create_task(self._work(), name=f"ingestion-worker-{i}") for i in range(self.workers)
+        ]
+        self._worker_tasks.append(asyncio.create_task(self._heartbeat(), name="ingestion-heartbeat"))
+
+    async def _fail_interrupted(self):
+        interrupted = await self.run_blocking(self.store.fail_interrupted)
+        if interrupted:
+            print(f"⚠️ Marked {len(interrupted)} interrupted ingestion jobs as failed")
+        if self.discard is not None:
+            for job in interrupted:
+                await self.run_blocking(self.discard, job)
+
+    async def _heartbeat(self):
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            try:
+                await self.run_blocking(self.store.heartbeat, self.owner)
+                await self._fail_interrupted()
+            except Exception as e:
+                print(f"Warning: Ingestion job heartbeat failed: {e}")
+
+    async def stop(self):
+        # wait_for() can swallow a cancel that races with the wakeup; the flag stops the loop regardless
+        self._stopping = True
+        for task in self._worker_tasks + list(self._running.values()):
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, *self._running.values(), return_exceptions=True)
+        self._worker_tasks = []
+
+    async def submit(self, session_id, sources, job_id=None):
+        job = await self.run_blocking(self.store.create, session_id, sources, job_id)
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return job
+
+    async def cancel(self, job_id):
+        """Request cancellation; returns the job (None if unknown)."""
+        job = await self.run_blocking(self.store.request_cancel, job_id)
+        task = self._running.get(job_id)
+        if task is not None:
+            self._user_cancelled.add(job_id)
+            task.cancel()
+        return job
+
+    async def _work(self):
+        while not self._stopping:
+            job = await self.run_blocking(self.store.claim_next, self.owner)
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    # Polling as well picks up jobs queued by other processes
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            task = asyncio.create_task(self._run(job))
+            self._running[job["job_id"]] = task
+            try:
+                # wait() rather than await, so cancelling the job does not cancel this worker
+                await asyncio.wait({task})
+            finally:
+                self._running.pop(job["job_id"], None)
+                self._user_cancelled.discard(job["job_id"])
+
+    async def _finish(self, job_id, status, result=None, error=None):
+        finished = await self.run_blocking(self.store.finish, job_id, self.owner, status, result=result, error=error)
+        if not finished:
+            print(f"⚠️ Ingestion job {job_id} was already finished elsewhere; not marking it {status}")
+        return finished
+
+    async def _run(self, job):
+        job_id = job["job_id"]
+        print(f"🧾 Ingestion job {job_id} started for session '{job['session_id']}'")
+        try:
+            result = await self.handler(job, JobProgress(self, job))
+        except (asyncio.CancelledError, JobCancelled) as e:
+            if isinstance(e, JobCancelled) or job_id in self._user_cancelled:
+                status, error = "cancelled", None
+            else:
+                status, error = "failed", "Interrupted by server shutdown"
+            if await asyncio.shield(self._finish(job_id, status, error=error)):
+                print(f"🛑 Ingestion job {job_id} {status}")
+            return
+        except Exception as e:
+            if await self._finish(job_id, "failed", error=str(e)):
+                print(f"❌ Ingestion job {job_id} failed: {e}")
+            return
+        if await self._finish(job_id, "succeeded", result=result):
+            print(f"✅ Ingestion job {job_id} succeeded")
+
+    def stats(self):
+        return {
+            "owner": self.owner,
+            "workers": self.workers if self._worker_tasks else 0,
+            "running": len(self._running)
+        }
+
+
+__all__ = [
+    'IngestionJobStore',
+    'IngestionJobRunner',
+    'JobProgress',
+    'JobCancelled',
+    'STAGES',
+    'TERMINAL_STATUSES'
+]
@@ -0,0 +1,169 @@
+import asyncio
+
+from config import (
+    INGESTION_UPSERT_BATCH,
+    INGESTION_BATCH_MAX_WAIT,
+    INGESTION_PAGE_QUEUE_SIZE
+)
+from data_processing import clean_scraped_text, chunk_text
+
+_DONE = object()  # end-of-stream marker passed down the queues
+
+
+class IngestionPipeline:
+    """Streaming scrape → clean → chunk → embed → upsert with bounded queues.
+
+    Producers push scraped pages (feed_pages) or ready-made chunks
+    (feed_documents). One stage cleans and chunks each page as it arrives,
+    the next embeds chunks in batches of ``batch_size`` (or whatever has
+    arrived after ``max_wait`` seconds, so the first vectors land early),
+    and the last upserts each batch, with its vectors, while the next one
+    is being embedded.
+    Every queue is bounded, so a slow stage pauses the ones before it and
+    memory stays proportional to the batch size rather than the site size.
+
+    ``embed(texts)`` and ``upsert(chunks, vectors)`` are blocking callables
+    run through ``run_blocking``; stage counts are reported through
+    ``progress``.
+    """
+
+    def __init__(self, embed, upsert, run_blocking, progress, batch_size=INGESTION_UPSERT_BATCH,
+                 max_wait=INGESTION_BATCH_MAX_WAIT, page_queue_size=INGESTION_PAGE_QUEUE_SIZE,
+                 chunk_size=600, chunk_overlap=50):
+        self.embed = embed
+        self.upsert = upsert
+        self.run_blocking = run_blocking
+        self.progress = progress
+        self.batch_size = batch_size
+        self.max_wait = max_wait
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self._pages = asyncio.Queue(maxsize=page_queue_size)
+        self._chunks = asyncio.Queue(maxsize=batch_size * 2)
+        self._batches = asyncio.Queue(maxsize=1)
+        self.upserted = 0
+
+    async def feed_pages(self, pages):
+        """Push scraped items (dicts with "text") from an async iterator; returns how many."""
+        count = 0
+        try:
+            async for page in pages:
+                await self._pages.put(page)
+                count += 1
+                await self.progress.advance("scraped", 1)
+        finally:
+            # Stops the crawl when the pipeline is cancelled or fails
+            await pages.aclose()
+        return count
+
+    async def feed_documents(self, documents):
+        """Push already chunked documents (PDF pages); returns how many."""
+        for doc in documents:
+            await self._chunks.put(doc)
+        await self.progress.advance("chunked", len(documents))
+        return len(documents)
+
+    async def add_upserted(self, count):
+        """Count chunks upserted outside the pipeline (indexed by the crawler process)."""
+        self.upserted += count
+        await self.progress.advance("upserted", count)
+
+    def _split_page(self, page):
+        text = clean_scraped_text(page.get("text") or "")
+        if not text:
+            return []
+        return chunk_text(text, chunk_size=self.chunk_size, chunk_overlap=self.chunk_overlap) or []
+
+    async def _chunk_pages(self):
+        while True:
+            page = await self._pages.get()
+            if page is _DONE:
+                await self._chunks.put(_DONE)
+                return
+            docs = [doc for doc in await self.run_blocking(self._split_page, page) if doc.page_content.strip()]
+            for doc in docs:
+                await self._chunks.put(doc)
+            await self.progress.advance("chunked", len(docs))
+
+    async def _embed_batches(self):
+        loop = asyncio.get_running_loop()
+        batch, deadline, done = [], None, False
+        while not done:
+            timeout = None if deadline is None else max(0, deadline - loop.time())
+            try:
+                doc = await asyncio.wait_for(self._chunks.get(), timeout=timeout)
+            except asyncio.TimeoutError:
+                doc = None
+            if doc is _DONE:
+                done = True
+            elif doc is not None:
+                batch.append(doc)
+                if deadline is None:
+                    deadline = loop.time() + self.max_wait
+                if len(batch) < self.batch_size:
+                    continue
+
+            if batch:
+                vectors = await self.run_blocking(self.embed, [d.page_content for d in batch])
+                await self.progress.advance("embedded", len(batch))
+                await self._batches.put((batch, vectors))
+            batch, deadline = [], None
+        await self._batches.put(_DONE)
+
+    async def _upsert_batches(self):
+        while True:
+            item = await self._batches.get()
+            if item is _DONE:
+                return
+            batch, vectors = item
+            await self.run_blocking(self.upsert, batch, vectors)
+            self.upserted += len(batch)
+            await self.progress.advance("upserted", len(batch))
+
+    async def run(self, producers):
+        """Run ``producers`` ({label: coroutine feeding this pipeline}) through every stage.
+
+        A failing producer does not stop the others; its exception is
+        returned in place of its result. Returns ({label: result or
+        exception}, chunks upserted). Stage failures are raised.
+        """
+        stages = [
+            asyncio.ensure_future(self._chunk_pages()),
+            asyncio.ensure_future(self._embed_batches()),
+            asyncio.ensure_future(self._upsert_batches())
+        ]
+        feeding = asyncio.gather(*producers.values(), return_exceptions=True)
+        closing = None
+        try:
+            await self._wait_watching(feeding, stages)
+            outcomes = dict(zip(producers, feeding.result()))
+            closing = asyncio.ensure_future(self._pages.put(_DONE))
+            await self._wait_watching(closing, stages)
+            await self._wait_watching(asyncio.gather(*stages), stages)
+        finally:
+            pending = [task for task in (feeding, closing, *stages) if task is not None]
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+        return outcomes, self.upserted
+
+    @staticmethod
+    async def _wait_watching(future, stages):
+        """Await ``future``, raising as soon as any stage fails.
+
+        Anything waiting on a queue (producers, the end-of-stream put, the
+        stages themselves) would block forever once a downstream stage
+        has died with the queue full, so every wait watches the stages.
+        """
+        while not future.done():
+            running = [stage for stage in stages if not stage.done()]
+            await asyncio.wait([future, *running], return_when=asyncio.FIRST_COMPLETED)
+            for stage in stages:
+                if stage.done() and not stage.cancelled() and stage.exception() is not None:
+                    raise stage.exception()
+        return future.result()
+
+
+__all__ = [
+    'IngestionPipeline'
+]
@@ -3,7 +3,7 @@ import json
 import asyncio
 import decisionrules
 from dotenv import load_dotenv
-from langchain_groq import ChatGroq
+from llm_registry import get_llm
 from langchain_core.runnables.history import RunnableWithMessageHistory
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain.memory import ChatMessageHistory
@@ -16,38 +16,32 @@ GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 DECISIONRULES_API_KEY = os.getenv("DECISIONRULES_API_KEY")
 DECISIONRULES_MODEL_ID = "d0ec0e76-8ccb-9b87-4e9c-7672cee0d427"  # Your model ID
 
-# Setup Groq LLM with supported model
-llm = ChatGroq(
-    model_name="llama3-70b-8192",
-    groq_api_key=GROQ_API_KEY
-)
+# Setup Groq LLM with supported model (shared client from the registry)
+llm = get_llm("groq", "llama3-70b-8192")
 
 class LegalChatbot:
-    def __init__(self):
-        self.payload_data = {
-            "isTenant?": None,
-            "isSecurity": None,
-            "inStateDefendant?": None,
-            "ClaimAmount": None
-        }
-        self.required_fields = ["isTenant?", "isSecurity", "inStateDefendant?", "ClaimAmount"]
-        self.current_question = 0
-        self.is_tenant_security_case = False
-        self.case_identified = False
-        self.retry_count = {}  # Track retry attempts for each field
-        self.started = False  # Track if conversation has started
-        
-        # Questions to ask for each field with better context
-        self.questions = {
-            "isTenant?": "First, I need to confirm: Are you a tenant (renter) in this situation? Please answer 'Yes' or 'No'.",
-            "isSecurity": "Did you pay a security deposit when you moved into this rental property? Please answer 'Yes' or 'No'.",
-            "inStateDefendant?": "Is the landlord or property owner located in the same state as you? Please answer 'Yes' or 'No'.",
-            "ClaimAmount": "What is the total dollar amount you want to claim? Please provide a specific number (for example: 1500 or $2,000)."
-        }
-        
-        # Setup Prompt with specific instructions
-        self.case_detection_prompt = ChatPromptTemplate.from_messages([
-            ("system", """You are a legal assistant for small claims court. Your job is to identify if the user's query is related to tenant security deposit issues.
+    """Conversation state for one legal-advice session.
+
+    Prompts, chains and history wrappers hold no per-session state, so they
+    are class attributes built once per process; an instance is only the
+    slotted fields that to_state() persists.
+    """
+    __slots__ = ("payload_data", "current_question", "is_tenant_security_case",
+                 "case_identified", "retry_count", "started")
+
+    required_fields = ("isTenant?", "isSecurity", "inStateDefendant?", "ClaimAmount")
+
+    # Questions to ask for each field with better context
+    questions = {
+        "isTenant?": "First, I need to confirm: Are you a tenant (renter) in this situation? Please answer 'Yes' or 'No'.",
+        "isSecurity": "Did you pay a security deposit when you moved into this rental property? Please answer 'Yes' or 'No'.",
+        "inStateDefendant?": "Is the landlord or property owner located in the same state as you? Please answer 'Yes' or 'No'.",
+        "ClaimAmount": "What is the total dollar amount you want to claim? Please provide a specific number (for example: 1500 or $2,000)."
+    }
+
+    # Setup Prompt with specific instructions
+    case_detection_prompt = ChatPromptTemplate.from_messages([
+        ("system", """You are a legal assistant for small claims court. Your job is to identify if the user's query is related to tenant security deposit issues.
 
 Look for these specific keywords and phrases that indicate tenant security deposit cases:
 - "security deposit", "deposit", "rental deposit"
@@ -65,12 +59,12 @@ ONLY respond with "TENANT_SECURITY_CASE" if the query clearly mentions:
 For all other legal questions (divorce, business, contracts, criminal law, etc.), provide helpful general legal advice.
 
 Be very specific - only identify tenant security deposit cases, not general landlord-tenant issues."""),
-            MessagesPlaceholder(variable_name="history"),
-            ("human", "{input}")
-        ])
+        MessagesPlaceholder(variable_name="history"),
+        ("human", "{input}")
+    ])
 
-        self.data_collection_prompt = ChatPromptTemplate.from_messages([
-            ("system", """You are a legal assistant collecting specific information for a small claims case.
+    data_collection_prompt = ChatPromptTemplate.from_messages([
+        ("system", """You are a legal assistant collecting specific information for a small claims case.
 
 Current payload data: {payload_data}
 Current question field: {current_field}
@@ -99,44 +93,75 @@ inStateDefendant?: Determine if landlord is in same state
 
 Only respond with one of: YES_INTENT, NO_INTENT, or UNCLEAR_INTENT
 Do not provide explanations, just the intent classification."""),
-            MessagesPlaceholder(variable_name="history"),
-            ("human", "Question field: {current_field}\nUser response: {input}")
-        ])
+        MessagesPlaceholder(variable_name="history"),
+        ("human", "Question field: {current_field}\nUser response: {input}")
+    ])
 
-        self.general_legal_prompt = ChatPromptTemplate.from_messages([
-            ("system", """You are a helpful legal assistant for general legal questions. Provide helpful, informative responses about legal matters, but remind users that this is not legal advice and they should consult with a qualified attorney for specific legal guidance.
+    general_legal_prompt = ChatPromptTemplate.from_messages([
+        ("system", """You are a helpful legal assistant for general legal questions. Provide helpful, informative responses about legal matters, but remind users that this is not legal advice and they should consult with a qualified attorney for specific legal guidance.
 
 Be professional, knowledgeable, and helpful."""),
-            MessagesPlaceholder(variable_name="history"),
-            ("human", "{input}")
-        ])
-        
-        # Chain = Prompt -> LLM
-        self.case_detection_chain = self.case_detection_prompt | llm
-        self.data_collection_chain = self.data_collection_prompt | llm
-        self.general_legal_chain = self.general_legal_prompt | llm
-        
-        # Setup RunnableWithMessageHistory
-        self.case_detection_history = RunnableWithMessageHistory(
-            self.case_detection_chain,
-            lambda session_id: ChatMessageHistory(),
-            input_messages_key="input",
-            history_messages_key="history"
-        )
-        
-        self.data_collection_history = RunnableWithMessageHistory(
-            self.data_collection_chain,
-            lambda session_id: ChatMessageHistory(),
-            input_messages_key="input",
-            history_messages_key="history"
-        )
-        
-        self.general_legal_history = RunnableWithMessageHistory(
-            self.general_legal_chain,
-            lambda session_id: ChatMessageHistory(),
-            input_messages_key="input",
-            history_messages_key="history"
-        )
+        MessagesPlaceholder(variable_name="history"),
+        ("human", "{input}")
+    ])
+
+    # Chain = Prompt -> LLM
+    case_detection_chain = case_detection_prompt | llm
+    data_collection_chain = data_collection_prompt | llm
+    general_legal_chain = general_legal_prompt | llm
+
+    # Setup RunnableWithMessageHistory
+    case_detection_history = RunnableWithMessageHistory(
+        case_detection_chain,
+        lambda session_id: ChatMessageHistory(),
+        input_messages_key="input",
+        history_messages_key="history"
+    )
+
+    data_collection_history = RunnableWithMessageHistory(
+        data_collection_chain,
+        lambda session_id: ChatMessageHistory(),
+        input_messages_key="input",
+        history_messages_key="history"
+    )
+
+    general_legal_history = RunnableWithMessageHistory(
+        general_legal_chain,
+        lambda session_id: ChatMessageHistory(),
+        input_messages_key="input",
+        history_messages_key="history"
+    )
+
+    def __init__(self):
+        self.payload_data = dict.fromkeys(self.required_fields)
+        self.current_question = 0
+        self.is_tenant_security_case = False
+        self.case_identified = False
+        self.retry_count = {}  # Track retry attempts for each field
+        self.started = False  # Track if conversation has started
+
+    def to_state(self):
+        """Compact, JSON-serialisable record of the conversation state"""
+        return {
+            "p": [self.payload_data[field] for field in self.required_fields],
+            "r": self.retry_count,
+            "q": self.current_question,
+            "t": self.is_tenant_security_case,
+            "c": self.case_identified,
+            "s": self.started
+        }
+    
+    @classmethod
+    def from_state(cls, state):
+        """Rebuild a chatbot from a to_state() record"""
+        bot = cls()
+        bot.payload_data = dict(zip(bot.required_fields, state["p"]))
+        bot.retry_count = dict(state["r"])
+        bot.current_question = state["q"]
+        bot.is_tenant_security_case = state["t"]
+        bot.case_identified = state["c"]
+        bot.started = state["s"]
+        return bot
     
     def detect_tenant_security_case(self, user_input, session_id):
         """Detect if user query is about tenant security issues"""
@@ -161,12 +186,7 @@ Be professional, knowledgeable, and helpful."""),
     
     def reset_payload_data(self):
         """Reset payload data for new case"""
-        self.payload_data = {
-            "isTenant?": None,
-            "isSecurity": None,
-            "inStateDefendant?": None,
-            "ClaimAmount": None
-        }
+        self.payload_data = dict.fromkeys(self.required_fields)
         self.is_tenant_security_case = False
         self.case_identified = False
         self.retry_count = {}
@@ -0,0 +1,151 @@
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from config import LEGAL_SESSION_DB_PATH, LEGAL_SESSION_MAX_IN_MEMORY, LEGAL_SESSION_IDLE_TTL
+
+
+class LegalSessionStore:
+    """Bounded cache of LegalChatbot instances backed by SQLite.
+
+    Live chatbots are kept in an LRU of at most ``max_in_memory`` sessions
+    and dropped once idle for ``idle_ttl_seconds``. Every chatbot's
+    to_state() record is written to SQLite by save(), so an evicted or
+    restarted session is rebuilt from it on the next get(). A live
+    chatbot remembers the ``updated_at`` it was loaded or saved with, and
+    get() rebuilds it when the row has changed since, so several workers
+    sharing the database see the same state.
+    """
+
+    def __init__(self, factory, path=LEGAL_SESSION_DB_PATH, max_in_memory=LEGAL_SESSION_MAX_IN_MEMORY,
+                 idle_ttl_seconds=LEGAL_SESSION_IDLE_TTL):
+        self.factory = factory
+        self.path = path
+        self.max_in_memory = max_in_memory
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self._sessions = OrderedDict()  # session_id -> (chatbot, last_used, updated_at of its row)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.memory_hits = 0
+        self.rehydrated = 0
+        self.reloaded = 0
+        self.created = 0
+        self.evicted = 0
+
+        with self._connection() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS legal_sessions ("
+                " session_id TEXT PRIMARY KEY, state TEXT NOT NULL, updated_at REAL NOT NULL)"
+            )
+
+    def _connection(self):
+        # sqlite3 connections are not shareable across threads; keep one per thread
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _evict(self, now):
+        """Drop idle sessions, then least recently used ones beyond the bound. Caller holds the lock."""
+        while self._sessions:
+            session_id, (_, last_used, _) = next(iter(self._sessions.items()))
+            if len(self._sessions) <= self.max_in_memory and now - last_used <= self.idle_ttl_seconds:
+                break
+            del self._sessions[session_id]
+            self.evicted += 1
+
+    def _load_state(self, session_id):
+        """Return (state, updated_at), or (None, None) for an unsaved session."""
+        row = self._connection().execute(
+            "SELECT state, updated_at FROM legal_sessions WHERE session_id = ?", (session_id,)
+        ).fetchone()
+        return (json.loads(row[0]), row[1]) if row else (None, None)
+
+    def _saved_at(self, session_id):
+        row = self._connection().execute(
+            "SELECT updated_at FROM legal_sessions WHERE session_id = ?", (session_id,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def get(self, session_id):
+        """Return the session's chatbot: live, rebuilt from its saved state, or new."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._sessions.get(session_id)
+
+        if entry is not None:
+            # Another worker may have saved a newer turn; the cached chatbot is only current if the row is unchanged
+            if self._saved_at(session_id) == entry[2]:
+                with self._lock:
+                    if session_id in self._sessions:
+                        self._sessions[session_id] = (entry[0], now, entry[2])
+                        self._sessions.move_to_end(session_id)
+                    self.memory_hits += 1
+                return entry[0]
+            self.reloaded += 1
+
+        state, updated_at = self._load_state(session_id)
+        if state is not None:
+            chatbot = self.factory.from_state(state)
+            self.rehydrated += 1
+        else:
+            chatbot = self.factory()
+            self.created += 1
+
+        with self._lock:
+            # Another request may have loaded the same version meanwhile; keep the first one
+            current = self._sessions.get(session_id)
+            if current is not None and current[2] == updated_at:
+                chatbot = current[0]
+            self._sessions[session_id] = (chatbot, now, updated_at)
+            self._sessions.move_to_end(session_id)
+            self._evict(now)
+        return chatbot
+
+    def save(self, session_id, chatbot):
+        """Persist the chatbot's state after a turn."""
+        state = json.dumps(chatbot.to_state(), separators=(",", ":"))
+        updated_at = time.time()
+        conn = self._connection()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO legal_sessions (session_id, state, updated_at) VALUES (?, ?, ?)",
+                (session_id, state, updated_at)
+            )
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is not None and entry[0] is chatbot:
+                # This instance is now the saved version
+                self._sessions[session_id] = (chatbot, entry[1], updated_at)
+
+    def discard(self, session_id):
+        """Forget a session in memory and on disk."""
+        with self._lock:
+            self._sessions.pop(session_id, None)
+        conn = self._connection()
+        with conn:
+            conn.execute("DELETE FROM legal_sessions WHERE session_id = ?", (session_id,))
+
+    def stats(self):
+        with self._lock:
+            in_memory = len(self._sessions)
+        persisted = self._connection().execute("SELECT COUNT(*) FROM legal_sessions").fetchone()[0]
+        return {
+            "in_memory": in_memory,
+            "persisted": persisted,
+            "memory_hits": self.memory_hits,
+            "rehydrated": self.rehydrated,
+            "reloaded": self.reloaded,
+            "created": self.created,
+            "evicted": self.evicted
+        }
+
+
+__all__ = [
+    'LegalSessionStore'
+]
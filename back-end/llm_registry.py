@@ -0,0 +1,156 @@
+import threading
+import time
+
+import httpx
+
+from config import (
+    GROK_API_KEY,
+    GROQ_BASE_URL,
+    OLLAMA_BASE_URL,
+    LLM_HTTP_MAX_CONNECTIONS,
+    LLM_HTTP_KEEPALIVE_CONNECTIONS,
+    LLM_HTTP_KEEPALIVE_EXPIRY
+)
+
+PROBE_PROMPT = "Hello"
+
+_limits = httpx.Limits(
+    max_connections=LLM_HTTP_MAX_CONNECTIONS,
+    max_keepalive_connections=LLM_HTTP_KEEPALIVE_CONNECTIONS,
+    keepalive_expiry=LLM_HTTP_KEEPALIVE_EXPIRY
+)
+
+# One keep-alive pool per sync/async flavour, shared by every hosted LLM client,
+# so TLS handshakes to the provider happen once, not once per request
+http_client = httpx.Client(limits=_limits, timeout=httpx.Timeout(60.0, connect=10.0))
+http_async_client = httpx.AsyncClient(limits=_limits, timeout=httpx.Timeout(60.0, connect=10.0))
+
+
+def _build_groq(model, params):
+    from langchain_groq import ChatGroq
+    return ChatGroq(
+        model=model,
+        api_key=GROK_API_KEY,
+        http_client=http_client,
+        http_async_client=http_async_client,
+        **params
+    )
+
+
+def _build_groq_openai(model, params):
+    # Groq through its OpenAI-compatible endpoint
+    from langchain_openai import ChatOpenAI
+    return ChatOpenAI(
+        base_url=GROQ_BASE_URL,
+        api_key=GROK_API_KEY,
+        model=model,
+        http_client=http_client,
+        http_async_client=http_async_client,
+        **params
+    )
+
+
+def _build_ollama(model, params):
+    from langchain_ollama import OllamaLLM
+    return OllamaLLM(base_url=OLLAMA_BASE_URL, model=model, **params)
+
+
+PROVIDERS = {
+    "groq": _build_groq,
+    "groq-openai": _build_groq_openai,
+    "ollama": _build_ollama
+}
+
+
+class LLMRegistry:
+    """Process-wide LLM clients keyed by provider, model and parameters.
+
+    Each distinct configuration is built once and then shared. Building a
+    client makes no network call; connectivity is checked only by probe(),
+    which startup and /health/llm call explicitly.
+    """
+
+    def __init__(self):
+        self._clients = {}
+        self._probes = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(provider, model, params):
+        return (provider, model, tuple(sorted(params.items())))
+
+    def get(self, provider, model, **params):
+        key = self._key(provider, model, params)
+        llm = self._clients.get(key)
+        if llm is None:
+            with self._lock:
+                llm = self._clients.get(key)
+                if llm is None:
+                    if provider not in PROVIDERS:
+                        raise ValueError(f"Unknown LLM provider: {provider}")
+                    print(f"🤖 Creating {provider} client for {model}")
+                    llm = PROVIDERS[provider](model, params)
+                    self._clients[key] = llm
+        return llm
+
+    def _probe_one(self, key, llm):
+        provider, model, params = key
+        start = time.perf_counter()
+        try:
+            response = llm.invoke(PROBE_PROMPT)
+            text = getattr(response, "content", response)
+            result = {"ok": True, "reply": str(text)[:60]}
+        except Exception as e:
+            result = {"ok": False, "error": str(e)}
+        result.update({
+            "provider": provider,
+            "model": model,
+            "params": dict(params),
+            "latency_ms": round((time.perf_counter() - start) * 1000, 1),
+            "checked_at": time.time()
+        })
+        print(f"{'✅' if result['ok'] else '❌'} LLM probe {provider}/{model}: {result.get('reply', result.get('error'))}")
+        self._probes[key] = result
+        return result
+
+    def probe(self):
+        """Send one short completion through every registered client and record the results."""
+        with self._lock:
+            clients = list(self._clients.items())
+        return [self._probe_one(key, llm) for key, llm in clients]
+
+    def status(self):
+        """Registered clients with the result of their last probe, if any."""
+        with self._lock:
+            keys = list(self._clients)
+        return [
+            self._probes.get(key) or {"provider": key[0], "model": key[1], "params": dict(key[2]), "ok": None}
+            for key in keys
+        ]
+
+
+_registry = LLMRegistry()
+
+
+def get_llm(provider, model, **params):
+    """Return the shared client for this provider/model/params."""
+    return _registry.get(provider, model, **params)
+
+
+def get_llm_registry():
+    return _registry
+
+
+async def aclose_http_clients():
+    http_client.close()
+    await http_async_client.aclose()
+
+
+__all__ = [
+    'LLMRegistry',
+    'get_llm',
+    'get_llm_registry',
+    'aclose_http_clients',
+    'http_client',
+    'http_async_client'
+]
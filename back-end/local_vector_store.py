@@ -0,0 +1,411 @@
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict, namedtuple
+from urllib.parse import quote, unquote
+
+import numpy as np
+
+from config import (
+    EMBEDDING_DIM,
+    LOCAL_VECTOR_STORE_DIR,
+    LOCAL_MAX_OPEN_NAMESPACES,
+    LOCAL_GLOBAL_HNSW_ENABLED,
+    LOCAL_HNSW_SAVE_INTERVAL
+)
+from hnsw_index import HnswGraph
+from vector_segments import (
+    SegmentedNamespace,
+    read_manifest,
+    hnsw_enabled,
+    flush_writer_graphs,
+    open_segments,
+    iter_segment_rows,
+    namespace_write_lock,
+    remove_quietly,
+    write_manifest
+)
+from vector_store import merge_top_k
+
+# Same attribute names as Pinecone matches / stats so callers can treat both alike
+VectorMatch = namedtuple("VectorMatch", ["id", "score", "metadata"])
+NamespaceStats = namedtuple("NamespaceStats", ["vector_count"])
+IndexStats = namedtuple("IndexStats", ["namespaces", "total_vector_count", "dimension"])
+
+NAMESPACE_DIR_PREFIX = "ns_"
+GLOBAL_DIR = "_global"
+GLOBAL_LABELS_FILE = "labels.bin"
+
+# Global graph label -> (namespace number, row in that namespace)
+GLOBAL_LABEL_DTYPE = np.dtype([("namespace", "<u4"), ("row", "<u8")])
+
+
+def normalize_rows(vectors):
+    """L2-normalise rows so a dot product equals cosine similarity."""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if vectors.ndim == 1:
+        vectors = vectors[None, :]
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+class _GlobalGraph:
+    """One HNSW graph over every namespace, used for admin search.
+
+    Labels index a label table mapping back to (namespace, row). The
+    manifest records how many rows of each namespace the saved graph
+    covers, so each upsert only inserts what is missing. The first build
+    backfills every namespace already on disk.
+
+    Inserts go into the writer's in-memory graph; the graph and its labels
+    are saved every LOCAL_HNSW_SAVE_INTERVAL seconds and on close. Until
+    then the manifest lists the namespaces with unsaved rows as ``dirty``,
+    and search() leaves those to a direct namespace search.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self.path = os.path.join(store.directory, GLOBAL_DIR)
+        self._stamp = None
+        self._loaded = None
+        self._writer = None
+
+    def _writer_for(self, manifest):
+        """In-memory writer state extending the saved graph ``manifest`` names."""
+        writer = self._writer
+        if writer is not None and writer["base"] == manifest["hnsw"]:
+            return writer
+        # First use, or another process saved a newer graph since
+        if manifest["hnsw"]:
+            graph = HnswGraph.load(os.path.join(self.path, manifest["hnsw"]), self.store.dimension)
+        else:
+            graph = HnswGraph.create(self.store.dimension, capacity=1024)
+        self._writer = writer = {
+            "base": manifest["hnsw"],
+            "graph": graph,
+            "count": manifest["count"],
+            "namespaces": list(manifest["namespaces"]),
+            "covered": dict(manifest["covered"]),
+            "labels": [],
+            "saved_at": time.monotonic() if manifest["hnsw"] else None
+        }
+        return writer
+
+    def catch_up(self, namespaces=None):
+        """Insert rows of the given namespaces (all of them on first build) the graph lacks."""
+        os.makedirs(self.path, exist_ok=True)
+        with namespace_write_lock(self.path):
+            manifest = read_manifest(self.path)
+            if manifest is None:
+                manifest = {"count": 0, "hnsw": None, "namespaces": [], "covered": {}, "dirty": []}
+                namespaces = None
+            if namespaces is None:
+                namespaces = list(self.store.describe_index_stats().namespaces)
+
+            writer = self._writer_for(manifest)
+            graph = writer["graph"]
+            added = set()
+            for namespace in namespaces:
+                namespace_path = self.store._namespace_path(namespace)
+                namespace_manifest = read_manifest(namespace_path)
+                if namespace_manifest is None:
+                    continue
+                if namespace not in writer["covered"]:
+                    writer["covered"][namespace] = 0
+                    writer["namespaces"].append(namespace)
+                namespace_number = writer["namespaces"].index(namespace)
+                segments = open_segments(namespace_path, namespace_manifest, self.store.dimension)
+                for first_row, vectors in iter_segment_rows(segments, writer["covered"][namespace]):
+                    graph.add(vectors, writer["count"] + len(writer["labels"]))
+                    writer["labels"].extend((namespace_number, row) for row in range(first_row, first_row + len(vectors)))
+                    added.add(namespace)
+                writer["covered"][namespace] = namespace_manifest["count"]
+
+            if writer["saved_at"] is None or time.monotonic() - writer["saved_at"] >= LOCAL_HNSW_SAVE_INTERVAL:
+                self._save(manifest, writer)
+            elif not added.issubset(manifest.get("dirty", ())):
+                manifest["dirty"] = sorted(added.union(manifest.get("dirty", ())))
+                write_manifest(self.path, manifest)
+
+    def _save(self, manifest, writer):
+        """Write the writer's pending labels, graph and coverage. Caller holds the lock."""
+        writer["saved_at"] = time.monotonic()
+        if not writer["labels"]:
+            return
+        labels_path = os.path.join(self.path, GLOBAL_LABELS_FILE)
+        if os.path.exists(labels_path) and os.path.getsize(labels_path) > manifest["count"] * GLOBAL_LABEL_DTYPE.itemsize:
+            with open(labels_path, "r+b") as f:
+                f.truncate(manifest["count"] * GLOBAL_LABEL_DTYPE.itemsize)
+        with open(labels_path, "ab") as f:
+            np.array(writer["labels"], dtype=GLOBAL_LABEL_DTYPE).tofile(f)
+
+        old_name = manifest["hnsw"]
+        count = writer["count"] + len(writer["labels"])
+        name = f"hnsw-{count:012d}.bin"
+        writer["graph"].save(os.path.join(self.path, name))
+        # Namespaces other writers have not saved yet stay dirty
+        dirty = [
+            namespace for namespace in manifest.get("dirty", ())
+            if (read_manifest(self.store._namespace_path(namespace)) or {}).get("count", 0)
+            > writer["covered"].get(namespace, 0)
+        ]
+        write_manifest(self.path, {
+            "count": count,
+            "hnsw": name,
+            "namespaces": list(writer["namespaces"]),
+            "covered": dict(writer["covered"]),
+            "dirty": dirty
+        })
+        writer.update(base=name, count=count, labels=[])
+        if old_name:
+            remove_quietly(os.path.join(self.path, old_name))
+
+    def flush(self):
+        """Save rows inserted since the last save (on close)."""
+        if self._writer is None or not self._writer["labels"]:
+            return
+        with namespace_write_lock(self.path):
+            manifest = read_manifest(self.path)
+            if manifest is not None and manifest["hnsw"] == self._writer["base"]:
+                self._save(manifest, self._writer)
+            self._writer = None
+
+    def _load(self):
+        """(manifest, graph, labels) for the committed global graph, or None."""
+        try:
+            stat = os.stat(os.path.join(self.path, "manifest.json"))
+        except FileNotFoundError:
+            return None
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        if stamp != self._stamp:
+            manifest = read_manifest(self.path)
+            if not manifest or not manifest["hnsw"]:
+                return None
+            if self._loaded is not None and self._loaded[0]["hnsw"] == manifest["hnsw"]:
+                # Only the dirty list changed; keep the loaded graph
+                self._loaded = (manifest,) + self._loaded[1:]
+            else:
+                graph = HnswGraph.load(os.path.join(self.path, manifest["hnsw"]), self.store.dimension)
+                labels = np.memmap(os.path.join(self.path, GLOBAL_LABELS_FILE), dtype=GLOBAL_LABEL_DTYPE,
+                                   mode="r", shape=(manifest["count"],))
+                self._loaded = (manifest, graph, labels)
+            self._stamp = stamp
+        return self._loaded
+
+    def search(self, query, namespaces, top_k, top_k_per_namespace):
+        """Best matches across the graph as (namespace, row, score), or None if there is no graph.
+
+        Namespaces the graph does not cover are returned separately so the
+        caller can search them directly.
+        """
+        loaded = self._load()
+        if loaded is None:
+            return None
+        manifest, graph, labels = loaded
+        dirty = set(manifest.get("dirty", ()))
+        # Namespaces with rows the saved graph lacks are searched directly instead
+        wanted = set(namespaces) - dirty
+        uncovered = [namespace for namespace in namespaces if namespace not in manifest["covered"] or namespace in dirty]
+
+        # Over-fetch so the per-namespace cap can still fill top_k
+        found, scores = graph.search(query, max(top_k * top_k_per_namespace, graph.ef_search))
+        per_namespace = {}
+        hits = []
+        for label, score in zip(found[0], scores[0]):
+            namespace_number, row = labels[label]
+            namespace = manifest["namespaces"][namespace_number]
+            if namespace not in wanted or per_namespace.get(namespace, 0) >= top_k_per_namespace:
+                continue
+            per_namespace[namespace] = per_namespace.get(namespace, 0) + 1
+            hits.append((namespace, int(row), float(score)))
+        return hits, uncovered
+
+
+class LocalVectorStore:
+    """In-process vector store doing exact cosine search with NumPy.
+
+    Each namespace is a directory of append-only, memory-mapped float32
+    segments with a JSON Lines sidecar for chunk text and metadata (see
+    vector_segments). Only namespaces that are actually queried get opened,
+    and at most ``max_open_namespaces`` stay mapped at once. Queries are a
+    matrix product followed by an ``argpartition`` top-k, so there is no
+    network hop. It is a drop-in replacement for PineconeGateway.
+
+    With LOCAL_HNSW_ENABLED (and hnswlib installed), namespaces larger than
+    HNSW_MIN_VECTORS also get an HNSW graph, and LOCAL_GLOBAL_HNSW_ENABLED
+    keeps one graph over all namespaces for admin search.
+    """
+
+    def __init__(self, directory=LOCAL_VECTOR_STORE_DIR, dimension=EMBEDDING_DIM,
+                 max_open_namespaces=LOCAL_MAX_OPEN_NAMESPACES):
+        self.directory = os.path.abspath(directory)
+        self.dimension = dimension
+        self.max_open_namespaces = max_open_namespaces
+        self._open_namespaces = OrderedDict()
+        self._lock = threading.Lock()
+        self._connected = False
+        self._global_graph = _GlobalGraph(self) if LOCAL_GLOBAL_HNSW_ENABLED and hnsw_enabled() else None
+
+    def _namespace_path(self, namespace):
+        return os.path.join(self.directory, NAMESPACE_DIR_PREFIX + quote(namespace or "", safe=""))
+
+    def _open_namespace(self, namespace):
+        """Return the mapped namespace, opening it on first use; None if it does not exist."""
+        with self._lock:
+            handle = self._open_namespaces.get(namespace)
+            if handle is not None:
+                self._open_namespaces.move_to_end(namespace)
+        if handle is None:
+            path = self._namespace_path(namespace)
+            if read_manifest(path) is None:
+                return None
+            handle = SegmentedNamespace(path, self.dimension)
+            with self._lock:
+                self._open_namespaces[namespace] = handle
+                while len(self._open_namespaces) > self.max_open_namespaces:
+                    self._open_namespaces.popitem(last=False)
+        else:
+            # Cheap stat of the manifest; picks up upserts from other workers
+            handle.refresh()
+        return handle
+
+    # ------------------------------------------------------------------
+    # Vector store interface
+    # ------------------------------------------------------------------
+
+    def connect(self):
+        if not self._connected:
+            os.makedirs(self.directory, exist_ok=True)
+            self._connected = True
+
+    @property
+    def is_connected(self):
+        return self._connected
+
+    def reconnect(self):
+        """Drop every open mapping; namespaces are re-opened on next use."""
+        with self._lock:
+            self._open_namespaces.clear()
+        self.connect()
+
+    def close(self):
+        """Save pending HNSW graph rows and drop every open mapping."""
+        if self._global_graph is not None:
+            self._global_graph.flush()
+        flush_writer_graphs()
+        with self._lock:
+            self._open_namespaces.clear()
+
+    def health(self):
+        try:
+            self.connect()
+            return {
+                "status": "healthy",
+                "backend": "local",
+                "directory": self.directory,
+                "open_namespaces": len(self._open_namespaces)
+            }
+        except Exception as e:
+            return {"status": "unhealthy", "backend": "local", "error": str(e)}
+
+    def upsert_vectors(self, vectors, records, namespace, ids=None):
+        """Append pre-computed vectors with their metadata records to a namespace."""
+        self.connect()
+        vectors = normalize_rows(vectors)
+        if vectors.shape[1] != self.dimension:
+            raise ValueError(f"Expected {self.dimension}-d vectors, got {vectors.shape[1]}-d")
+        ids = list(ids) if ids is not None else [str(uuid.uuid4()) for _ in records]
+        SegmentedNamespace.append(self._namespace_path(namespace), self.dimension, vectors, ids, list(records))
+        if self._global_graph is not None:
+            self._global_graph.catch_up([namespace])
+        return ids
+
+    def upsert_documents(self, documents, embedding, namespace):
+        """Embed documents and store them with their text under a namespace."""
+        vectors = embedding.embed_documents([doc.page_content for doc in documents])
+        self.upsert_embedded_documents(documents, vectors, namespace)
+        return self
+
+    def upsert_embedded_documents(self, documents, vectors, namespace):
+        """Store already embedded documents with their text under a namespace."""
+        records = [dict(doc.metadata, text=doc.page_content) for doc in documents]
+        return self.upsert_vectors(vectors, records, namespace)
+
+    def query_batch(self, vectors, top_k, namespace, include_metadata=True):
+        """Top-k matches for several query vectors in one matrix product."""
+        self.connect()
+        queries = normalize_rows(vectors)
+        handle = self._open_namespace(namespace)
+        if handle is None or handle.count == 0:
+            return [[] for _ in range(len(queries))]
+
+        rows, scores = handle.search(queries, top_k)
+        records = handle.records(rows.ravel().tolist())
+        return [
+            [
+                VectorMatch(
+                    id=records[row][0],
+                    score=float(score),
+                    metadata=records[row][1] if include_metadata else None
+                )
+                for row, score in zip(query_rows, query_scores)
+            ]
+            for query_rows, query_scores in zip(rows, scores)
+        ]
+
+    def query(self, vector, top_k, namespace, include_metadata=True):
+        return self.query_batch([vector], top_k, namespace, include_metadata)[0]
+
+    def query_namespaces(self, vector, namespaces, top_k, top_k_per_namespace=5, timeout=None):
+        """Search several namespaces and merge the best matches, like PineconeGateway."""
+        self.connect()
+        global_hits = None
+        if self._global_graph is not None:
+            global_hits = self._global_graph.search(normalize_rows(vector), namespaces, top_k, top_k_per_namespace)
+
+        if global_hits is None:
+            return merge_top_k(
+                ((namespace, self.query(vector, top_k_per_namespace, namespace)) for namespace in namespaces),
+                top_k
+            )
+
+        hits, uncovered = global_hits
+        by_namespace = {}
+        for namespace, row, score in hits:
+            by_namespace.setdefault(namespace, []).append((row, score))
+        results = []
+        for namespace, namespace_hits in by_namespace.items():
+            handle = self._open_namespace(namespace)
+            records = handle.records([row for row, _ in namespace_hits])
+            results.append((namespace, [
+                VectorMatch(id=records[row][0], score=score, metadata=records[row][1])
+                for row, score in namespace_hits
+            ]))
+        results.extend((namespace, self.query(vector, top_k_per_namespace, namespace)) for namespace in uncovered)
+        return merge_top_k(results, top_k)
+
+    def describe_index_stats(self):
+        """Vector counts per namespace, read from the manifests without mapping any segment."""
+        self.connect()
+        namespaces = {}
+        for entry in os.listdir(self.directory):
+            if not entry.startswith(NAMESPACE_DIR_PREFIX):
+                continue
+            manifest = read_manifest(os.path.join(self.directory, entry))
+            if manifest is not None:
+                namespace = unquote(entry[len(NAMESPACE_DIR_PREFIX):])
+                namespaces[namespace] = NamespaceStats(vector_count=manifest["count"])
+        return IndexStats(
+            namespaces=namespaces,
+            total_vector_count=sum(ns.vector_count for ns in namespaces.values()),
+            dimension=self.dimension
+        )
+
+
+__all__ = [
+    'LocalVectorStore',
+    'VectorMatch',
+    'normalize_rows'
+]
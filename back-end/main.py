@@ -1,35 +1,50 @@
 from fastapi import FastAPI, File, UploadFile, HTTPException, Form
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware  # CORS import
 from pydantic import BaseModel
 from typing import Optional, List
 import os
-import tempfile
+import json
+import asyncio
+import functools
+import hashlib
 import requests
 import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 
 from langchain_pymupdf4llm import PyMuPDF4LLMLoader
 from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langchain_pinecone import PineconeVectorStore
-from langchain_huggingface import HuggingFaceEmbeddings
-from langchain_groq import ChatGroq
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_community.chat_message_histories import FileChatMessageHistory
-from langchain.memory import ConversationSummaryMemory
 from langchain_core.documents import Document
-from pinecone import Pinecone, ServerlessSpec
 from legal_advisor_chatbot import LegalChatbot
 
 # Import your custom modules
-from data_processing import clean_scraped_text, chunk_text, process_scraped_data
-from web_scraper import run_scrapy_spider
+from web_scraper import astream_scrapy_items
+from crawler_service import get_crawler_service
+from vector_store import get_vector_store
+from namespace_catalog import NamespaceCatalog
+from embedding_provider import get_embeddings
+from llm_registry import get_llm, get_llm_registry, aclose_http_clients
+from answer_cache import SemanticAnswerCache, CachedRAGChain
+from single_flight import SingleFlight
+from context_builder import pack_context
+from session_memory import SessionMemory
+from legal_session_store import LegalSessionStore
+from ingestion_jobs import IngestionJobStore, IngestionJobRunner, JobProgress, JobCancelled
+from ingestion_pipeline import IngestionPipeline
+from index_updates import IndexUpdateLog
+from embedding_cache import normalize_text
 from config import (
     INDEX_NAME,
-    EMBEDDING_DIM,
-    PINECONE_ENV,
-    PINECONE_CLOUD,
-    PINECONE_API_KEY,
-    EMBEDDING_MODEL
+    ADMIN_TOP_K,
+    BLOCKING_IO_THREADS,
+    LLM_PROBE_ON_STARTUP,
+    ANSWER_CACHE_ENABLED,
+    INGESTION_UPLOAD_DIR,
+    CRAWLER_SERVICE_ENABLED,
+    CRAWLER_EMBED_UPSERT,
+    INDEX_UPDATES_POLL_INTERVAL
 )
 
 # FIXED: Add fallback for INDEX_NAME
@@ -49,8 +64,17 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize embeddings
-embeddings = HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL)
+# Shared embeddings provider: the model is loaded once, by the startup warm-up
+# or the first embed call, behind the micro-batching scheduler and the cache
+embeddings = get_embeddings()
+
+# Blocking vector store, embedding, file and memory calls run here so they never stall the event loop
+blocking_executor = ThreadPoolExecutor(max_workers=BLOCKING_IO_THREADS, thread_name_prefix="blocking-io")
+
+async def run_blocking(func, *args, **kwargs):
+    """Await a blocking call on the dedicated executor"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(blocking_executor, functools.partial(func, *args, **kwargs))
 
 # UPDATED: Add is_admin field to QueryRequest
 class QueryRequest(BaseModel):
@@ -77,35 +101,25 @@ def validate_session_id(session_id: str) -> str:
     
     return sanitized
 
-def initialize_pinecone():
-    """Initialize Pinecone client and create index if needed"""
+# Process-wide vector store (Pinecone or local, see VECTOR_STORE_BACKEND) shared by every request
+vector_backend = get_vector_store()
+
+# Cached namespace -> vector count map, refreshed on a TTL instead of per request
+namespace_catalog = NamespaceCatalog(lambda: get_vector_backend().describe_index_stats())
+
+def get_vector_backend():
+    """Return the shared vector store, connecting on first use"""
     try:
-        pc = Pinecone(api_key=PINECONE_API_KEY)
-        
-        # Check if index exists, if not create it
-        existing_indexes = pc.list_indexes().names()
-        print(f"📋 Existing indexes: {existing_indexes}")
-        
-        if INDEX_NAME not in existing_indexes:
-            print(f"🏗️  Creating new index: {INDEX_NAME}")
-            pc.create_index(
-                name=INDEX_NAME,
-                dimension=EMBEDDING_DIM,
-                metric="cosine",
-                spec=ServerlessSpec(cloud=PINECONE_CLOUD, region=PINECONE_ENV)
-            )
-            time.sleep(5)
-        else:
-            print(f"✅ Using existing index: {INDEX_NAME}")
-            
-        return pc
+        vector_backend.connect()
+        return vector_backend
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Pinecone initialization failed: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Vector store initialization failed: {str(e)}")
 
 def get_groq_llm():
-    """Initialize Groq LLM"""
-    return ChatGroq(
-        model="llama-3.3-70b-versatile",
+    """Shared Groq LLM, created once and reused across requests"""
+    return get_llm(
+        "groq",
+        "llama-3.3-70b-versatile",
         temperature=0,
         max_tokens=None,
         # reasoning_format="parsed"
@@ -114,13 +128,11 @@ def get_groq_llm():
 def create_unified_vector_store(documents, session_id: str):
     """Create vector store from documents"""
     print(f"🔧 Creating vector store with INDEX_NAME: {INDEX_NAME}")
-    pc = initialize_pinecone()
     
-    # FIXED: Pass index_name as string parameter instead of index object
-    return PineconeVectorStore.from_documents(
+    # Reuse the shared backend instead of letting LangChain build a new client
+    return get_vector_backend().upsert_documents(
         documents=documents,
         embedding=embeddings,
-        index_name=INDEX_NAME,  # Pass as string, not index object
         namespace=session_id
     )
 
@@ -128,15 +140,13 @@ def create_simple_rag_chain(session_id: str):
     """Simple RAG implementation without LangChain retrievers - Most Reliable"""
     
     def get_relevant_documents(query: str):
-        """Direct Pinecone search function"""
+        """Direct vector store search function"""
         try:
             # Get query embedding
             query_embedding = embeddings.embed_query(query)
             
-            # Direct Pinecone search
-            pc = initialize_pinecone()
-            index = pc.Index(INDEX_NAME)
-            response = index.query(
+            # Direct vector store search
+            matches = get_vector_backend().query(
                 vector=query_embedding,
                 top_k=5,
                 namespace=session_id,
@@ -145,11 +155,12 @@ def create_simple_rag_chain(session_id: str):
             
             # Convert to LangChain Document format
             documents = []
-            for match in response.matches:
+            for match in matches:
                 if match.metadata:
                     content = match.metadata.get('text', match.metadata.get('page_content', ''))
                     if content:
                         doc = Document(
+                            id=match.id,
                             page_content=content,
                             metadata=match.metadata
                         )
@@ -163,51 +174,105 @@ def create_simple_rag_chain(session_id: str):
     
     llm = get_groq_llm()
     
-    def rag_chain_invoke(inputs):
+    system_template = """
+You are a strict AI assistant. Use ONLY the below CONTEXT to answer.
+Always double-check that the answer exists explicitly in the context before responding.  
+If the answer is not in the context, say exactly: "I don't know based on the provided content."
+
+CONTEXT:
+{context}
+{summary}"""
+    
+    def build_prompt(inputs):
         question = inputs["input"]
-        chat_history = inputs.get("chat_history", [])
+        chat_history = [
+            msg for msg in inputs.get("chat_history", [])
+            if hasattr(msg, 'type') and hasattr(msg, 'content')
+        ]
         
-        # Get relevant documents
-        context_docs = get_relevant_documents(question)
+        # Older turns arrive as a rolling summary maintained by the session memory
+        summary = inputs.get("conversation_summary")
+        summary = f"\nCONVERSATION SUMMARY (earlier turns):\n{summary}\n" if summary else ""
+        
+        # Get relevant documents (already ranked best first)
+        retrieved_docs = get_relevant_documents(question)
+        
+        # Deduplicate and fit chunks, then recent history, into the token budget
+        context_docs, history, usage = pack_context(
+            retrieved_docs,
+            chat_history,
+            fixed_text=system_template.format(context="", summary=summary) + question
+        )
         
         # Format context
         context = "\n\n".join([doc.page_content for doc in context_docs])
         
         # Create prompt
-        system_message = f"""
-You are a strict AI assistant. Use ONLY the below CONTEXT to answer.
-Always double-check that the answer exists explicitly in the context before responding.  
-If the answer is not in the context, say exactly: "I don't know based on the provided content."
-
-CONTEXT:
-{context}
-"""
+        system_message = system_template.format(context=context, summary=summary)
         
         # Format messages
         messages = [("system", system_message)]
         
-        # Add chat history (last 5 messages only)
-        if chat_history:
-            for msg in chat_history[-5:]:
-                if hasattr(msg, 'type') and hasattr(msg, 'content'):
-                    messages.append((msg.type, msg.content))
+        # Add the chat history that fits
+        for msg in history:
+            messages.append((msg.type, msg.content))
         
         # Add current question
         messages.append(("human", question))
         
-        # Create prompt template and get response
+        # Create prompt template
         prompt = ChatPromptTemplate.from_messages(messages)
-        response = llm.invoke(prompt.format())
+        return prompt.format(), context_docs, usage
+    
+    def rag_chain_invoke(inputs):
+        prompt, context_docs, usage = build_prompt(inputs)
+        response = llm.invoke(prompt)
+        
+        return {
+            "answer": response.content,
+            "context": context_docs,
+            "token_usage": usage
+        }
+    
+    def rag_chain_stream(inputs):
+        # Same chunk shape as LangChain retrieval chains: context first, then answer pieces
+        prompt, context_docs, usage = build_prompt(inputs)
+        yield {"context": context_docs, "token_usage": usage}
+        for chunk in llm.stream(prompt):
+            if chunk.content:
+                yield {"answer": chunk.content}
+    
+    async def rag_chain_ainvoke(inputs):
+        # Retrieval is blocking (embedding + vector store); the Groq call is native async
+        prompt, context_docs, usage = await run_blocking(build_prompt, inputs)
+        response = await llm.ainvoke(prompt)
         
         return {
             "answer": response.content,
-            "context": context_docs
+            "context": context_docs,
+            "token_usage": usage
         }
     
+    async def rag_chain_astream(inputs):
+        prompt, context_docs, usage = await run_blocking(build_prompt, inputs)
+        yield {"context": context_docs, "token_usage": usage}
+        async for chunk in llm.astream(prompt):
+            if chunk.content:
+                yield {"answer": chunk.content}
+    
     # Return chain-like object
     class SimpleRAGChain:
         def invoke(self, inputs):
             return rag_chain_invoke(inputs)
+        
+        def stream(self, inputs):
+            return rag_chain_stream(inputs)
+        
+        async def ainvoke(self, inputs):
+            return await rag_chain_ainvoke(inputs)
+        
+        def astream(self, inputs):
+            return rag_chain_astream(inputs)
     
     return SimpleRAGChain()
 
@@ -220,58 +285,37 @@ def create_admin_rag_chain():
             # Get query embedding
             query_embedding = embeddings.embed_query(query)
             
-            # Get Pinecone index
-            pc = initialize_pinecone()
-            index = pc.Index(INDEX_NAME)
-            
             # Get all existing namespaces
-            stats = index.describe_index_stats()
-            all_namespaces = list(stats.namespaces.keys())
-            print(f"🔍 Found namespaces: {all_namespaces}")
+            all_namespaces = namespace_catalog.namespaces()
+            print(f"🔍 Searching {len(all_namespaces)} namespaces concurrently")
             
-            # Search across each namespace and combine results
-            all_documents = []
+            # Fan out across namespaces and keep the best ADMIN_TOP_K matches overall
+            top_matches = get_vector_backend().query_namespaces(
+                vector=query_embedding,
+                namespaces=all_namespaces,
+                top_k=ADMIN_TOP_K,
+                top_k_per_namespace=5  # Get top 5 from each namespace
+            )
             
-            for namespace in all_namespaces:
-                try:
-                    print(f"🔍 Searching namespace: {namespace}")
-                    response = index.query(
-                        vector=query_embedding,
-                        top_k=5,  # Get top 5 from each namespace
-                        namespace=namespace,
-                        include_metadata=True
-                    )
-                    
-                    # Convert results to documents
-                    for match in response.matches:
-                        print(f"📊 Match score: {match.score}")  # Debug similarity scores
+            # Convert results to documents
+            top_documents = []
+            for namespace, match in top_matches:
+                if match.metadata:
+                    content = match.metadata.get('text', match.metadata.get('page_content', ''))
+                    if content:
+                        # Add namespace info to metadata
+                        metadata = match.metadata.copy()
+                        metadata['source_namespace'] = namespace
+                        metadata['similarity_score'] = match.score
                         
-                        if match.metadata:  # Remove similarity threshold completely
-                            content = match.metadata.get('text', match.metadata.get('page_content', ''))
-                            if content:
-                                # Add namespace info to metadata
-                                metadata = match.metadata.copy()
-                                metadata['source_namespace'] = namespace
-                                metadata['similarity_score'] = match.score
-                                
-                                doc = Document(
-                                    page_content=content,
-                                    metadata=metadata
-                                )
-                                all_documents.append((doc, match.score))
-                    
-                    print(f"🔍 Found {len(response.matches)} matches in namespace '{namespace}'")
-                    
-                except Exception as namespace_error:
-                    print(f"Error searching namespace '{namespace}': {namespace_error}")
-                    continue
-            
-            # Sort all documents by similarity score and take top results
-            all_documents.sort(key=lambda x: x[1], reverse=True)
-            top_documents = [doc for doc, score in all_documents[:10]]  # Top 10 overall
+                        top_documents.append(Document(
+                            id=match.id,
+                            page_content=content,
+                            metadata=metadata
+                        ))
             
             print(f"🔍 Admin search found {len(top_documents)} documents across {len(all_namespaces)} namespaces")
-            print(f"📊 Score range: {all_documents[0][1]:.3f} to {all_documents[-1][1]:.3f}" if all_documents else "No documents found")
+            print(f"📊 Score range: {top_matches[0][1].score:.3f} to {top_matches[-1][1].score:.3f}" if top_matches else "No documents found")
             
             return top_documents
             
@@ -281,29 +325,9 @@ def create_admin_rag_chain():
     
     llm = get_groq_llm()
     
-    def admin_rag_chain_invoke(inputs):
-        question = inputs["input"]
-        
-        # Get relevant documents from ALL namespaces
-        context_docs = get_relevant_documents_all_namespaces(question)
-        
-        if not context_docs:
-            return {
-                "answer": "I don't have any relevant information to answer your question. Please make sure documents have been processed and indexed.",
-                "context": []
-            }
-        
-        # Format context with namespace info
-        context_parts = []
-        for doc in context_docs:
-            namespace = doc.metadata.get('source_namespace', 'unknown')
-            score = doc.metadata.get('similarity_score', 0)
-            context_parts.append(f"[Source: {namespace}] {doc.page_content}")
-        
-        context = "\n\n".join(context_parts)
-        
-        # Create admin prompt
-        system_message = f"""
+    no_context_answer = "I don't have any relevant information to answer your question. Please make sure documents have been processed and indexed."
+    
+    admin_system_template = """
 You are an AI assistant with GLOBAL access to ALL processed documents across the entire knowledge base.
 Use the CONTEXT below to answer questions. The context comes from multiple different sources and sessions.
 Each piece of context is labeled with its source namespace for reference.
@@ -311,53 +335,149 @@ Each piece of context is labeled with its source namespace for reference.
 CONTEXT:
 {context}
 """
+    
+    def labeled(doc):
+        namespace = doc.metadata.get('source_namespace', 'unknown')
+        return f"[Source: {namespace}] {doc.page_content}"
+    
+    def build_admin_prompt(inputs):
+        question = inputs["input"]
+        
+        # Get relevant documents from ALL namespaces, best score first
+        retrieved_docs = get_relevant_documents_all_namespaces(question)
+        
+        if not retrieved_docs:
+            return None, [], None
+        
+        # Deduplicate (the same page is often ingested into several sessions) and fit the token budget
+        context_docs, _, usage = pack_context(
+            retrieved_docs,
+            [],
+            fixed_text=admin_system_template.format(context="") + question,
+            format_chunk=labeled
+        )
+        
+        # Format context with namespace info
+        context = "\n\n".join(labeled(doc) for doc in context_docs)
+        
+        # Create admin prompt
+        system_message = admin_system_template.format(context=context)
         
         # Format messages
         messages = [("system", system_message)]
         messages.append(("human", question))
         
-        # Create prompt template and get response
+        # Create prompt template
         prompt = ChatPromptTemplate.from_messages(messages)
-        response = llm.invoke(prompt.format())
+        return prompt.format(), context_docs, usage
+    
+    def admin_rag_chain_invoke(inputs):
+        prompt, context_docs, usage = build_admin_prompt(inputs)
+        if prompt is None:
+            return {"answer": no_context_answer, "context": []}
+        
+        response = llm.invoke(prompt)
         
         return {
             "answer": response.content,
-            "context": context_docs
+            "context": context_docs,
+            "token_usage": usage
         }
     
+    def admin_rag_chain_stream(inputs):
+        prompt, context_docs, usage = build_admin_prompt(inputs)
+        yield {"context": context_docs, "token_usage": usage}
+        if prompt is None:
+            yield {"answer": no_context_answer}
+            return
+        for chunk in llm.stream(prompt):
+            if chunk.content:
+                yield {"answer": chunk.content}
+    
+    async def admin_rag_chain_ainvoke(inputs):
+        prompt, context_docs, usage = await run_blocking(build_admin_prompt, inputs)
+        if prompt is None:
+            return {"answer": no_context_answer, "context": []}
+        
+        response = await llm.ainvoke(prompt)
+        
+        return {
+            "answer": response.content,
+            "context": context_docs,
+            "token_usage": usage
+        }
+    
+    async def admin_rag_chain_astream(inputs):
+        prompt, context_docs, usage = await run_blocking(build_admin_prompt, inputs)
+        yield {"context": context_docs, "token_usage": usage}
+        if prompt is None:
+            yield {"answer": no_context_answer}
+            return
+        async for chunk in llm.astream(prompt):
+            if chunk.content:
+                yield {"answer": chunk.content}
+    
     # Return admin chain-like object
     class AdminRAGChain:
         def invoke(self, inputs):
             return admin_rag_chain_invoke(inputs)
+        
+        def stream(self, inputs):
+            return admin_rag_chain_stream(inputs)
+        
+        async def ainvoke(self, inputs):
+            return await admin_rag_chain_ainvoke(inputs)
+        
+        def astream(self, inputs):
+            return admin_rag_chain_astream(inputs)
     
     return AdminRAGChain()
 
-async def process_pdf(file: UploadFile):
-    """Process PDF file and return chunks"""
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as temp_file:
-        content = await file.read()
-        temp_file.write(content)
-        temp_file_path = temp_file.name
+# Semantic answer cache, consulted before retrieval; /process invalidates the namespace
+answer_cache = SemanticAnswerCache()
+ADMIN_CACHE_NAMESPACE = "*"  # admin answers span every namespace
+
+def with_answer_cache(rag_chain, namespace: str):
+    """Wrap a RAG chain so repeated or paraphrased questions are answered from the answer cache"""
+    if not ANSWER_CACHE_ENABLED:
+        return rag_chain
+    return CachedRAGChain(rag_chain, answer_cache, namespace, embeddings.embed_query, run_blocking)
+
+# Identical concurrent /query calls share one embedding + retrieval + completion
+query_flights = SingleFlight()
+
+def conversation_digest(chat_history=None, summary: Optional[str] = None) -> str:
+    """Stable digest of the earlier turns a question is asked with ("" when there are none)"""
+    if not chat_history and not summary:
+        return ""
+    digest = hashlib.sha256((summary or "").encode("utf-8"))
+    for msg in chat_history or []:
+        digest.update(b"\0" + f"{msg.type}:{msg.content}".encode("utf-8"))
+    return digest.hexdigest()
 
-    loader = PyMuPDF4LLMLoader(temp_file_path)
-    docs = loader.load()
-    os.unlink(temp_file_path)
+def query_flight_key(namespace: str, question: str, is_admin: bool, chat_history=None, summary: Optional[str] = None):
+    """Coalescing key: namespace, case- and whitespace-normalised question, admin flag, conversation digest
 
+    Only calls with the same earlier turns share a result; the same words can
+    mean something else in another conversation.
+    """
+    return (namespace, normalize_text(question).casefold(), bool(is_admin), conversation_digest(chat_history, summary))
+
+def load_pdf_chunks(path: str):
+    """Parse a PDF and split it into chunks; returns (page count, chunks)"""
+    docs = PyMuPDF4LLMLoader(path).load()
     splitter = RecursiveCharacterTextSplitter(chunk_size=500, chunk_overlap=50)
-    return splitter.split_documents(docs)
-
-def get_summary_memory(session_id: str):
-    """Get conversation memory for session"""
-    os.makedirs("./chat_histories", exist_ok=True)
-    file_path = f"./chat_histories/{session_id}.json"
-    chat_history = FileChatMessageHistory(file_path)
-    return ConversationSummaryMemory(
-        llm=get_groq_llm(),
-        chat_memory=chat_history,
-        memory_key="chat_history",
-        input_key="input",
-        return_messages=True
-    )
+    return len(docs), splitter.split_documents(docs)
+
+# Chat history per session; turns are appended on the request path, summaries are written in the background
+session_memory = SessionMemory(get_groq_llm)
+
+async def save_turn(session_id: str, question: str, answer: str):
+    """Append a finished exchange to session memory"""
+    try:
+        await run_blocking(session_memory.append_turn, session_id, question, answer)
+    except Exception as e:
+        print(f"Memory save failed: {e}")
 
 # =============================================================================
 # API ENDPOINTS
@@ -366,26 +486,108 @@ def get_summary_memory(session_id: str):
 # Health check and startup
 @app.on_event("startup")  
 async def startup_event():
-    initialize_pinecone()
+    global index_updates_applied
+    get_vector_backend()
+    embeddings.warm_up_in_background()
+    get_groq_llm()
+    if CRAWLER_SERVICE_ENABLED:
+        await run_blocking(crawler_service.start)
+    # Entries journaled before this process started are already reflected in the catalog it loads
+    index_updates_applied = await run_blocking(index_updates.latest_id)
+    await ingestion_jobs.start()
+    app.state.index_updates_follower = asyncio.create_task(follow_index_updates())
+    if LLM_PROBE_ON_STARTUP:
+        # One connectivity check per LLM client, in the background so startup does not wait on it
+        asyncio.get_running_loop().run_in_executor(blocking_executor, get_llm_registry().probe)
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    app.state.index_updates_follower.cancel()
+    await ingestion_jobs.stop()
+    await run_blocking(crawler_service.close)
+    vector_backend.close()
+    blocking_executor.shutdown(wait=False)
+    await aclose_http_clients()
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy", "message": "RAG API is running"}
+    return {
+        "status": "healthy",
+        "message": "RAG API is running",
+        "vector_store_connected": vector_backend.is_connected,
+        "embeddings_ready": embeddings.is_ready
+    }
+
+@app.get("/health/vector-store")
+async def vector_store_health(reconnect: bool = False):
+    """Check vector store reachability, optionally reconnecting first"""
+    if reconnect:
+        try:
+            vector_backend.reconnect()
+        except Exception as e:
+            print(f"Vector store reconnect failed: {e}")
+    return vector_backend.health()
+
+@app.get("/health/llm")
+async def llm_health(probe: bool = False):
+    """LLM clients and their last connectivity check; probe=true sends a test completion to each"""
+    registry = get_llm_registry()
+    if probe:
+        return {"clients": await run_blocking(registry.probe)}
+    return {"clients": registry.status()}
+
+@app.get("/stats/answer-cache")
+async def answer_cache_stats():
+    """Semantic answer cache hit/miss counters and /query coalescing counters"""
+    return {**answer_cache.stats(), "coalescing": query_flights.stats()}
+
+@app.get("/stats/session-memory")
+async def session_memory_stats():
+    """Background summarisation queue and counters"""
+    return session_memory.stats()
+
+@app.get("/stats/legal-sessions")
+async def legal_session_stats():
+    """Legal chatbot session store counters"""
+    return await run_blocking(legal_sessions.stats)
+
+@app.get("/stats/ingestion")
+async def ingestion_stats():
+    """Ingestion job counts by status, busy workers and crawler process counters"""
+    return {
+        **ingestion_jobs.stats(),
+        "jobs": await run_blocking(ingestion_jobs.store.counts),
+        "crawler": crawler_service.stats()
+    }
+
+@app.get("/stats/embeddings")
+async def embedding_cache_stats():
+    """Embedding model readiness, cache hit/miss counters and micro-batching stats"""
+    return embeddings.stats()
 
 @app.get("/")
 async def root():
     return {
         "message": "RAG API - Enhanced with Session Validation",
         "endpoints": {
-            "/process": "Process URL and/or PDF document and store in vector DB",
+            "/process": "Queue processing of a URL and/or PDF document into the vector DB; returns a job ID",
+            "/jobs/{job_id}": "Ingestion job status and progress (POST /jobs/{job_id}/cancel to cancel)",
             "/query": "Query the vector DB with a question (supports admin global access)",
+            "/query/stream": "Same as /query, streamed as Server-Sent Events (sources, token, done)",
             "/validate-session": "Validate if a session ID exists and has content",
             "/health": "Health check",
-            "/namespaces": "Get all available namespaces",
+            "/health/vector-store": "Check vector store connectivity (optionally reconnect)",
+            "/health/llm": "LLM client status (optionally probe with a test completion)",
+            "/stats/embeddings": "Embedding cache and batching statistics",
+            "/stats/answer-cache": "Semantic answer cache and query coalescing statistics",
+            "/stats/session-memory": "Background conversation summarisation statistics",
+            "/stats/legal-sessions": "Legal chatbot session store statistics",
+            "/stats/ingestion": "Ingestion job queue and crawler service statistics",
+            "/namespaces": "List namespaces (supports prefix, offset and limit)",
             "/session/{session_id}/status": "Check session status"
         },
         "usage": {
-            "step1": "Use /process to upload sources (URL and/or PDF)",
+            "step1": "Use /process to upload sources (URL and/or PDF), then poll /jobs/{job_id} until it succeeds",
             "step2": "Use /query to ask questions about the processed content",
             "admin": "Admins can query across all namespaces with is_admin=true",
             "user_login": "Users must provide valid session_id that exists in the system"
@@ -403,14 +605,153 @@ async def root():
         ]
     }
 
+# INGESTION JOBS
+async def scrape_url_pages(url: str, pipeline: IngestionPipeline, namespace: str):
+    """Stream a crawl's pages into the pipeline as Scrapy scrapes them"""
+    if CRAWLER_SERVICE_ENABLED and CRAWLER_EMBED_UPSERT:
+        return await index_url_pages(url, pipeline, namespace)
+    crawl = crawler_service.crawl if CRAWLER_SERVICE_ENABLED else astream_scrapy_items
+    pages = await pipeline.feed_pages(crawl(url))
+    if not pages:
+        raise ValueError("Scraper returned no data")
+    return f"✓ URL scraped: {pages} pages"
+
+async def index_url_pages(url: str, pipeline: IngestionPipeline, namespace: str):
+    """Crawl with the crawler process embedding and upserting the pages itself (EmbedUpsertPipeline)"""
+    outcome = {}
+    pages = 0
+    async for _ in crawler_service.crawl(url, namespace=namespace, outcome=outcome):
+        pages += 1
+        await pipeline.progress.advance("scraped", 1)
+    if not pages:
+        raise ValueError("Scraper returned no data")
+    
+    # The crawler journaled its upserts; apply them now so the namespace is searchable when the job ends
+    try:
+        await apply_index_updates()
+    except Exception as e:
+        print(f"Warning: Could not read index updates: {e}")
+    indexed = outcome.get("indexed", 0)
+    await pipeline.add_upserted(indexed)
+    return f"✓ URL scraped and indexed by the crawler: {pages} pages, {indexed} chunks"
+
+async def parse_pdf_chunks(path: str, pipeline: IngestionPipeline):
+    """Parse an uploaded PDF and push its chunks into the pipeline"""
+    pages, doc_docs = await run_blocking(load_pdf_chunks, path)
+    await pipeline.progress.advance("scraped", pages)
+    await pipeline.feed_documents([doc for doc in doc_docs if doc.page_content.strip()])
+    return f"✓ Document processed: {len(doc_docs)} chunks"
+
+def discard_upload(job: dict):
+    """Delete a job's spooled PDF, if any"""
+    path = job["sources"].get("file_path")
+    if path and os.path.exists(path):
+        os.unlink(path)
+
+# Upserts made by crawls and other workers, so this process can invalidate its caches too
+index_updates = IndexUpdateLog()
+
+def apply_upsert(namespace: str, vector_count: int):
+    """Make vectors upserted into a namespace visible to this process's caches"""
+    # Cached answers for this namespace (and admin answers) may now be incomplete
+    answer_cache.invalidate(namespace)
+    answer_cache.invalidate(ADMIN_CACHE_NAMESPACE)
+    try:
+        namespace_catalog.record_upsert(namespace, vector_count)
+    except Exception as e:
+        print(f"Warning: Could not update namespace catalog: {e}")
+
+# Journal position this process has applied up to; the lock keeps each entry from being applied twice
+index_updates_applied = 0
+index_updates_lock = asyncio.Lock()
+
+async def apply_index_updates():
+    """Apply upserts journaled by other processes (crawl pipelines, other workers) since the last call"""
+    global index_updates_applied
+    async with index_updates_lock:
+        index_updates_applied, updates = await run_blocking(index_updates.since, index_updates_applied)
+        for namespace, vector_count in updates:
+            apply_upsert(namespace, vector_count)
+
+async def follow_index_updates():
+    """Poll the journal so upserts made elsewhere reach this process's caches"""
+    while True:
+        await asyncio.sleep(INDEX_UPDATES_POLL_INTERVAL)
+        try:
+            await apply_index_updates()
+        except Exception as e:
+            print(f"Warning: Could not read index updates: {e}")
+
+def upsert_batch(session_id: str, batch, vectors):
+    """Upsert one embedded pipeline batch and make it visible to queries right away"""
+    get_vector_backend().upsert_embedded_documents(batch, vectors, session_id)
+    apply_upsert(session_id, len(batch))
+    try:
+        index_updates.record(session_id, len(batch))
+    except Exception as e:
+        print(f"Warning: Could not journal upsert: {e}")
+
+async def ingest_sources(job: dict, progress: JobProgress):
+    """Ingestion job: stream the URL crawl and the PDF through clean → chunk → embed → upsert"""
+    session_id = job["session_id"]
+    sources = job["sources"]
+    pipeline = IngestionPipeline(
+        embeddings.embed_documents,
+        functools.partial(upsert_batch, session_id),
+        run_blocking,
+        progress
+    )
+    producers = {}
+    if sources.get("url"):
+        producers["URL scraping/processing"] = scrape_url_pages(sources["url"], pipeline, session_id)
+    if sources.get("file_path"):
+        producers["Document processing"] = parse_pdf_chunks(sources["file_path"], pipeline)
+
+    try:
+        outcomes, upserted = await pipeline.run(producers)
+    finally:
+        await run_blocking(discard_upload, job)
+
+    for label, outcome in outcomes.items():
+        if isinstance(outcome, JobCancelled):
+            raise outcome
+        await progress.note(f"✗ {label} failed: {str(outcome)}" if isinstance(outcome, Exception) else outcome)
+
+    if not upserted:
+        raise ValueError("No documents were successfully processed. Check the processing status for details.")
+
+    await progress.note(f"✓ Vector store updated with {upserted} total chunks")
+    print(f"✅ Ingested {upserted} chunks into namespace '{session_id}'")
+    return {"total_chunks": upserted}
+
+# Scrapy runs in one long-lived worker process; crawls are sent to it instead of spawning `scrapy crawl`
+crawler_service = get_crawler_service()
+
+# Persistent job queue; /process enqueues and returns, workers scrape, embed and upsert in the background
+ingestion_jobs = IngestionJobRunner(IngestionJobStore(), ingest_sources, run_blocking, discard=discard_upload)
+
+def job_response(job: dict) -> dict:
+    """Public view of a job (without the spooled file path)"""
+    sources = job["sources"]
+    return {
+        **job,
+        "sources": {"url": sources.get("url"), "file_name": sources.get("file_name")},
+        "status_url": f"/jobs/{job['job_id']}"
+    }
+
+def save_upload(path: str, content: bytes):
+    os.makedirs(INGESTION_UPLOAD_DIR, exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(content)
+
 # PROCESS ENDPOINT
-@app.post("/process")
+@app.post("/process", status_code=202)
 async def process_sources_endpoint(
     file: Optional[UploadFile] = File(None),
     url: Optional[str] = Form(None),
     session_id: str = Form("default")
 ):
-    """Process URL and/or PDF document and store in vector database"""
+    """Queue a job that processes a URL and/or PDF document into the vector database"""
     print("==== /process called ====")
     print("Received URL:", url)
     print("Received File:", file.filename if file else "None")
@@ -425,9 +766,6 @@ async def process_sources_endpoint(
     
     print(f"📋 Using INDEX_NAME: {INDEX_NAME}")
 
-    documents = []
-    processing_status = []
-
     # ADDED: Validate that at least one source is provided
     if not url and not file:
         raise HTTPException(
@@ -435,98 +773,49 @@ async def process_sources_endpoint(
             detail="At least one source (URL or document) must be provided"
         )
 
-    # Process URL if provided
-    if url:
-        try:
-            # ADDED: Basic URL validation
-            if not url.startswith(('http://', 'https://')):
-                raise ValueError("URL must start with http:// or https://")
-            
-            run_scrapy_spider(url)
-            raw_data = process_scraped_data()
-            if not raw_data:
-                raise ValueError("Scraper returned no data")
-            combined_text = " ".join([entry.get("text", "") for entry in raw_data])
-            clean_text = clean_scraped_text(combined_text)
-            url_docs = chunk_text(clean_text, chunk_size=600, chunk_overlap=50)
-            documents.extend(url_docs)
-            processing_status.append(f"✓ URL scraped and processed: {len(url_docs)} chunks")
-        except Exception as e:
-            processing_status.append(f"✗ URL scraping/processing failed: {str(e)}")
+    # Reject bad input now rather than in the background job
+    if url and not url.startswith(('http://', 'https://')):
+        raise HTTPException(status_code=400, detail="URL must start with http:// or https://")
+    if file and not file.filename.endswith('.pdf'):
+        raise HTTPException(status_code=400, detail="Only PDF files are supported")
 
-    # Process PDF if provided
+    job_id = uuid.uuid4().hex
+    sources = {"url": url}
     if file:
-        if not file.filename.endswith('.pdf'):
-            raise HTTPException(status_code=400, detail="Only PDF files are supported")
-        try:
-            doc_docs = await process_pdf(file)
-            documents.extend(doc_docs)
-            processing_status.append(f"✓ Document processed: {len(doc_docs)} chunks")
-        except Exception as e:
-            processing_status.append(f"✗ Document processing failed: {str(e)}")
-
-    # ADDED: Better error handling for no successful processing
-    if not documents:
-        raise HTTPException(
-            status_code=400, 
-            detail="No documents were successfully processed. Check the processing status for details."
-        )
+        # Spooled to disk so the queued job survives the request (and a restart)
+        file_path = os.path.join(INGESTION_UPLOAD_DIR, f"{job_id}.pdf")
+        await run_blocking(save_upload, file_path, await file.read())
+        sources.update(file_name=file.filename, file_path=file_path)
 
-    # Enhanced validation
-    print(f"📝 Total documents to process: {len(documents)}")
-    
-    # Validate document content
-    non_empty_docs = [doc for doc in documents if doc.page_content.strip()]
-    print(f"📄 Non-empty documents: {len(non_empty_docs)}")
-    
-    if not non_empty_docs:
-        raise HTTPException(status_code=400, detail="All processed documents are empty")
+    job = await ingestion_jobs.submit(session_id, sources, job_id=job_id)
+    print(f"🧾 Queued ingestion job {job_id}")
+    return JSONResponse(status_code=202, content={
+        **job_response(job),
+        "message": f"Processing queued; poll /jobs/{job_id} for progress"
+    })
 
-    # Preview documents
-    for i, d in enumerate(non_empty_docs[:3]):
-        print(f"Chunk {i+1} Preview:", d.page_content[:200])
+@app.get("/jobs/{job_id}")
+async def job_status(job_id: str):
+    """Status, stage progress (scraped, chunked, embedded, upserted) and result of an ingestion job"""
+    job = await run_blocking(ingestion_jobs.store.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found")
+    return job_response(job)
 
-    # Test embedding creation
-    try:
-        test_embedding = embeddings.embed_query("test query")
-        print(f"🧮 Embedding dimension: {len(test_embedding)}")
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Embedding creation failed: {str(e)}")
-
-    # Create vector store
-    try:
-        vector_store = create_unified_vector_store(non_empty_docs, session_id)
-        processing_status.append(f"✓ Vector store updated with {len(non_empty_docs)} total chunks")
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Vector store creation failed: {str(e)}")
-
-    # Verify vectors were actually stored
-    try:
-        time.sleep(2)  # Wait for indexing
-        pc = initialize_pinecone()
-        index = pc.Index(INDEX_NAME)
-        stats = index.describe_index_stats()
-        namespace_stats = stats.namespaces.get(session_id)
-        vector_count = namespace_stats.vector_count if namespace_stats else 0
-        print(f"✅ Verified: {vector_count} vectors stored in namespace '{session_id}'")
-        processing_status.append(f"✓ Verified: {vector_count} vectors indexed")
-    except Exception as e:
-        print(f"Warning: Could not verify vector storage: {e}")
-
-    return JSONResponse({
-        "status": "Sources processed and indexed successfully",
-        "session_id": session_id,
-        "processing_details": processing_status,
-        "sources_processed": {
-            "url_provided": url is not None,
-            "document_provided": file is not None,
-            "total_chunks": len(non_empty_docs)
-        }
-    })
+@app.post("/jobs/{job_id}/cancel")
+async def cancel_job(job_id: str):
+    """Cancel a queued or running ingestion job"""
+    job = await ingestion_jobs.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found")
+    if job["status"] == "cancelled":
+        # Never started, so no worker will remove its upload
+        await run_blocking(discard_upload, job)
+    return job_response(job)
 
 
-# Create one chatbot instance per session
-chatbot_instances = {}
+# One chatbot per session: bounded LRU/idle-TTL in memory, state persisted and rehydrated on demand
+legal_sessions = LegalSessionStore(LegalChatbot)
 
 # Define request models 
 class ChatRequest(BaseModel):
@@ -545,11 +834,9 @@ async def chat(request: ChatRequest):
     user_input = request.question
 
     # Reuse chatbot instance per session
-    if session_id not in chatbot_instances:
-        chatbot_instances[session_id] = LegalChatbot()
-
-    bot = chatbot_instances[session_id]
+    bot = await run_blocking(legal_sessions.get, session_id)
     response = await bot.chat(user_input=user_input, session_id=session_id)
+    await run_blocking(legal_sessions.save, session_id, bot)
     return {"answer": response,"session_id":session_id,"retrieved_sources":None,"context_count":None,"is_admin_query":None}
 
 
@@ -574,10 +861,7 @@ async def query_endpoint(request: QueryRequest):
     # For admin queries, search across ALL namespaces
     if request.is_admin:
         try:
-            pc = initialize_pinecone()
-            index = pc.Index(INDEX_NAME)
-            stats = index.describe_index_stats()
-            total_vectors = stats.total_vector_count
+            total_vectors = await run_blocking(namespace_catalog.total_vector_count)
             
             if total_vectors == 0:
                 return JSONResponse({
@@ -589,12 +873,13 @@ async def query_endpoint(request: QueryRequest):
             print(f"📊 Admin searching across ALL namespaces with {total_vectors} total vectors")
             
             # Create admin RAG chain that searches all namespaces
-            rag_chain = create_admin_rag_chain()
+            rag_chain = with_answer_cache(create_admin_rag_chain(), ADMIN_CACHE_NAMESPACE)
             
-            # Execute admin query
-            result = rag_chain.invoke({
-                "input": request.question
-            })
+            # Retrieval runs on the blocking executor, the LLM call is awaited natively
+            result, coalesced = await query_flights.run(
+                query_flight_key(ADMIN_CACHE_NAMESPACE, request.question, True),
+                lambda: rag_chain.ainvoke({"input": request.question})
+            )
             
         except Exception as e:
             print(f"Error in admin query: {e}")
@@ -606,11 +891,7 @@ async def query_endpoint(request: QueryRequest):
     else:
         # Regular user query (existing logic)
         try:
-            pc = initialize_pinecone()
-            index = pc.Index(INDEX_NAME)
-            stats = index.describe_index_stats()
-            namespace_stats = stats.namespaces.get(request.session_id)
-            vector_count = namespace_stats.vector_count if namespace_stats else 0
+            vector_count = await run_blocking(namespace_catalog.vector_count, request.session_id)
             
             if vector_count == 0:
                 return JSONResponse({
@@ -620,22 +901,20 @@ async def query_endpoint(request: QueryRequest):
                 })
             
             print(f"📊 User namespace '{request.session_id}' has {vector_count} vectors")
-            rag_chain = create_simple_rag_chain(request.session_id)
-            memory = get_summary_memory(request.session_id)
+            rag_chain = with_answer_cache(create_simple_rag_chain(request.session_id), request.session_id)
+            summary, chat_history = await run_blocking(session_memory.load, request.session_id)
             
-            result = rag_chain.invoke({
-                "input": request.question,
-                "chat_history": memory.chat_memory.messages
-            })
+            result, coalesced = await query_flights.run(
+                query_flight_key(request.session_id, request.question, False, chat_history, summary),
+                lambda: rag_chain.ainvoke({
+                    "input": request.question,
+                    "chat_history": chat_history,
+                    "conversation_summary": summary
+                })
+            )
             
-            # Save conversation to memory
-            try:
-                memory.save_context(
-                    {"input": request.question},
-                    {"output": result["answer"]}
-                )
-            except Exception as e:
-                print(f"Memory save failed: {e}")
+            # Append the turn; summarisation, when due, happens off the request path
+            await save_turn(request.session_id, request.question, result["answer"])
                 
         except Exception as e:
             print(f"RAG chain failed: {e}")
@@ -649,13 +928,133 @@ async def query_endpoint(request: QueryRequest):
     for i, doc in enumerate(result.get("context", [])):
         print(f"Chunk {i+1}:", doc.page_content[:250], "\n---")
 
-    return JSONResponse({
+    response = {
         "answer": result["answer"],
         "session_id": request.session_id,
         "retrieved_sources": [doc.page_content for doc in result.get("context", [])],
         "context_count": len(result.get("context", [])),
-        "is_admin_query": request.is_admin
-    })
+        "is_admin_query": request.is_admin,
+        "answer_cache": result.get("answer_cache", "disabled"),
+        "coalesced": coalesced,
+        "token_usage": result.get("token_usage")
+    }
+    if "cache_similarity" in result:
+        response["cache_similarity"] = result["cache_similarity"]
+    return JSONResponse(response)
+
+# STREAMING QUERY ENDPOINT
+def sse_event(event: str, data: dict) -> str:
+    """Format one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def source_summary(doc: Document) -> dict:
+    """Identify a retrieved chunk without sending its text"""
+    source = {"id": doc.id, "source": doc.metadata.get("source")}
+    if "source_namespace" in doc.metadata:
+        source["namespace"] = doc.metadata["source_namespace"]
+        source["score"] = doc.metadata.get("similarity_score")
+    return source
+
+@app.post("/query/stream")
+async def query_stream_endpoint(request: QueryRequest):
+    """Stream a /query answer as Server-Sent Events.
+
+    Emits one "sources" event with the retrieved chunk IDs, then a "token"
+    event per piece of the Groq completion, then "done" with the
+    time-to-first-token. Failures after the stream starts arrive as an
+    "error" event; request validation errors are plain JSON like /query.
+    """
+    print(f"🔍 Streaming query with session_id: {request.session_id} (admin: {request.is_admin})")
+    
+    try:
+        if request.session_id != '*':  # Admin uses '*' for global search
+            request.session_id = validate_session_id(request.session_id)
+    except HTTPException as e:
+        return JSONResponse({
+            "error": f"Invalid session ID: {e.detail}",
+            "session_id": request.session_id
+        })
+    
+    save_to_memory = False
+    try:
+        if request.is_admin:
+            if await run_blocking(namespace_catalog.total_vector_count) == 0:
+                return JSONResponse({
+                    "error": "No documents found in the entire knowledge base.",
+                    "session_id": request.session_id,
+                    "suggestion": "Process some documents first"
+                })
+            rag_chain = with_answer_cache(create_admin_rag_chain(), ADMIN_CACHE_NAMESPACE)
+            inputs = {"input": request.question}
+        else:
+            if await run_blocking(namespace_catalog.vector_count, request.session_id) == 0:
+                return JSONResponse({
+                    "error": f"No vectors found in namespace '{request.session_id}'. Please process documents first.",
+                    "session_id": request.session_id,
+                    "suggestion": "Use /process endpoint to upload and process documents first"
+                })
+            rag_chain = with_answer_cache(create_simple_rag_chain(request.session_id), request.session_id)
+            summary, chat_history = await run_blocking(session_memory.load, request.session_id)
+            inputs = {
+                "input": request.question,
+                "chat_history": chat_history,
+                "conversation_summary": summary
+            }
+            save_to_memory = True
+    except Exception as e:
+        print(f"Streaming query setup failed: {e}")
+        return JSONResponse({
+            "error": f"Failed to process query: {str(e)}",
+            "session_id": request.session_id
+        })
+    
+    async def events():
+        start = time.perf_counter()
+        first_token_ms = None
+        answer_parts = []
+        cache_status = {"answer_cache": "disabled"}
+        try:
+            async for chunk in rag_chain.astream(inputs):
+                if "answer_cache" in chunk:
+                    cache_status = chunk
+                elif "context" in chunk:
+                    yield sse_event("sources", {
+                        "session_id": request.session_id,
+                        "is_admin_query": request.is_admin,
+                        "context_count": len(chunk["context"]),
+                        "sources": [source_summary(doc) for doc in chunk["context"]],
+                        "token_usage": chunk.get("token_usage"),
+                        **cache_status
+                    })
+                elif "answer" in chunk:
+                    if first_token_ms is None:
+                        first_token_ms = round((time.perf_counter() - start) * 1000, 1)
+                        print(f"⏱️ Time to first token: {first_token_ms} ms")
+                    answer_parts.append(chunk["answer"])
+                    yield sse_event("token", {"text": chunk["answer"]})
+        except Exception as e:
+            print(f"Streaming query failed: {e}")
+            yield sse_event("error", {"error": f"Failed to process query: {str(e)}"})
+            return
+        
+        answer = "".join(answer_parts)
+        # Persist only complete answers, before "done" so a client that closes on it cannot skip the save
+        if save_to_memory:
+            await save_turn(request.session_id, request.question, answer)
+        
+        yield sse_event("done", {
+            "session_id": request.session_id,
+            "time_to_first_token_ms": first_token_ms,
+            **cache_status,
+            "total_ms": round((time.perf_counter() - start) * 1000, 1),
+            "answer_length": len(answer)
+        })
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 # SESSION VALIDATION ENDPOINT (NEW)
 @app.post("/validate-session")
@@ -682,21 +1081,16 @@ async def validate_session_endpoint(request: SessionValidationRequest):
                 "session_id": session_id
             })
         
-        # Check if session exists in Pinecone
-        pc = initialize_pinecone()
-        index = pc.Index(INDEX_NAME)
-        stats = index.describe_index_stats()
-        
         # Check if namespace exists and has vectors
-        namespace_stats = stats.namespaces.get(session_id)
+        vector_count = await run_blocking(namespace_catalog.vector_count, session_id)
         
-        if namespace_stats and namespace_stats.vector_count > 0:
-            print(f"✅ Session validation successful: '{session_id}' has {namespace_stats.vector_count} vectors")
+        if vector_count > 0:
+            print(f"✅ Session validation successful: '{session_id}' has {vector_count} vectors")
             return JSONResponse({
                 "valid": True,
                 "session_id": session_id,
-                "vector_count": namespace_stats.vector_count,
-                "message": f"Session found with {namespace_stats.vector_count} documents"
+                "vector_count": vector_count,
+                "message": f"Session found with {vector_count} documents"
             })
         else:
             print(f"❌ Session validation failed: '{session_id}' not found or empty")
@@ -721,16 +1115,13 @@ async def check_session_status(session_id: str):
     """Check the status of a specific session"""
     try:
         session_id = validate_session_id(session_id)
-        pc = initialize_pinecone()
-        index = pc.Index(INDEX_NAME)
-        stats = index.describe_index_stats()
-        namespace_stats = stats.namespaces.get(session_id)
+        vector_count = await run_blocking(namespace_catalog.vector_count, session_id)
         
-        if namespace_stats and namespace_stats.vector_count > 0:
+        if vector_count > 0:
             return JSONResponse({
                 "session_id": session_id,
                 "exists": True,
-                "vector_count": namespace_stats.vector_count,
+                "vector_count": vector_count,
                 "status": "active",
                 "valid": True
             })
@@ -753,29 +1144,38 @@ async def check_session_status(session_id: str):
 
 # NAMESPACES ENDPOINT
 @app.get("/namespaces")
-async def get_namespaces():
-    """Get all available namespaces from Pinecone index"""
+async def get_namespaces(
+    prefix: str = "",
+    offset: int = 0,
+    limit: Optional[int] = None,
+    refresh: bool = False
+):
+    """Get available namespaces from the namespace catalog, with prefix search and pagination"""
+    if offset < 0 or (limit is not None and limit < 1):
+        raise HTTPException(status_code=400, detail="offset must be >= 0 and limit >= 1")
+    
     try:
-        pc = initialize_pinecone()
-        index = pc.Index(INDEX_NAME)
-        stats = index.describe_index_stats()
-        
-        # Get all namespace names
-        namespaces = list(stats.namespaces.keys())
+        if refresh:
+            await run_blocking(namespace_catalog.refresh)
         
-        # Sort namespaces for better UX (put '0000' and 'default' first if they exist)
-        priority_namespaces = ['0000', 'default']
-        regular_namespaces = [ns for ns in namespaces if ns not in priority_namespaces]
-        priority_existing = [ns for ns in priority_namespaces if ns in namespaces]
+        def load_page():
+            # '0000' and 'default' come first, the rest alphabetically
+            page, matching_count = namespace_catalog.search(prefix=prefix, offset=offset, limit=limit)
+            return page, matching_count, namespace_catalog.namespace_count(), namespace_catalog.total_vector_count()
         
-        sorted_namespaces = priority_existing + sorted(regular_namespaces)
+        # The catalog may refresh from the vector store, so it is read off the event loop
+        page, matching_count, total_count, total_vectors = await run_blocking(load_page)
         
-        print(f"📋 Found {len(namespaces)} namespaces: {sorted_namespaces}")
+        print(f"📋 Returning {len(page)} of {matching_count} namespaces matching '{prefix}'")
         
         return JSONResponse({
-            "namespaces": sorted_namespaces,
-            "total_count": len(namespaces),
-            "total_vectors": stats.total_vector_count
+            "namespaces": page,
+            "total_count": total_count,
+            "matching_count": matching_count,
+            "offset": offset,
+            "limit": limit,
+            "has_more": offset + len(page) < matching_count,
+            "total_vectors": total_vectors
         })
         
     except Exception as e:
@@ -0,0 +1,77 @@
+"""Copy legacy ./chat_histories/{session_id}.json files into the SQLite chat history store.
+
+Run from back-end/:
+
+    python migrate_chat_histories.py
+    python migrate_chat_histories.py --source ./chat_histories --archive
+
+Sessions that already have messages in the store are skipped, so the
+migration can be re-run safely. Rolling summaries written next to the
+history files ({session_id}.summary.json) are migrated too. With --archive
+each migrated file is renamed to *.migrated.
+"""
+import argparse
+import glob
+import json
+import os
+
+from langchain_core.messages import messages_from_dict
+
+from config import CHAT_HISTORY_DIR, CHAT_HISTORY_DB_PATH
+from chat_history_store import ChatHistoryStore
+
+SUMMARY_SUFFIX = ".summary.json"
+
+
+def load_json(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def migrate(source, store, archive=False):
+    migrated = skipped = failed = 0
+    for path in sorted(glob.glob(os.path.join(source, "*.json"))):
+        if path.endswith(SUMMARY_SUFFIX):
+            continue
+        session_id = os.path.basename(path)[:-len(".json")]
+        if store.has_session(session_id):
+            skipped += 1
+            continue
+        try:
+            messages = messages_from_dict(load_json(path))
+            if messages:
+                store.append(session_id, messages)
+            summary_path = os.path.join(source, session_id + SUMMARY_SUFFIX)
+            if os.path.exists(summary_path):
+                state = load_json(summary_path)
+                store.set_summary(session_id, state.get("summary", ""), state.get("summarized_count", 0))
+        except Exception as e:
+            failed += 1
+            print(f"❌ {path}: {e}")
+            continue
+
+        migrated += 1
+        print(f"✅ {session_id}: {len(messages)} messages")
+        if archive:
+            os.replace(path, path + ".migrated")
+            if os.path.exists(summary_path):
+                os.replace(summary_path, summary_path + ".migrated")
+    return migrated, skipped, failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--source", default=CHAT_HISTORY_DIR, help="directory of per-session JSON files")
+    parser.add_argument("--db", default=CHAT_HISTORY_DB_PATH, help="SQLite chat history database")
+    parser.add_argument("--archive", action="store_true", help="rename migrated files to *.migrated")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.source):
+        raise SystemExit(f"No chat history directory at {args.source}")
+
+    migrated, skipped, failed = migrate(args.source, ChatHistoryStore(args.db), archive=args.archive)
+    print(f"\n📦 Migrated {migrated} sessions, skipped {skipped} already in {args.db}, {failed} failed")
+
+
+if __name__ == "__main__":
+    main()
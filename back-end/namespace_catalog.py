@@ -0,0 +1,134 @@
+import bisect
+import threading
+import time
+
+from config import NAMESPACE_CATALOG_TTL, NAMESPACE_CATALOG_MISS_REFRESH
+from single_flight import BlockingSingleFlight
+
+# Namespaces shown ahead of the alphabetical list in the UI
+PRIORITY_NAMESPACES = ['0000', 'default']
+
+
+class NamespaceCatalog:
+    """In-process cache of per-namespace vector counts.
+
+    ``describe_index_stats()`` is called at most once per TTL instead of on
+    every request. Existence checks are dict lookups, and a sorted copy of
+    the namespace names serves prefix search and pagination for /namespaces.
+    Concurrent refreshes are coalesced, so an expired TTL triggers one
+    load however many requests notice it.
+    """
+
+    def __init__(self, stats_loader, ttl_seconds=NAMESPACE_CATALOG_TTL,
+                 miss_refresh_seconds=NAMESPACE_CATALOG_MISS_REFRESH):
+        self._stats_loader = stats_loader
+        self.ttl_seconds = ttl_seconds
+        self.miss_refresh_seconds = miss_refresh_seconds
+        self._counts = {}
+        self._sorted_names = []
+        self._total_vectors = 0
+        self._refreshed_at = 0.0
+        self._lock = threading.RLock()
+        self._refreshes = BlockingSingleFlight()
+
+    def refresh(self):
+        """Reload the namespace map from the vector store, joining a reload already in flight."""
+        self._refreshes.run("refresh", self._load)
+
+    def _refresh_if_older(self, max_age):
+        # Age is re-checked by the leader: a caller that saw the map stale
+        # just before another refresh finished must not start a second one
+        self._refreshes.run("refresh", lambda: self._load() if self._age() > max_age else None)
+
+    def _load(self):
+        stats = self._stats_loader()
+        counts = {
+            name: namespace_stats.vector_count
+            for name, namespace_stats in stats.namespaces.items()
+        }
+        with self._lock:
+            self._counts = counts
+            self._sorted_names = sorted(counts)
+            self._total_vectors = sum(counts.values())
+            self._refreshed_at = time.monotonic()
+        print(f"📚 Namespace catalog refreshed: {len(counts)} namespaces")
+
+    def _age(self):
+        return time.monotonic() - self._refreshed_at
+
+    def _ensure_fresh(self):
+        if self._age() > self.ttl_seconds:
+            self._refresh_if_older(self.ttl_seconds)
+
+    def vector_count(self, namespace):
+        """Vector count for one namespace, 0 if unknown."""
+        self._ensure_fresh()
+        count = self._counts.get(namespace)
+        if count is None and self._age() > self.miss_refresh_seconds:
+            # The namespace may have been created by another worker since the last refresh
+            self._refresh_if_older(self.miss_refresh_seconds)
+            count = self._counts.get(namespace)
+        return count or 0
+
+    def exists(self, namespace):
+        return self.vector_count(namespace) > 0
+
+    def total_vector_count(self):
+        self._ensure_fresh()
+        return self._total_vectors
+
+    def namespace_count(self):
+        self._ensure_fresh()
+        return len(self._counts)
+
+    def namespaces(self):
+        """All known namespace names, sorted."""
+        self._ensure_fresh()
+        return list(self._sorted_names)
+
+    def record_upsert(self, namespace, vector_count):
+        """Account for vectors just upserted so readers see them before the next refresh."""
+        with self._lock:
+            if namespace not in self._counts:
+                bisect.insort(self._sorted_names, namespace)
+                self._counts[namespace] = 0
+            self._counts[namespace] += vector_count
+            self._total_vectors += vector_count
+            return self._counts[namespace]
+
+    def search(self, prefix="", offset=0, limit=None):
+        """Return (page, matching_count) for namespaces starting with prefix.
+
+        Priority namespaces come first, the rest in alphabetical order.
+        """
+        self._ensure_fresh()
+        with self._lock:
+            names = self._sorted_names
+            start = bisect.bisect_left(names, prefix)
+            end = bisect.bisect_left(names, prefix + '\U0010ffff') if prefix else len(names)
+            priority = [ns for ns in PRIORITY_NAMESPACES
+                        if ns.startswith(prefix) and ns in self._counts]
+            regular_count = end - start - len(priority)
+            matching_count = len(priority) + regular_count
+
+            if limit is None:
+                limit = matching_count
+            page = priority[offset:offset + limit]
+
+            remaining = limit - len(page)
+            if remaining > 0:
+                # Index of the first regular name on the page: step over priority names sorted before it
+                i = start + max(0, offset - len(priority))
+                for position in sorted(bisect.bisect_left(names, ns) for ns in priority):
+                    if position <= i:
+                        i += 1
+                window = names[i:min(end, i + remaining + len(priority))]
+                page.extend([name for name in window if name not in PRIORITY_NAMESPACES][:remaining])
+
+        return page, matching_count
+
+
+__all__ = [
+    'NamespaceCatalog',
+    'PRIORITY_NAMESPACES'
+]
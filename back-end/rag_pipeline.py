@@ -1,8 +1,7 @@
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain.chains import RetrievalQA
 from langchain.chains.combine_documents import create_stuff_documents_chain
-from langchain_ollama import OllamaLLM
-from config import GROK_API_KEY
+from llm_registry import get_llm
 from langchain.chains import create_history_aware_retriever, create_retrieval_chain
 import re
 
@@ -13,12 +12,11 @@ def format_docs(retrieved_docs):
     return context_text
 
 def get_local_chat_llm():
+    """Shared Ollama client; connectivity is checked by the startup probe, not here."""
     try:
-        print("Initializing Ollama connection...")
-        
-        llm = OllamaLLM(
-            base_url='http://localhost:11434',
-            model="qwen2.5:0.5b",
+        return get_llm(
+            "ollama",
+            "qwen2.5:0.5b",
             temperature=0.7,
             top_k=10,
             top_p=0.9,
@@ -26,47 +24,24 @@ def get_local_chat_llm():
             timeout=300
         )
         
-        print("Testing connection...")
-        test_response = llm.invoke("Hello")
-        print(f"Test response: {test_response[:50]}...")
-        
-        return llm
-        
     except Exception as e:
-        print(f"Ollama connection failed: {str(e)}")
-        print("\nTry these steps:")
-        print("1. Run 'ollama serve' in a separate terminal")
-        print("2. Verify with: curl http://localhost:11434/api/tags")
-        print("3. Check model exists: ollama list")
+        print(f"Ollama client creation failed: {str(e)}")
         return None
 
 
-from langchain_openai import ChatOpenAI
-import os
-
 def get_groq_chat_llm():
+    """Shared Groq client via the OpenAI-compatible endpoint."""
     try:
-        print("Initializing Groq LLM connection...")
-
-        # Set the Groq API key and endpoint (OpenAI-compatible)
-        os.environ["OPENAI_API_KEY"] = GROK_API_KEY  # 🔒 Replace with your key
-        groq_llm = ChatOpenAI(
-            base_url="https://api.groq.com/openai/v1",
-            model="llama-3.3-70b-versatile",
-            api_key= GROK_API_KEY, # or "mistral-7b-instruct"
+        return get_llm(
+            "groq-openai",
+            "llama-3.3-70b-versatile",
             temperature=0.3,
             max_tokens=2048,
-            timeout=30,
+            timeout=30
         )
 
-        # Optional: test the LLM
-        test = groq_llm.invoke("Hello from Groq!")
-        print(f"Groq response: {test.content[:60]}...")
-
-        return groq_llm
-
     except Exception as e:
-        print(f"Groq connection failed: {e}")
+        print(f"Groq client creation failed: {e}")
         return None
 
 
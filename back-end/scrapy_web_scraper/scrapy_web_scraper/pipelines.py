@@ -1,5 +1,17 @@
+import json
+import os
+import sys
+from collections import deque
+
 from scrapy.pipelines.images import ImagesPipeline
 from scrapy import Request
+from twisted.internet.defer import Deferred, DeferredList
+from twisted.internet.threads import deferToThread
+
+# back-end/, for the shared text cleaning, embedding provider and vector store
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+# Written into the crawl directory by EmbedUpsertPipeline (matches web_scraper.EMBED_UPSERT_REPORT)
+EMBED_UPSERT_REPORT = "embed_upsert.json"
 
 class UniversalImagesPipeline(ImagesPipeline):
 
@@ -12,3 +24,136 @@ class UniversalImagesPipeline(ImagesPipeline):
         # Store file paths of downloaded images
         item['image_files'] = [x['path'] for ok, x in results if ok]
         return item
+
+
+class EmbedUpsertPipeline:
+    """Clean, chunk, embed and upsert item text while the crawl runs.
+
+    Active when the spider gets a ``namespace`` argument (``-a namespace=``
+    or CrawlerService.crawl(namespace=...)). Each item's
+    text is cleaned and chunked, chunks are collected into batches of
+    EMBED_UPSERT_BATCH_SIZE, and every full batch is embedded with the
+    shared embedding provider and upserted into the namespace on a reactor
+    thread. With more than EMBED_UPSERT_MAX_PENDING batches in flight,
+    process_item returns a Deferred that fires only when one finishes;
+    Scrapy's scraper slot then fills up and the engine stops scheduling
+    new responses, so the crawl waits for indexing instead of buffering.
+    close_spider returns a Deferred for the last batches, so the crawl
+    ends when its content is indexed.
+
+    Every upsert is journaled in IndexUpdateLog, so API processes drop
+    their cached answers and count the vectors in their catalog. A failed
+    batch closes the spider with reason "embed_upsert_failed". With a
+    CRAWLS_DIR setting the outcome is also written to the crawl's
+    EMBED_UPSERT_REPORT, which run_scrapy_spider checks; the crawler
+    service reads the crawl stats instead.
+    """
+
+    def __init__(self, batch_size, max_pending, stats, crawls_dir):
+        self.batch_size = batch_size
+        self.max_pending = max_pending
+        self.stats = stats
+        self.crawls_dir = crawls_dir
+        self.namespace = None
+        self.batch = []
+        self.pending = set()
+        self.waiting = deque()  # (Deferred, item) held back until a batch finishes
+        self.upserted = 0
+        self.errors = []
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        return cls(
+            batch_size=crawler.settings.getint("EMBED_UPSERT_BATCH_SIZE", 64),
+            max_pending=crawler.settings.getint("EMBED_UPSERT_MAX_PENDING", 4),
+            stats=crawler.stats,
+            crawls_dir=crawler.settings.get("CRAWLS_DIR")
+        )
+
+    def open_spider(self, spider):
+        self.namespace = getattr(spider, "namespace", None)
+        if not self.namespace:
+            return
+        if BACKEND_DIR not in sys.path:
+            sys.path.insert(0, BACKEND_DIR)
+        from data_processing import clean_scraped_text, chunk_text
+        from embedding_provider import get_embeddings
+        from vector_store import get_vector_store
+        from index_updates import IndexUpdateLog
+        self.clean_scraped_text = clean_scraped_text
+        self.chunk_text = chunk_text
+        self.embeddings = get_embeddings()
+        self.vector_store = get_vector_store()
+        self.index_updates = IndexUpdateLog()
+        spider.logger.info(f"Embedding and upserting into namespace '{self.namespace}' during the crawl")
+
+    def process_item(self, item, spider):
+        if not self.namespace or self.errors:
+            return item
+        text = self.clean_scraped_text(item.get("text") or "")
+        chunks = (self.chunk_text(text, chunk_size=600, chunk_overlap=50) or []) if text else []
+        self.batch.extend(chunk for chunk in chunks if chunk.page_content.strip())
+        if len(self.batch) < self.batch_size:
+            return item
+
+        self._submit(spider)
+        if len(self.pending) <= self.max_pending:
+            return item
+        # Embed queue full: hold this item back until a batch finishes
+        waiter = Deferred()
+        self.waiting.append((waiter, item))
+        self.stats.inc_value("embed_upsert/backpressure_waits", spider=spider)
+        return waiter
+
+    def _submit(self, spider):
+        batch, self.batch = self.batch, []
+        d = deferToThread(self._embed_and_upsert, batch)
+        self.pending.add(d)
+        d.addCallbacks(
+            self._batch_upserted, self._batch_failed,
+            callbackArgs=(spider,), errbackArgs=(spider, len(batch))
+        )
+        d.addBoth(self._batch_finished, d)
+
+    def _embed_and_upsert(self, batch):
+        # Runs on a reactor thread; the provider's micro-batching and cache are shared with other batches
+        self.vector_store.upsert_documents(documents=batch, embedding=self.embeddings, namespace=self.namespace)
+        # Lets API processes invalidate their answer cache and update their namespace catalog
+        self.index_updates.record(self.namespace, len(batch))
+        return len(batch)
+
+    def _batch_upserted(self, count, spider):
+        self.upserted += count
+        self.stats.inc_value("embed_upsert/chunks", count, spider=spider)
+        self.stats.inc_value("embed_upsert/batches", spider=spider)
+
+    def _batch_failed(self, failure, spider, count):
+        self.stats.inc_value("embed_upsert/failed_chunks", count, spider=spider)
+        spider.logger.error(f"Embedding/upserting {count} chunks failed: {failure.getErrorMessage()}")
+        if not self.errors:
+            # The namespace would be left incomplete anyway; stop crawling pages that cannot be indexed
+            spider.crawler.engine.close_spider(spider, "embed_upsert_failed")
+        self.errors.append(failure.getErrorMessage())
+
+    def _batch_finished(self, _, d):
+        self.pending.discard(d)
+        if self.waiting:
+            waiter, item = self.waiting.popleft()
+            waiter.callback(item)
+
+    def close_spider(self, spider):
+        if not self.namespace:
+            return None
+        if self.batch and not self.errors:
+            self._submit(spider)
+        d = DeferredList(list(self.pending))
+        if self.crawls_dir:
+            d.addCallback(lambda _: self._write_report(spider))
+        return d
+
+    def _write_report(self, spider):
+        report = {"namespace": self.namespace, "upserted": self.upserted, "errors": self.errors}
+        crawl_dir = os.path.join(self.crawls_dir, spider.crawl_id)
+        os.makedirs(crawl_dir, exist_ok=True)
+        with open(os.path.join(crawl_dir, EMBED_UPSERT_REPORT), "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
@@ -14,8 +14,14 @@ DEPTH_LIMIT = 1
 # Enable image downloading pipeline
 ITEM_PIPELINES = {
     "scrapy_web_scraper.pipelines.UniversalImagesPipeline": 1,
+    # Indexes items into the vector store during the crawl when the spider gets -a namespace=...
+    "scrapy_web_scraper.pipelines.EmbedUpsertPipeline": 300,
 }
 
+# Embed-and-upsert pipeline: chunks per batch, and batches in flight before the crawl is paused
+EMBED_UPSERT_BATCH_SIZE = int(os.getenv("SCRAPY_EMBED_UPSERT_BATCH_SIZE", "64"))
+EMBED_UPSERT_MAX_PENDING = int(os.getenv("SCRAPY_EMBED_UPSERT_MAX_PENDING", "4"))
+
 # Where to store downloaded images
 IMAGES_STORE = "downloaded_images"
 
@@ -23,15 +29,17 @@ IMAGES_STORE = "downloaded_images"
 FEED_EXPORT_ENCODING = "utf-8"
 
 
-OUTPUT_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "output.json"))
+# Each crawl writes its own JSON Lines shards under crawls/<crawl_id>/ (the spider's crawl_id
+# argument), so concurrent crawls never share a file; web_scraper adds a manifest.json afterwards
+CRAWLS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "crawls"))
+FEED_SHARD_ITEMS = int(os.getenv("SCRAPY_FEED_SHARD_ITEMS", "500"))                      # items per shard file
+FEED_COMPRESS = os.getenv("SCRAPY_FEED_COMPRESS", "false").lower() == "true"             # gzip each shard
 
 FEEDS = {
-    '../output.json': {  # use .. to write to root folder
-        'format': 'json',
-        'overwrite': True,
+    os.path.join(CRAWLS_DIR, "%(crawl_id)s", "items-%(batch_id)05d.jsonl" + (".gz" if FEED_COMPRESS else "")): {
+        'format': 'jsonlines',
         'encoding': 'utf8',
-        'indent': 2,
+        'batch_item_count': FEED_SHARD_ITEMS,
+        'postprocessing': ['scrapy.extensions.postprocessing.GzipPlugin'] if FEED_COMPRESS else [],
     },
 }
-
-
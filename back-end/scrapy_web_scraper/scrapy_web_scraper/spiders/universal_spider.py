@@ -1,3 +1,5 @@
+import uuid
+
 import scrapy
 from ..items import UniversalItem
 from urllib.parse import urljoin
@@ -15,9 +17,13 @@ class UniversalSpider(scrapy.Spider):
         'DOWNLOAD_TIMEOUT': 60
     }
 
-    def __init__(self, start_url=None, *args, **kwargs):
+    def __init__(self, start_url=None, crawl_id=None, namespace=None, *args, **kwargs):
         super(UniversalSpider, self).__init__(*args, **kwargs)
         self.start_urls = [start_url]
+        # Names this crawl's feed directory (see FEEDS in settings)
+        self.crawl_id = crawl_id or uuid.uuid4().hex
+        # Vector store namespace EmbedUpsertPipeline indexes into; None leaves indexing to the caller
+        self.namespace = namespace
 
     def parse(self, response):
         item = UniversalItem()
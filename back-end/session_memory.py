@@ -0,0 +1,109 @@
+import queue
+import threading
+
+from langchain_core.messages import HumanMessage, AIMessage, get_buffer_string
+
+from config import SUMMARY_TOKEN_THRESHOLD, SUMMARY_KEEP_RECENT_MESSAGES, CONTEXT_MAX_HISTORY_MESSAGES
+from context_builder import count_tokens
+from chat_history_store import get_chat_history_store
+
+SUMMARY_PROMPT = """Progressively summarize the lines of conversation provided, adding onto the previous summary and returning a new summary.
+Keep names, amounts, dates and decisions. Answer with the summary only.
+
+Current summary:
+{summary}
+
+New lines of conversation:
+{new_lines}
+
+New summary:"""
+
+
+class SessionMemory:
+    """Per-session chat history with a rolling summary maintained in the background.
+
+    append_turn() stores the question and answer in the chat history store
+    and returns; no LLM call happens on the request path. When the
+    messages not yet covered by the summary (excluding the most recent
+    ``keep_recent`` ones) exceed ``token_threshold`` tokens, the session is
+    queued and a worker thread folds them into the summary with one LLM
+    call. load() returns the summary plus the newest messages it does not
+    cover.
+    """
+
+    def __init__(self, llm_factory, store=None, token_threshold=SUMMARY_TOKEN_THRESHOLD,
+                 keep_recent=SUMMARY_KEEP_RECENT_MESSAGES, window=CONTEXT_MAX_HISTORY_MESSAGES):
+        self.llm_factory = llm_factory
+        self.store = store or get_chat_history_store()
+        self.token_threshold = token_threshold
+        self.keep_recent = keep_recent
+        self.window = window
+        self._queue = queue.Queue()
+        self._queued = set()
+        self._queued_lock = threading.Lock()
+        self._worker = None
+        self.summaries_written = 0
+        self.summary_failures = 0
+
+    def load(self, session_id):
+        """Return (summary, up to ``window`` newest messages not folded into the summary)."""
+        summary, summarized_count = self.store.get_summary(session_id)
+        return summary, self.store.recent(session_id, self.window, start=summarized_count)
+
+    def append_turn(self, session_id, question, answer):
+        """Record one exchange and schedule summarisation if the backlog is large enough."""
+        count = self.store.append(session_id, [HumanMessage(content=question), AIMessage(content=answer)])
+        _, summarized_count = self.store.get_summary(session_id)
+        pending = self.store.range(session_id, summarized_count, count - self.keep_recent)
+        if pending and count_tokens(get_buffer_string(pending)) >= self.token_threshold:
+            self._schedule(session_id)
+
+    def _schedule(self, session_id):
+        with self._queued_lock:
+            if session_id in self._queued:
+                return
+            self._queued.add(session_id)
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name="session-summariser", daemon=True)
+                self._worker.start()
+        self._queue.put(session_id)
+
+    def _run(self):
+        while True:
+            session_id = self._queue.get()
+            with self._queued_lock:
+                self._queued.discard(session_id)
+            try:
+                self.summarise(session_id)
+            except Exception as e:
+                self.summary_failures += 1
+                print(f"⚠️ Summarising session '{session_id}' failed: {e}")
+
+    def summarise(self, session_id):
+        """Fold everything but the most recent messages into the session summary."""
+        summary, summarized_count = self.store.get_summary(session_id)
+        upto = self.store.count(session_id) - self.keep_recent
+        if upto <= summarized_count:
+            return summary
+
+        new_lines = get_buffer_string(self.store.range(session_id, summarized_count, upto))
+        response = self.llm_factory().invoke(SUMMARY_PROMPT.format(summary=summary or "(none)", new_lines=new_lines))
+        summary = getattr(response, "content", response).strip()
+        # Ignored if another pass already stored a summary covering more messages
+        self.store.set_summary(session_id, summary, upto)
+        self.summaries_written += 1
+        print(f"📝 Summarised {upto - summarized_count} messages for session '{session_id}'")
+        return summary
+
+    def stats(self):
+        return {
+            "queued_sessions": self._queue.qsize(),
+            "summaries_written": self.summaries_written,
+            "summary_failures": self.summary_failures
+        }
+
+
+__all__ = [
+    'SessionMemory',
+    'SUMMARY_PROMPT'
+]
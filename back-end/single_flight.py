@@ -0,0 +1,108 @@
+import asyncio
+import threading
+
+
+class SingleFlight:
+    """Coalesce identical concurrent async calls into one.
+
+    The first caller for a key starts the computation as a task; callers
+    arriving with the same key while it runs await that task instead of
+    starting their own, and everyone receives the same result (or
+    exception). The key is forgotten as soon as the task finishes, so this
+    deduplicates in-flight work only and never serves stale results.
+    Must be used from a single event loop.
+    """
+
+    def __init__(self):
+        self._inflight = {}
+        self.leaders = 0
+        self.followers = 0
+
+    async def run(self, key, factory):
+        """Return (result, shared): shared is True when another caller's computation was reused."""
+        task = self._inflight.get(key)
+        shared = task is not None
+        if shared:
+            self.followers += 1
+        else:
+            self.leaders += 1
+            task = asyncio.ensure_future(factory())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # Shield so one caller being cancelled does not cancel the work others wait on
+        return await asyncio.shield(task), shared
+
+    def stats(self):
+        return {
+            "in_flight": len(self._inflight),
+            "leaders": self.leaders,
+            "followers": self.followers
+        }
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class BlockingSingleFlight:
+    """SingleFlight for blocking calls made from several threads.
+
+    Same contract as SingleFlight: the first caller for a key runs
+    ``factory()`` on its own thread, callers arriving while it runs block
+    until it finishes and share its result (or exception), and the key is
+    forgotten as soon as the call returns.
+    """
+
+    def __init__(self):
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.followers = 0
+
+    def run(self, key, factory):
+        """Return (result, shared): shared is True when another caller's computation was reused."""
+        with self._lock:
+            call = self._inflight.get(key)
+            shared = call is not None
+            if shared:
+                self.followers += 1
+            else:
+                self.leaders += 1
+                call = self._inflight[key] = _Call()
+
+        if shared:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = factory()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            call.done.set()
+        return call.result, False
+
+    def stats(self):
+        with self._lock:
+            in_flight = len(self._inflight)
+        return {
+            "in_flight": in_flight,
+            "leaders": self.leaders,
+            "followers": self.followers
+        }
+
+
+__all__ = [
+    'SingleFlight',
+    'BlockingSingleFlight'
+]
@@ -0,0 +1,69 @@
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from answer_cache import SemanticAnswerCache, CachedRAGChain
+
+
+class Chain:
+    def __init__(self):
+        self.calls = 0
+
+    async def ainvoke(self, inputs):
+        self.calls += 1
+        return {"answer": f"answer {self.calls}", "context": ["chunk"]}
+
+
+async def run_blocking(func, *args):
+    return func(*args)
+
+
+def embed_query(text):
+    # Same vector for the same words, whatever the case
+    return [1.0, float(len(text.casefold().split()))]
+
+
+def history(*turns):
+    return {"chat_history": list(turns), "conversation_summary": ""}
+
+
+def test_repeated_question_with_history_is_a_hit():
+    chain = Chain()
+    cached = CachedRAGChain(chain, SemanticAnswerCache(threshold=0.999), "session", embed_query, run_blocking)
+    question = "What is the monthly rent in the lease agreement?"
+
+    async def main():
+        first = await cached.ainvoke({"input": question, **history("hello")})
+        second = await cached.ainvoke({"input": question, **history("hello", first["answer"], "thanks")})
+        return first, second
+
+    first, second = asyncio.run(main())
+    assert first["answer_cache"] == "miss"
+    assert second["answer_cache"] == "hit"
+    assert second["answer"] == first["answer"]
+    assert chain.calls == 1
+
+
+def test_follow_up_with_history_bypasses_the_cache():
+    chain = Chain()
+    cached = CachedRAGChain(chain, SemanticAnswerCache(threshold=0.999), "session", embed_query, run_blocking)
+
+    async def main():
+        return [await cached.ainvoke({"input": "and the deposit?", **history("what is the rent?")}) for _ in range(2)]
+
+    results = asyncio.run(main())
+    assert [result["answer_cache"] for result in results] == ["bypass", "bypass"]
+    assert chain.calls == 2
+
+
+def test_follow_up_without_history_uses_the_cache():
+    chain = Chain()
+    cached = CachedRAGChain(chain, SemanticAnswerCache(threshold=0.999), "session", embed_query, run_blocking)
+
+    async def main():
+        return [await cached.ainvoke({"input": "and the deposit?", **history()}) for _ in range(2)]
+
+    results = asyncio.run(main())
+    assert [result["answer_cache"] for result in results] == ["miss", "hit"]
@@ -0,0 +1,37 @@
+import gzip
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from data_processing import process_scraped_data
+from web_scraper import MANIFEST_NAME
+
+
+def write_shard(path, items):
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "wt", encoding="utf-8") as f:
+        for item in items:
+            f.write(json.dumps(item) + "\n")
+        f.write("\n")  # blank lines are skipped
+
+
+def test_reads_plain_and_gzipped_shards_in_name_order(tmp_path):
+    write_shard(str(tmp_path / "items-00001.jsonl.gz"), [{"url": "c"}])
+    write_shard(str(tmp_path / "items-00000.jsonl"), [{"url": "a"}, {"url": "b"}])
+    (tmp_path / "unrelated.json").write_text("{}")
+
+    items = process_scraped_data(str(tmp_path))
+
+    assert not isinstance(items, list)  # a generator, so large crawls are not loaded at once
+    assert [item["url"] for item in items] == ["a", "b", "c"]
+
+
+def test_manifest_order_wins(tmp_path):
+    write_shard(str(tmp_path / "items-00000.jsonl"), [{"url": "a"}])
+    write_shard(str(tmp_path / "items-00001.jsonl.gz"), [{"url": "b"}])
+    manifest = {"shards": [{"file": "items-00001.jsonl.gz"}, {"file": "items-00000.jsonl"}]}
+    (tmp_path / MANIFEST_NAME).write_text(json.dumps(manifest))
+
+    assert [item["url"] for item in process_scraped_data(str(tmp_path))] == ["b", "a"]
@@ -0,0 +1,92 @@
+import logging
+import os
+import sys
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "scrapy_web_scraper")))
+
+from twisted.internet.defer import Deferred
+
+from scrapy_web_scraper import pipelines
+from scrapy_web_scraper.pipelines import EmbedUpsertPipeline
+
+
+class Stats:
+    def __init__(self):
+        self.values = {}
+
+    def inc_value(self, key, count=1, spider=None):
+        self.values[key] = self.values.get(key, 0) + count
+
+
+class Engine:
+    def __init__(self):
+        self.closed = []
+
+    def close_spider(self, spider, reason):
+        self.closed.append(reason)
+
+
+def make_pipeline(monkeypatch, batch_size=2, max_pending=1):
+    # Batches are handed to Deferreds the test fires itself instead of reactor threads
+    submitted = []
+
+    def defer_to_thread(func, batch):
+        d = Deferred()
+        submitted.append((d, batch))
+        return d
+
+    monkeypatch.setattr(pipelines, "deferToThread", defer_to_thread)
+    pipeline = EmbedUpsertPipeline(batch_size, max_pending, Stats(), crawls_dir=None)
+    pipeline.namespace = "session"
+    pipeline.clean_scraped_text = lambda text: text
+    pipeline.chunk_text = lambda text, **kwargs: [SimpleNamespace(page_content=text)]
+    spider = SimpleNamespace(logger=logging.getLogger("test"), crawler=SimpleNamespace(engine=Engine()), crawl_id="c")
+    return pipeline, spider, submitted
+
+
+def test_batches_and_holds_items_while_too_many_batches_are_pending(monkeypatch):
+    pipeline, spider, submitted = make_pipeline(monkeypatch)
+    items = [{"text": f"page {i}"} for i in range(5)]
+
+    assert pipeline.process_item(items[0], spider) is items[0]
+    assert pipeline.process_item(items[1], spider) is items[1]  # first batch submitted, one pending
+    assert [len(batch) for _, batch in submitted] == [2]
+    assert pipeline.process_item(items[2], spider) is items[2]
+
+    held = pipeline.process_item(items[3], spider)  # second batch: two pending, over max_pending
+    assert isinstance(held, Deferred)
+    assert pipeline.stats.values["embed_upsert/backpressure_waits"] == 1
+    released = []
+    held.addCallback(released.append)
+
+    submitted[0][0].callback(2)
+    assert released == [items[3]]
+    assert pipeline.upserted == 2
+
+    assert pipeline.process_item(items[4], spider) is items[4]
+    closed = []
+    pipeline.close_spider(spider).addCallback(closed.append)
+    assert [len(batch) for _, batch in submitted] == [2, 2, 1]  # the partial batch is flushed on close
+    assert not closed
+
+    submitted[1][0].callback(2)
+    submitted[2][0].callback(1)
+    assert closed
+    assert pipeline.upserted == 5
+    assert pipeline.stats.values["embed_upsert/batches"] == 3
+
+
+def test_failed_batch_closes_the_spider_and_stops_indexing(monkeypatch):
+    pipeline, spider, submitted = make_pipeline(monkeypatch, max_pending=4)
+
+    pipeline.process_item({"text": "a"}, spider)
+    pipeline.process_item({"text": "b"}, spider)
+    submitted[0][0].errback(RuntimeError("upsert failed"))
+
+    assert spider.crawler.engine.closed == ["embed_upsert_failed"]
+    assert pipeline.errors == ["upsert failed"]
+    for text in "cde":
+        pipeline.process_item({"text": text}, spider)
+    pipeline.close_spider(spider)
+    assert len(submitted) == 1
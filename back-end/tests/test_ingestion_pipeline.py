@@ -0,0 +1,72 @@
+import asyncio
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from langchain_core.documents import Document
+
+from ingestion_pipeline import IngestionPipeline
+
+
+class Progress:
+    async def advance(self, stage, amount, note=None):
+        pass
+
+    async def note(self, message):
+        pass
+
+
+class OneChunkPerPage(IngestionPipeline):
+    def _split_page(self, page):
+        return [Document(page_content=page["text"])]
+
+
+async def run_blocking(func, *args):
+    return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+
+async def pages(count):
+    for i in range(count):
+        yield {"text": f"page {i}"}
+
+
+def embed(texts):
+    return [[1.0, 0.0] for _ in texts]
+
+
+def test_upsert_failure_after_producers_finish_is_raised():
+    # 23 pages fill every queue while the first upsert is still running;
+    # the upsert then fails and run() must raise instead of hanging
+    def upsert(batch, vectors):
+        time.sleep(1)
+        raise RuntimeError("upsert failed")
+
+    pipeline = OneChunkPerPage(embed, upsert, run_blocking, Progress(), batch_size=4, max_wait=0.1, page_queue_size=2)
+
+    async def main():
+        await asyncio.wait_for(pipeline.run({"url": pipeline.feed_pages(pages(23))}), timeout=10)
+
+    with pytest.raises(RuntimeError, match="upsert failed"):
+        asyncio.run(main())
+
+
+def test_vectors_are_upserted_with_their_batch():
+    upserted = []
+
+    def upsert(batch, vectors):
+        assert len(batch) == len(vectors)
+        upserted.extend(zip(batch, vectors))
+
+    pipeline = OneChunkPerPage(embed, upsert, run_blocking, Progress(), batch_size=4, max_wait=0.1, page_queue_size=2)
+
+    async def main():
+        return await asyncio.wait_for(pipeline.run({"url": pipeline.feed_pages(pages(23))}), timeout=10)
+
+    outcomes, count = asyncio.run(main())
+    assert outcomes == {"url": 23}
+    assert count == 23
+    assert sorted(doc.page_content for doc, _ in upserted) == sorted(f"page {i}" for i in range(23))
@@ -0,0 +1,474 @@
+import json
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict, namedtuple
+from contextlib import contextmanager
+
+import numpy as np
+
+from config import (
+    LOCAL_SEGMENT_MERGE_FANOUT,
+    LOCAL_HNSW_ENABLED,
+    LOCAL_HNSW_SAVE_INTERVAL,
+    LOCAL_MAX_OPEN_NAMESPACES,
+    HNSW_MIN_VECTORS
+)
+from hnsw_index import HnswGraph, hnsw_available
+
+MANIFEST_FILE = "manifest.json"
+RECORDS_FILE = "records.jsonl"
+OFFSETS_FILE = "records.idx"
+LOCK_FILE = ".lock"
+
+# Immutable snapshot of a namespace; swapped as a whole when the manifest changes
+_View = namedtuple("_View", ["stamp", "count", "segments", "offsets", "hnsw"])
+_EMPTY_VIEW = _View(None, 0, (), None, None)
+
+# Graphs kept by writers between upserts so each append only inserts the new rows; saved
+# every LOCAL_HNSW_SAVE_INTERVAL seconds, and when evicted (LRU) or flushed on close
+_writer_graphs = OrderedDict()  # namespace path -> _WriterGraph
+_writer_graphs_lock = threading.Lock()
+
+
+class _WriterGraph:
+    """A writer's in-memory graph: ``name`` is the saved file it extends, ``graph`` may hold more rows."""
+
+    __slots__ = ("name", "graph", "saved_at")
+
+    def __init__(self, name, graph, saved_at):
+        self.name = name
+        self.graph = graph
+        self.saved_at = saved_at
+
+
+def top_k_indices(scores, k):
+    """Indices of the k highest scores in each row, best first.
+
+    ``argpartition`` selects the top k in linear time; only those k are sorted.
+    """
+    n = scores.shape[-1]
+    k = min(k, n)
+    if k == 0:
+        return np.empty(scores.shape[:-1] + (0,), dtype=np.int64)
+    if k < n:
+        candidates = np.argpartition(-scores, k - 1, axis=-1)[..., :k]
+    else:
+        candidates = np.broadcast_to(np.arange(n), scores.shape[:-1] + (n,))
+    candidate_scores = np.take_along_axis(scores, candidates, axis=-1)
+    order = np.argsort(-candidate_scores, axis=-1)
+    return np.take_along_axis(candidates, order, axis=-1)
+
+
+def hnsw_enabled():
+    return LOCAL_HNSW_ENABLED and hnsw_available()
+
+
+def open_segments(path, manifest, dimension):
+    return [
+        (entry["name"], np.memmap(os.path.join(path, entry["name"]), dtype=np.float32,
+                                  mode="r", shape=(entry["count"], dimension)))
+        for entry in manifest["segments"]
+    ]
+
+
+def iter_segment_rows(segments, start):
+    """Yield (first_row, vectors) for every stored row from ``start`` on."""
+    first_row = 0
+    for _, segment in segments:
+        end_row = first_row + len(segment)
+        if end_row > start:
+            skip = max(0, start - first_row)
+            yield first_row + skip, segment[skip:]
+        first_row = end_row
+
+
+def read_manifest(path):
+    """Load a namespace manifest, or None if the namespace has none yet."""
+    try:
+        with open(os.path.join(path, MANIFEST_FILE), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def write_manifest(path, manifest):
+    tmp_path = os.path.join(path, MANIFEST_FILE + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, os.path.join(path, MANIFEST_FILE))
+
+
+@contextmanager
+def namespace_write_lock(path, timeout=30, stale_after=300):
+    """Cross-process lock around namespace writes, based on an O_EXCL lock file."""
+    lock_path = os.path.join(path, LOCK_FILE)
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileExistsError:
+            try:
+                # A writer that died while holding the lock leaves the file behind
+                if time.time() - os.path.getmtime(lock_path) > stale_after:
+                    os.remove(lock_path)
+                    continue
+            except FileNotFoundError:
+                continue
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"Timed out waiting for namespace lock {lock_path}")
+            time.sleep(0.01)
+    try:
+        yield
+    finally:
+        os.close(fd)
+        os.remove(lock_path)
+
+
+class SegmentedNamespace:
+    """Read view of one namespace stored as memory-mapped float32 segments.
+
+    On disk a namespace is a directory holding:
+
+    - ``manifest.json``: dimension, committed vector count and segment list
+    - ``seg-NNNNNN.f32``: raw row-major float32 vectors, never modified once written
+    - ``records.jsonl`` / ``records.idx``: one JSON line per vector with its id
+      and metadata, plus the uint64 byte offset of each line
+
+    Segments are opened with ``np.memmap``, so opening a namespace only reads
+    the manifest. Vector pages are loaded by the OS on first query and shared
+    through the page cache between worker processes. Writers append a new
+    segment and then swap the manifest, so readers only ever see committed data.
+    After each append, adjacent segments of similar size are merged
+    (size-tiered), so the segment count stays logarithmic.
+    """
+
+    def __init__(self, path, dimension):
+        self.path = path
+        self.dimension = dimension
+        self._view = _EMPTY_VIEW
+        self._graph = None
+        self.refresh()
+
+    @property
+    def count(self):
+        return self._view.count
+
+    def _manifest_stamp(self):
+        try:
+            stat = os.stat(os.path.join(self.path, MANIFEST_FILE))
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def refresh(self):
+        """Re-open the namespace if another writer has committed since the last look."""
+        stamp = self._manifest_stamp()
+        if stamp == self._view.stamp:
+            return
+        manifest = read_manifest(self.path)
+        if manifest is None:
+            self._view = _EMPTY_VIEW._replace(stamp=stamp)
+            return
+
+        # Keep mappings of segments that did not change
+        opened = {name: segment for name, segment in self._view.segments}
+        segments = []
+        for entry in manifest["segments"]:
+            segment = opened.get(entry["name"])
+            if segment is None:
+                segment = np.memmap(
+                    os.path.join(self.path, entry["name"]),
+                    dtype=np.float32,
+                    mode="r",
+                    shape=(entry["count"], self.dimension)
+                )
+            segments.append((entry["name"], segment))
+
+        count = manifest["count"]
+        offsets = np.memmap(os.path.join(self.path, OFFSETS_FILE), dtype=np.uint64,
+                            mode="r", shape=(count,)) if count else None
+        hnsw = manifest.get("hnsw") if hnsw_enabled() else None
+        self._view = _View(stamp, count, tuple(segments), offsets, hnsw)
+
+    def _load_graph(self, hnsw):
+        """HNSW graph named in the manifest, loaded on first search."""
+        graph = self._graph
+        if graph is None or graph[0] != hnsw["name"]:
+            graph = (hnsw["name"], HnswGraph.load(os.path.join(self.path, hnsw["name"]), self.dimension))
+            self._graph = graph
+        return graph[1]
+
+    def _exact_search(self, view, queries, k, start=0):
+        scores = [queries @ vectors.T for _, vectors in iter_segment_rows(view.segments, start)]
+        if not scores:
+            return np.empty((len(queries), 0), dtype=np.int64), np.empty((len(queries), 0), dtype=np.float32)
+        scores = np.concatenate(scores, axis=1)
+        rows = top_k_indices(scores, k)
+        return rows + start, np.take_along_axis(scores, rows, axis=1)
+
+    def search(self, queries, k):
+        """Top-k (rows, scores) for each normalised query, best first.
+
+        Uses the HNSW graph when the namespace has one; rows committed after
+        the graph was last saved are scanned exactly and merged in.
+        """
+        view = self._view
+        if view.hnsw is None:
+            return self._exact_search(view, queries, k)
+
+        try:
+            graph = self._load_graph(view.hnsw)
+        except (OSError, RuntimeError) as e:
+            # The graph was replaced between our manifest read and now
+            print(f"Warning: HNSW graph unavailable for {self.path}, using exact search: {e}")
+            return self._exact_search(view, queries, k)
+
+        rows, scores = graph.search(queries, k)
+        if view.hnsw["count"] < view.count:
+            tail_rows, tail_scores = self._exact_search(view, queries, k, start=view.hnsw["count"])
+            rows = np.concatenate([rows, tail_rows], axis=1)
+            scores = np.concatenate([scores, tail_scores], axis=1)
+            best = top_k_indices(scores, k)
+            rows = np.take_along_axis(rows, best, axis=1)
+            scores = np.take_along_axis(scores, best, axis=1)
+        return rows, scores
+
+    def records(self, rows):
+        """Fetch (id, metadata) for the given row numbers from the sidecar."""
+        offsets = self._view.offsets
+        found = {}
+        with open(os.path.join(self.path, RECORDS_FILE), "rb") as f:
+            for row in sorted(set(rows)):
+                f.seek(int(offsets[row]))
+                record = json.loads(f.readline())
+                found[row] = (record["id"], record["metadata"])
+        return found
+
+    @classmethod
+    def append(cls, path, dimension, vectors, ids, records):
+        """Append vectors and their records as a new segment and commit it."""
+        if len(ids) == 0:
+            return (read_manifest(path) or {}).get("count", 0)
+        os.makedirs(path, exist_ok=True)
+        with namespace_write_lock(path):
+            manifest = read_manifest(path) or {
+                "dimension": dimension,
+                "count": 0,
+                "records_bytes": 0,
+                "next_segment": 0,
+                "segments": []
+            }
+            if manifest["dimension"] != dimension:
+                raise ValueError(f"Namespace at {path} holds {manifest['dimension']}-d vectors, got {dimension}-d")
+
+            name = f"seg-{manifest['next_segment']:06d}.f32"
+            np.ascontiguousarray(vectors, dtype=np.float32).tofile(os.path.join(path, name))
+
+            records_path = os.path.join(path, RECORDS_FILE)
+            offsets_path = os.path.join(path, OFFSETS_FILE)
+            # Drop anything an interrupted writer left past the last commit
+            for file_path, size in ((records_path, manifest["records_bytes"]),
+                                    (offsets_path, manifest["count"] * 8)):
+                if os.path.exists(file_path) and os.path.getsize(file_path) > size:
+                    with open(file_path, "r+b") as f:
+                        f.truncate(size)
+
+            offsets = []
+            position = manifest["records_bytes"]
+            with open(records_path, "ab") as f:
+                for vector_id, record in zip(ids, records):
+                    line = (json.dumps({"id": vector_id, "metadata": record}, ensure_ascii=False) + "\n").encode("utf-8")
+                    offsets.append(position)
+                    position += len(line)
+                    f.write(line)
+            with open(offsets_path, "ab") as f:
+                np.asarray(offsets, dtype=np.uint64).tofile(f)
+
+            first_row = manifest["count"]
+            manifest["segments"].append({"name": name, "count": len(offsets)})
+            manifest["count"] += len(offsets)
+            manifest["records_bytes"] = position
+            manifest["next_segment"] += 1
+
+            old_graph = manifest.get("hnsw")
+            evicted = []
+            if hnsw_enabled() and manifest["count"] >= HNSW_MIN_VECTORS:
+                evicted = cls._update_graph(path, manifest, dimension)
+
+            write_manifest(path, manifest)
+
+            if old_graph and old_graph != manifest.get("hnsw"):
+                remove_quietly(os.path.join(path, old_graph["name"]))
+
+        # Outside our lock: saving takes each evicted namespace's own lock
+        for evicted_path, writer in evicted:
+            cls._flush_graph(evicted_path, writer)
+        cls._compact(path)
+        return first_row
+
+    @staticmethod
+    def _update_graph(path, manifest, dimension):
+        """Insert rows the namespace graph does not cover yet; save it if it is due.
+
+        Returns the (path, _WriterGraph) entries evicted from the writer cache,
+        to be flushed once the namespace lock is released.
+        """
+        with _writer_graphs_lock:
+            writer = _writer_graphs.pop(path, None)
+        hnsw = manifest.get("hnsw")
+        if writer is None or writer.name != (hnsw["name"] if hnsw else None):
+            # Not cached, or another process saved a newer graph since
+            if hnsw is not None:
+                graph = HnswGraph.load(os.path.join(path, hnsw["name"]), dimension)
+                writer = _WriterGraph(hnsw["name"], graph, time.monotonic())
+            else:
+                # First build: index everything already stored
+                writer = _WriterGraph(None, HnswGraph.create(dimension, capacity=manifest["count"]), None)
+
+        graph = writer.graph
+        for first_row, vectors in iter_segment_rows(open_segments(path, manifest, dimension), graph.count):
+            graph.add(vectors, first_row)
+
+        # Saving rewrites the whole graph, so do it on a timer rather than per append
+        if writer.saved_at is None or time.monotonic() - writer.saved_at >= LOCAL_HNSW_SAVE_INTERVAL:
+            SegmentedNamespace._save_graph(path, manifest, writer)
+
+        with _writer_graphs_lock:
+            _writer_graphs[path] = writer
+            evicted = []
+            while len(_writer_graphs) > LOCAL_MAX_OPEN_NAMESPACES:
+                evicted.append(_writer_graphs.popitem(last=False))
+        return evicted
+
+    @staticmethod
+    def _save_graph(path, manifest, writer):
+        """Save the writer's graph under a name of its row count and point the manifest at it."""
+        graph = writer.graph
+        hnsw = manifest.get("hnsw")
+        if hnsw is None or graph.count > hnsw["count"]:
+            name = f"hnsw-{graph.count:012d}.bin"
+            graph.save(os.path.join(path, name))
+            manifest["hnsw"] = {"name": name, "count": graph.count}
+            writer.name = name
+        writer.saved_at = time.monotonic()
+
+    @staticmethod
+    def _flush_graph(path, writer):
+        """Save rows a writer graph holds beyond its saved file."""
+        with namespace_write_lock(path):
+            manifest = read_manifest(path)
+            hnsw = manifest.get("hnsw") if manifest else None
+            if hnsw is None or hnsw["name"] != writer.name or writer.graph.count <= hnsw["count"]:
+                return  # nothing unsaved, or superseded by a graph saved elsewhere
+            SegmentedNamespace._save_graph(path, manifest, writer)
+            write_manifest(path, manifest)
+        remove_quietly(os.path.join(path, hnsw["name"]))
+
+    @staticmethod
+    def _merge_run(segments, fanout):
+        """Newest run of ``fanout`` or more adjacent segments in the same size tier, or None.
+
+        A segment of n rows is in tier floor(log_fanout(n)). Merging a run
+        moves its rows up a tier, so each row is rewritten O(log N) times
+        and at most ``fanout - 1`` segments stay in any tier.
+        """
+        def tier(count):
+            level = 0
+            while count >= fanout:
+                count //= fanout
+                level += 1
+            return level
+
+        if not segments:
+            return None
+        newest = tier(segments[-1]["count"])
+        length = 0
+        for entry in reversed(segments):
+            if tier(entry["count"]) > newest:
+                break
+            length += 1
+        return segments[-length:] if length >= fanout else None
+
+    @classmethod
+    def _compact(cls, path, fanout=LOCAL_SEGMENT_MERGE_FANOUT):
+        """Merge runs of similar-sized segments until none is left.
+
+        Segments are immutable, so the merged file is written without the
+        namespace lock; the lock is only taken to swap it into the manifest,
+        and a run another writer merged first is dropped.
+        """
+        while True:
+            run = cls._merge_run((read_manifest(path) or {}).get("segments", []), fanout)
+            if run is None:
+                return
+            run_names = [entry["name"] for entry in run]
+            name = f"{run_names[0][:-len('.f32')]}-{run_names[-1][len('seg-'):]}"
+            tmp_path = os.path.join(path, f"{name}.{uuid.uuid4().hex}.tmp")
+            try:
+                with open(tmp_path, "wb") as out:
+                    for segment_name in run_names:
+                        with open(os.path.join(path, segment_name), "rb") as f:
+                            while True:
+                                block = f.read(1 << 20)
+                                if not block:
+                                    break
+                                out.write(block)
+            except FileNotFoundError:
+                # Another writer merged and removed part of this run meanwhile
+                remove_quietly(tmp_path)
+                return
+
+            with namespace_write_lock(path):
+                manifest = read_manifest(path)
+                names = [entry["name"] for entry in manifest["segments"]]
+                start = names.index(run_names[0]) if run_names[0] in names else -1
+                if start < 0 or names[start:start + len(run_names)] != run_names:
+                    remove_quietly(tmp_path)
+                    return
+                os.replace(tmp_path, os.path.join(path, name))
+                manifest["segments"][start:start + len(run_names)] = [
+                    {"name": name, "count": sum(entry["count"] for entry in run)}
+                ]
+                write_manifest(path, manifest)
+
+            for segment_name in run_names:
+                remove_quietly(os.path.join(path, segment_name))
+
+
+def flush_writer_graphs():
+    """Save and drop every namespace graph this process holds unsaved rows for (on close)."""
+    with _writer_graphs_lock:
+        writers = list(_writer_graphs.items())
+        _writer_graphs.clear()
+    for path, writer in writers:
+        try:
+            SegmentedNamespace._flush_graph(path, writer)
+        except (OSError, TimeoutError) as e:
+            print(f"Warning: Could not save HNSW graph for {path}: {e}")
+
+
+def remove_quietly(file_path):
+    try:
+        os.remove(file_path)
+    except OSError:
+        # Still mapped by a reader (Windows); harmless, it is no longer referenced
+        pass
+
+
+__all__ = [
+    'SegmentedNamespace',
+    'top_k_indices',
+    'hnsw_enabled',
+    'flush_writer_graphs',
+    'open_segments',
+    'iter_segment_rows',
+    'remove_quietly',
+    'read_manifest',
+    'write_manifest',
+    'namespace_write_lock'
+]
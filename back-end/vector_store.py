@@ -0,0 +1,298 @@
+import heapq
+import math
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeoutError
+
+from langchain_pinecone import PineconeVectorStore
+from pinecone import Pinecone, ServerlessSpec
+from config import (
+    INDEX_NAME,
+    EMBEDDING_DIM,
+    PINECONE_ENV,
+    PINECONE_CLOUD,
+    PINECONE_API_KEY,
+    PINECONE_POOL_THREADS,
+    PINECONE_CONNECTION_POOL_MAXSIZE,
+    ADMIN_SEARCH_CONCURRENCY,
+    ADMIN_NAMESPACE_TIMEOUT,
+    VECTOR_STORE_BACKEND
+)
+
+
+def merge_top_k(namespace_matches, top_k):
+    """Merge (namespace, matches) pairs into the best top_k overall.
+
+    Uses a bounded min-heap, so memory stays O(top_k) however many
+    namespaces are merged. Returns (namespace, match) pairs by descending score.
+    """
+    heap = []
+    sequence = 0
+    for namespace, matches in namespace_matches:
+        for match in matches:
+            # sequence breaks score ties so matches themselves are never compared
+            entry = (match.score, sequence, namespace, match)
+            sequence += 1
+            if len(heap) < top_k:
+                heapq.heappush(heap, entry)
+            elif entry[0] > heap[0][0]:
+                heapq.heapreplace(heap, entry)
+    return [(namespace, match) for _, _, namespace, match in sorted(heap, reverse=True)]
+
+
+class PineconeGateway:
+    """Process-wide Pinecone client and Index handle.
+
+    The client, the index host lookup and the ``Index`` object are created
+    once and reused by every request, so the HTTP connection pool stays warm
+    and requests skip the ``list_indexes()`` control-plane round trip.
+    """
+
+    def __init__(self, api_key=PINECONE_API_KEY, index_name=INDEX_NAME):
+        self.api_key = api_key
+        self.index_name = index_name
+        self._client = None
+        self._index = None
+        self._lock = threading.Lock()
+        self._executor = None
+        self.connected_at = None
+
+    def _connect(self):
+        """Create the client, make sure the index exists and open the Index handle."""
+        if not self.api_key:
+            raise ValueError("Pinecone API key not found")
+
+        client = Pinecone(api_key=self.api_key, pool_threads=PINECONE_POOL_THREADS)
+
+        existing_indexes = client.list_indexes().names()
+        print(f"📋 Existing indexes: {existing_indexes}")
+
+        if self.index_name not in existing_indexes:
+            print(f"🏗️  Creating new index: {self.index_name}")
+            client.create_index(
+                name=self.index_name,
+                dimension=EMBEDDING_DIM,
+                metric="cosine",
+                spec=ServerlessSpec(cloud=PINECONE_CLOUD, region=PINECONE_ENV)
+            )
+            while not client.describe_index(self.index_name).status.get("ready"):
+                time.sleep(1)
+        else:
+            print(f"✅ Using existing index: {self.index_name}")
+
+        # Resolve the data-plane host once so Index() does not look it up again
+        host = client.describe_index(self.index_name).host
+        index = client.Index(
+            host=host,
+            pool_threads=PINECONE_POOL_THREADS,
+            connection_pool_maxsize=PINECONE_CONNECTION_POOL_MAXSIZE
+        )
+
+        self._client = client
+        self._index = index
+        self.connected_at = time.time()
+
+    def connect(self):
+        self.index
+
+    @property
+    def client(self):
+        """Shared Pinecone client, connecting on first use."""
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._connect()
+        return self._client
+
+    @property
+    def index(self):
+        """Shared Index handle, connecting on first use."""
+        if self._index is None:
+            with self._lock:
+                if self._index is None:
+                    self._connect()
+        return self._index
+
+    @property
+    def is_connected(self):
+        return self._index is not None
+
+    def reconnect(self):
+        """Drop the current client and Index handle and build fresh ones."""
+        with self._lock:
+            self.close()
+            self._connect()
+        return self._index
+
+    def close(self):
+        """Release the pooled connections held by the Index handle."""
+        index, self._index, self._client = self._index, None, None
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+        self.connected_at = None
+        if index is not None and hasattr(index, "close"):
+            try:
+                index.close()
+            except Exception as e:
+                print(f"Warning: Could not close Pinecone index cleanly: {e}")
+
+    def query(self, vector, top_k, namespace, include_metadata=True):
+        """Run a similarity query against one namespace and return its matches."""
+        response = self.index.query(
+            vector=vector,
+            top_k=top_k,
+            namespace=namespace,
+            include_metadata=include_metadata
+        )
+        return response.matches
+
+    def _get_executor(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=ADMIN_SEARCH_CONCURRENCY,
+                        thread_name_prefix="pinecone-fanout"
+                    )
+        return self._executor
+
+    def query_namespaces(self, vector, namespaces, top_k, top_k_per_namespace=5,
+                         timeout=ADMIN_NAMESPACE_TIMEOUT):
+        """Query many namespaces concurrently and merge the best matches.
+
+        At most ADMIN_SEARCH_CONCURRENCY queries are in flight at once. Each
+        query is given ``timeout`` seconds; namespaces that fail or time out
+        are skipped. Matches are merged through a bounded min-heap of size
+        ``top_k``, so the full result set is never sorted. Returns a list of
+        (namespace, match) pairs ordered by descending score.
+        """
+        if not namespaces:
+            return []
+
+        index = self.index
+        executor = self._get_executor()
+
+        def query_one(namespace):
+            response = index.query(
+                vector=vector,
+                top_k=top_k_per_namespace,
+                namespace=namespace,
+                include_metadata=True,
+                _request_timeout=timeout
+            )
+            return response.matches
+
+        futures = {executor.submit(query_one, namespace): namespace for namespace in namespaces}
+
+        # Namespaces queue behind the concurrency limit, so allow one timeout per wave
+        waves = math.ceil(len(namespaces) / ADMIN_SEARCH_CONCURRENCY)
+        failed = []
+
+        def completed_results():
+            try:
+                for future in as_completed(futures, timeout=timeout * waves):
+                    namespace = futures[future]
+                    try:
+                        yield namespace, future.result()
+                    except Exception as e:
+                        failed.append(namespace)
+                        print(f"Error searching namespace '{namespace}': {e}")
+            except FuturesTimeoutError:
+                pending = [future for future in futures if not future.done()]
+                for future in pending:
+                    future.cancel()
+                failed.extend(futures[future] for future in pending)
+                print(f"⏱️  Admin search timed out on {len(pending)} namespaces")
+
+        merged = merge_top_k(completed_results(), top_k)
+        if failed:
+            print(f"⚠️  Admin search skipped {len(failed)} of {len(namespaces)} namespaces")
+        return merged
+
+    def describe_index_stats(self):
+        return self.index.describe_index_stats()
+
+    def upsert_documents(self, documents, embedding, namespace):
+        """Embed documents and upsert them into a namespace through the shared Index."""
+        vector_store = PineconeVectorStore(
+            index=self.index,
+            embedding=embedding,
+            namespace=namespace
+        )
+        vector_store.add_documents(documents)
+        return vector_store
+
+    def upsert_embedded_documents(self, documents, vectors, namespace, batch_size=100):
+        """Upsert already embedded documents, stored like PineconeVectorStore does (text in metadata)."""
+        ids = [str(uuid.uuid4()) for _ in documents]
+        rows = [
+            (vector_id, [float(x) for x in vector], dict(doc.metadata, text=doc.page_content))
+            for vector_id, vector, doc in zip(ids, vectors, documents)
+        ]
+        for start in range(0, len(rows), batch_size):
+            self.index.upsert(vectors=rows[start:start + batch_size], namespace=namespace)
+        return ids
+
+    def health(self):
+        """Check that the index is reachable and ready."""
+        try:
+            description = self.client.describe_index(self.index_name)
+            return {
+                "status": "healthy" if description.status.get("ready") else "not_ready",
+                "backend": "pinecone",
+                "index_name": self.index_name,
+                "connected_since": self.connected_at
+            }
+        except Exception as e:
+            return {
+                "status": "unhealthy",
+                "backend": "pinecone",
+                "index_name": self.index_name,
+                "error": str(e)
+            }
+
+
+_gateway = None
+_gateway_lock = threading.Lock()
+_vector_store = None
+_vector_store_lock = threading.Lock()
+
+
+def get_pinecone_gateway():
+    """Return the process-wide PineconeGateway."""
+    global _gateway
+    if _gateway is None:
+        with _gateway_lock:
+            if _gateway is None:
+                _gateway = PineconeGateway()
+    return _gateway
+
+
+def get_vector_store():
+    """Return the process-wide vector store selected by VECTOR_STORE_BACKEND.
+
+    "pinecone" uses the shared PineconeGateway, "local" the in-process
+    NumPy store in local_vector_store. Both expose the same methods.
+    """
+    global _vector_store
+    if _vector_store is None:
+        with _vector_store_lock:
+            if _vector_store is None:
+                if VECTOR_STORE_BACKEND == "pinecone":
+                    _vector_store = get_pinecone_gateway()
+                elif VECTOR_STORE_BACKEND == "local":
+                    from local_vector_store import LocalVectorStore
+                    _vector_store = LocalVectorStore()
+                else:
+                    raise ValueError(f"Unknown VECTOR_STORE_BACKEND: {VECTOR_STORE_BACKEND}")
+    return _vector_store
+
+
+__all__ = [
+    'PineconeGateway',
+    'get_pinecone_gateway',
+    'get_vector_store',
+    'merge_top_k'
+]
@@ -1,17 +1,77 @@
+import asyncio
+import gzip
+import json
 import os
 import subprocess
 import time
+import uuid
 
-# Absolute path to Scrapy project root
-SCRAPY_PROJECT_DIR = os.path.abspath("scrapy_web_scraper")
-OUTPUT_PATH = os.path.join(SCRAPY_PROJECT_DIR, "output.json")
+# Absolute path to Scrapy project root (next to this file, whatever the working directory)
+SCRAPY_PROJECT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "scrapy_web_scraper")
+# One sub-directory of JSON Lines shards per crawl (matches FEEDS in the Scrapy settings)
+CRAWLS_DIR = os.path.join(os.path.dirname(SCRAPY_PROJECT_DIR), "crawls")
+MANIFEST_NAME = "manifest.json"
+EMBED_UPSERT_REPORT = "embed_upsert.json"  # written by EmbedUpsertPipeline for crawls with a namespace
+STREAM_LINE_LIMIT = 16 * 1024 * 1024  # one JSON Lines item holds a whole page's text
 
-def run_scrapy_spider(start_url: str, output_path: str = OUTPUT_PATH, timeout: int = 120):
-    command = f'scrapy crawl universal_spider -a start_url="{start_url}" -o "{output_path}"'
 
+def open_shard(path):
+    """Open a feed shard for reading text, gunzipping .gz shards."""
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8")
+    return open(path, "r", encoding="utf-8")
+
+
+def list_shards(crawl_dir):
+    return sorted(
+        name for name in os.listdir(crawl_dir)
+        if name.startswith("items-") and (name.endswith(".jsonl") or name.endswith(".jsonl.gz"))
+    )
+
+
+def write_crawl_manifest(crawl_id, start_url):
+    """Record a finished crawl's shards and item counts in its manifest.json; returns the crawl directory."""
+    crawl_dir = os.path.join(CRAWLS_DIR, crawl_id)
+    os.makedirs(crawl_dir, exist_ok=True)
+    shards = []
+    for name in list_shards(crawl_dir):
+        with open_shard(os.path.join(crawl_dir, name)) as f:
+            items = sum(1 for line in f if line.strip())
+        shards.append({"file": name, "items": items, "bytes": os.path.getsize(os.path.join(crawl_dir, name))})
+
+    manifest = {
+        "crawl_id": crawl_id,
+        "start_url": start_url,
+        "items": sum(shard["items"] for shard in shards),
+        "shards": shards,
+        "finished_at": time.time()
+    }
+    # Written then renamed, so readers never see a partial manifest
+    temp_path = os.path.join(crawl_dir, MANIFEST_NAME + ".tmp")
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(temp_path, os.path.join(crawl_dir, MANIFEST_NAME))
+    return crawl_dir
+
+
+def _crawl_command(start_url, crawl_id, namespace=None):
+    # Argument list instead of a shell string, so the URL is never shell-interpreted
+    command = ["scrapy", "crawl", "universal_spider", "-a", f"start_url={start_url}", "-a", f"crawl_id={crawl_id}"]
+    if namespace:
+        command += ["-a", f"namespace={namespace}"]
+    return command
+
+
+def run_scrapy_spider(start_url: str, crawl_id: str = None, timeout: int = 120, namespace: str = None):
+    """Crawl into crawls/<crawl_id>/ and return that directory (read it with process_scraped_data).
+
+    With ``namespace``, EmbedUpsertPipeline also indexes the pages into it
+    during the crawl, so they are searchable when this returns; a failed
+    upsert raises RuntimeError.
+    """
+    crawl_id = crawl_id or uuid.uuid4().hex
     process = subprocess.Popen(
-        command,
-        shell=True,
+        _crawl_command(start_url, crawl_id, namespace),
         cwd=SCRAPY_PROJECT_DIR,
         stdout=subprocess.PIPE,
         stderr=subprocess.PIPE
@@ -28,10 +88,97 @@ def run_scrapy_spider(start_url: str, output_path: str = OUTPUT_PATH, timeout: i
 
     if process.returncode != 0:
         raise RuntimeError(f"Scrapy spider failed:\n{stderr.decode()}")
+    if namespace:
+        _check_embed_upsert(crawl_id)
+
+    return write_crawl_manifest(crawl_id, start_url)
+
+
+def _check_embed_upsert(crawl_id):
+    """Raise unless EmbedUpsertPipeline indexed the whole crawl."""
+    path = os.path.join(CRAWLS_DIR, crawl_id, EMBED_UPSERT_REPORT)
+    if not os.path.exists(path):
+        raise RuntimeError("Scrapy spider finished without indexing (EmbedUpsertPipeline did not report)")
+    with open(path, "r", encoding="utf-8") as f:
+        report = json.load(f)
+    if report["errors"]:
+        raise RuntimeError(f"Indexing into '{report['namespace']}' failed: {'; '.join(report['errors'])}")
+
+
+async def arun_scrapy_spider(start_url: str, crawl_id: str = None, timeout: int = 120, namespace: str = None):
+    """Async run_scrapy_spider: awaits the crawl subprocess instead of blocking the event loop."""
+    crawl_id = crawl_id or uuid.uuid4().hex
+    process = await asyncio.create_subprocess_exec(
+        *_crawl_command(start_url, crawl_id, namespace),
+        cwd=SCRAPY_PROJECT_DIR,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE
+    )
+
+    try:
+        stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=timeout)
+    except asyncio.TimeoutError:
+        process.kill()
+        await process.wait()
+        raise TimeoutError(f"Scrapy spider timed out after {timeout} seconds")
+    except asyncio.CancelledError:
+        # The ingestion job was cancelled; do not leave the crawl running
+        process.kill()
+        raise
+
+    print("Scrapy stdout:", stdout.decode())
+    print("Scrapy stderr:", stderr.decode())
+
+    if process.returncode != 0:
+        raise RuntimeError(f"Scrapy spider failed:\n{stderr.decode()}")
+    if namespace:
+        _check_embed_upsert(crawl_id)
 
-    # Wait for output.json to appear with content
-    start_time = time.time()
-    while not os.path.exists(output_path) or os.path.getsize(output_path) == 0:
-        if time.time() - start_time > timeout:
-            raise TimeoutError(f"Timed out waiting for output.json at {output_path}")
-        time.sleep(1)
+    return await asyncio.get_running_loop().run_in_executor(None, write_crawl_manifest, crawl_id, start_url)
+
+
+async def astream_scrapy_items(start_url: str, timeout: int = 120):
+    """Run the spider and yield each scraped item as soon as Scrapy emits it.
+
+    Items are read from a JSON Lines feed on the subprocess's stdout; -o
+    replaces the project FEEDS, so nothing is written under crawls/.
+    Closing the generator early kills the crawl.
+    """
+    process = await asyncio.create_subprocess_exec(
+        "scrapy", "crawl", "universal_spider",
+        "-a", f"start_url={start_url}",
+        "-o", "-:jsonlines",
+        cwd=SCRAPY_PROJECT_DIR,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        limit=STREAM_LINE_LIMIT
+    )
+    # Drained concurrently: a full stderr pipe would stall the crawl
+    stderr_task = asyncio.ensure_future(process.stderr.read())
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+
+    try:
+        while True:
+            try:
+                line = await asyncio.wait_for(process.stdout.readline(), timeout=max(0, deadline - loop.time()))
+            except asyncio.TimeoutError:
+                raise TimeoutError(f"Scrapy spider timed out after {timeout} seconds")
+            if not line:
+                break
+            try:
+                item = json.loads(line)
+            except ValueError:
+                continue  # not a feed line
+            yield item
+        await process.wait()
+    finally:
+        if process.returncode is None:
+            process.kill()
+            await process.wait()
+        stderr = (await asyncio.shield(stderr_task)).decode(errors="replace")
+
+    if stderr:
+        print("Scrapy stderr:", stderr)
+    if process.returncode != 0:
+        raise RuntimeError(f"Scrapy spider failed:\n{stderr}")
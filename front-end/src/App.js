@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { User, Shield, Send, Upload, Globe, MessageCircle, FileText, Sparkles, Brain, Zap, Star, AlertCircle, CheckCircle, Lock, ArrowRight, Eye, EyeOff } from 'lucide-react';
 
 export default function DualInterface() {
@@ -24,6 +24,10 @@ export default function DualInterface() {
   const [sessionMode, setSessionMode] = useState(''); // 'new' or 'existing'
   const [availableNamespaces, setAvailableNamespaces] = useState([]);
   const [selectedNamespace, setSelectedNamespace] = useState('');
+  const [namespaceSearch, setNamespaceSearch] = useState('');
+  const [namespaceMatchCount, setNamespaceMatchCount] = useState(0);
+  const [hasMoreNamespaces, setHasMoreNamespaces] = useState(false);
+  const namespaceRequest = useRef(0);
   const [newSessionName, setNewSessionName] = useState('');
 
   // API base URL - update this to match your FastAPI server
@@ -33,6 +37,9 @@ export default function DualInterface() {
   // const TEMP_URL = "chat_legal"
   const TEMP_URL = "query"
 
+  // Namespaces fetched per page in the admin dropdown
+  const NAMESPACE_PAGE_SIZE = 50;
+
   const generateSessionId = () => {
     const newSessionId = `session_${Date.now()}_${Math.random().toString(36).substr(2, 9)}`;
     setSessionId(newSessionId);
@@ -62,29 +69,50 @@ export default function DualInterface() {
     }
   };
 
-  // Fetch available namespaces for admin
-  const fetchNamespaces = async () => {
+  // Fetch one page of namespaces matching the prefix for admin; offset > 0 appends to the list
+  const fetchNamespaces = async (prefix = '', offset = 0) => {
+    const request = ++namespaceRequest.current;
+    const params = new URLSearchParams({ prefix, offset, limit: NAMESPACE_PAGE_SIZE });
     try {
-      console.log('Fetching namespaces from:', `${API_BASE_URL}/namespaces`);
-      const response = await fetch(`${API_BASE_URL}/namespaces`, {
+      console.log('Fetching namespaces from:', `${API_BASE_URL}/namespaces?${params}`);
+      const response = await fetch(`${API_BASE_URL}/namespaces?${params}`, {
         method: 'GET',
         mode: 'cors',
       });
       
+      // Ignore responses overtaken by a newer search
+      if (request !== namespaceRequest.current) return;
+      
       if (response.ok) {
         const data = await response.json();
+        if (request !== namespaceRequest.current) return;
         console.log('Available namespaces:', data.namespaces);
-        setAvailableNamespaces(data.namespaces || []);
+        const page = data.namespaces || [];
+        setAvailableNamespaces((current) => (offset > 0 ? [...current, ...page] : page));
+        setNamespaceMatchCount(data.matching_count || 0);
+        setHasMoreNamespaces(Boolean(data.has_more));
       } else {
         console.error('Failed to fetch namespaces');
         setAvailableNamespaces([]);
+        setHasMoreNamespaces(false);
       }
     } catch (err) {
       console.error('Error fetching namespaces:', err);
-      setAvailableNamespaces([]);
+      if (request === namespaceRequest.current) {
+        setAvailableNamespaces([]);
+        setHasMoreNamespaces(false);
+      }
     }
   };
 
+  // Fetch the first page when an existing session is picked and whenever the search changes (debounced)
+  useEffect(() => {
+    if (sessionMode !== 'existing') return undefined;
+    const timer = setTimeout(() => fetchNamespaces(namespaceSearch.trim()), 300);
+    return () => clearTimeout(timer);
+    // eslint-disable-next-line react-hooks/exhaustive-deps
+  }, [sessionMode, namespaceSearch]);
+
   // Generate new session ID
   const generateNewSessionId = () => {
     const timestamp = Date.now().toString(36);
@@ -95,9 +123,7 @@ export default function DualInterface() {
   // Handle session mode change
   const handleSessionModeChange = (mode) => {
     setSessionMode(mode);
-    if (mode === 'existing') {
-      fetchNamespaces();
-    } else if (mode === 'new') {
+    if (mode === 'new') {
       const newId = generateNewSessionId();
       setNewSessionName(newId);
     }
@@ -123,6 +149,7 @@ export default function DualInterface() {
       setSelectedNamespace('');
       setNewSessionName('');
       setAvailableNamespaces([]);
+      setNamespaceSearch('');
       // Don't set any default sessionId for admin!
     } else {
       // User needs to provide session_id and password
@@ -330,11 +357,32 @@ export default function DualInterface() {
         throw new Error(`HTTP error! status: ${response.status} - ${errorText}`);
       }
 
-      const data = await response.json();
-      console.log('Success response:', data);
+      const queued = await response.json();
+      console.log('Job queued:', queued);
+
+      // /process returns a job ID straight away; poll it until the job finishes
+      let data = queued;
+      while (!['succeeded', 'failed', 'cancelled'].includes(data.status)) {
+        await new Promise(resolve => setTimeout(resolve, 1000));
+        const jobResponse = await fetch(`${API_BASE_URL}/jobs/${queued.job_id}`, { mode: 'cors' });
+        if (!jobResponse.ok) {
+          throw new Error(`HTTP error! status: ${jobResponse.status} - ${await jobResponse.text()}`);
+        }
+        data = await jobResponse.json();
+        const { scraped, chunked, embedded, upserted } = data.progress;
+        setProcessingStatus([
+          ...(data.details || []),
+          `${data.status}: ${scraped} scraped, ${chunked} chunked, ${embedded} embedded, ${upserted} upserted`
+        ]);
+      }
+      console.log('Job finished:', data);
+
+      if (data.status !== 'succeeded') {
+        throw new Error(data.error || `Processing ${data.status}`);
+      }
 
-      setSuccess(data.status);
-      setProcessingStatus(data.processing_details || []);
+      setSuccess('Sources processed and indexed successfully');
+      setProcessingStatus(data.details || []);
       
       // FIX: Update the sessionId state for subsequent operations
       setSessionId(targetSessionId);
@@ -391,6 +439,7 @@ export default function DualInterface() {
     setSelectedNamespace('');
     setNewSessionName('');
     setAvailableNamespaces([]);
+    setNamespaceSearch('');
     setWebUrl('');
     setUploadedFile(null);
     // Stay in admin mode for new upload
@@ -437,6 +486,7 @@ export default function DualInterface() {
     setSelectedNamespace('');
     setNewSessionName('');
     setAvailableNamespaces([]);
+    setNamespaceSearch('');
   };
 
   // ADDED: Submit validation function
@@ -976,6 +1026,14 @@ export default function DualInterface() {
                           <label className="block text-sm font-medium text-gray-300 mb-2">
                             Select Existing Namespace
                           </label>
+                          <input
+                            type="text"
+                            value={namespaceSearch}
+                            onChange={(e) => setNamespaceSearch(e.target.value)}
+                            placeholder="Search namespaces by prefix..."
+                            className="w-full p-3 mb-2 bg-white/10 backdrop-blur-sm border border-white/20 rounded-lg focus:ring-2 focus:ring-blue-500/50 focus:border-blue-400 transition-all duration-300 text-white placeholder-gray-400"
+                            disabled={isLoading}
+                          />
                           <select
                             value={selectedNamespace}
                             onChange={(e) => setSelectedNamespace(e.target.value)}
@@ -991,9 +1049,26 @@ export default function DualInterface() {
                           </select>
                           {availableNamespaces.length === 0 && (
                             <p className="text-sm text-gray-400 mt-2">
-                              Loading namespaces... If empty, no documents have been processed yet.
+                              {namespaceSearch.trim()
+                                ? `No namespaces start with "${namespaceSearch.trim()}".`
+                                : 'Loading namespaces... If empty, no documents have been processed yet.'}
                             </p>
                           )}
+                          {availableNamespaces.length > 0 && (
+                            <div className="flex items-center justify-between mt-2 text-sm text-gray-400">
+                              <span>Showing {availableNamespaces.length} of {namespaceMatchCount}</span>
+                              {hasMoreNamespaces && (
+                                <button
+                                  type="button"
+                                  onClick={() => fetchNamespaces(namespaceSearch.trim(), availableNamespaces.length)}
+                                  className="text-blue-300 hover:text-blue-200 transition-colors duration-300"
+                                  disabled={isLoading}
+                                >
+                                  Load more
+                                </button>
+                              )}
+                            </div>
+                          )}
                         </div>
                       )}
                     </div>